@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+
+class BinAggregator:
+
+  def __init__(self, fd, fact):
+    """
+    Aggregates minute (1/60Hz) series into the bins of a day of the optimization.
+    Each series is read once: every row gets its bin and all the bins (mean, max and the row of the max) are calculated with a single grouped reduction, instead of filtering the dataframe by date for each bin.
+
+    Args:
+      fd: date of the day to aggregate (string with the format '%Y-%m-%d')
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+    """
+    self.fd = str(fd)
+    self.fact = fact
+    self.n_bins_per_hour = int(60 / fact)
+    self.n_bins = int(24 * 60 / fact)
+
+
+  def get_bins(self, dates):
+    """
+    Gets the bin of each row (bin 0 is the first bin of the day, e.g. 00:00-00:59 if bins of 60 minutes)
+    A row belongs to a bin if its date is between HH:MM:00 of the first and of the last minute of the bin (both included), the same as comparing the date strings.
+
+    Args:
+      dates: Date column (strings with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      array with the bin of each row (-1 if the row is not in any bin of the day)
+    """
+    dates = pd.Series(dates, dtype=object).astype(str)
+    day = dates.str.slice(0, 10).to_numpy()
+    minute = dates.str.slice(11, 13).astype(int).to_numpy() * 60 + dates.str.slice(14, 16).astype(int).to_numpy()
+    second = dates.str.slice(17, 19).astype(int).to_numpy()
+
+    bins = minute // self.fact
+    in_bin = (day == self.fd) & ((minute % self.fact != self.fact - 1) | (second == 0))
+    return np.where(in_bin, bins, -1)
+
+
+  def reduce(self, dates, values):
+    """
+    Calculates the mean, the maximum and the row of the (first) maximum of each bin for one or more series with the same dates (NaN values are ignored, as in pandas)
+
+    Args:
+      dates: Date column (strings with the format '%Y-%m-%d %H:%M:%S')
+      values: array with the values of the series (one column per series)
+
+    Returns:
+      array with 3 positions: means [0], maximums [1] and rows of the maximums [2], each one an array with one row per bin and one column per series (NaN and -1 if the bin has no values)
+    """
+    values = np.asarray(values, dtype=float)
+    if (values.ndim == 1):
+      values = values.reshape(-1, 1)
+    bins = self.get_bins(dates)
+
+    rows = np.flatnonzero(bins >= 0)
+    rows = rows[np.argsort(bins[rows], kind='stable')]  # Rows of each bin together (in the original order)
+    sorted_bins = bins[rows]
+    sorted_values = values[rows]
+
+    present, starts = np.unique(sorted_bins, return_index=True)
+    means = np.full((self.n_bins, values.shape[1]), np.nan)
+    maximums = np.full((self.n_bins, values.shape[1]), np.nan)
+    argmax = np.full((self.n_bins, values.shape[1]), -1, dtype=int)
+
+    if (len(rows) > 0):
+      valid = ~np.isnan(sorted_values)
+      sums = np.add.reduceat(np.where(valid, sorted_values, 0.0), starts, axis=0)
+      counts = np.add.reduceat(valid.astype(int), starts, axis=0)
+      bin_maximums = np.fmax.reduceat(sorted_values, starts, axis=0)
+
+      with np.errstate(invalid='ignore', divide='ignore'):
+        means[present] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+      maximums[present] = bin_maximums
+
+      # First row of each bin where the value is the maximum of the bin
+      is_max = sorted_values == bin_maximums[np.searchsorted(present, sorted_bins)]
+      for column in range(values.shape[1]):
+        max_rows = np.flatnonzero(is_max[:, column])
+        first_bins, first = np.unique(sorted_bins[max_rows], return_index=True)
+        argmax[first_bins, column] = rows[max_rows[first]]
+
+    return [means, maximums, argmax]
+
+
+  def get_timeslot_bins(self, start, end):
+    """
+    Splits a timeslot into the bins of the optimization (items of the timeslot), all the bins at once instead of hour by hour and bin by bin
+    e.g. timeslot from 8.53 to 10.15 with bins of 30 minutes:
+    bin 18 -> 08:53 - 08:59
+    bin 19 -> 09:00 - 09:29
+    bin 20 -> 09:30 - 09:59
+    bin 21 -> 10:00 - 10:15
+
+    Args:
+      start: start date of the timeslot (with the format '%Y-%m-%d %H:%M:%S')
+      end: end date of the timeslot (with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      array with 4 positions: bins [0] (10 am corresponds to bin 11 if bins of 60 minutes), hours [1], first minutes [2] and last minutes [3] of each item, each one an array with one position per item
+    """
+    start = str(start)
+    end = str(end)
+    start_hour = int(start[11:13])
+    end_hour = int(end[11:13])
+    start_minute = int(start[14:16])
+    end_minute = int(end[14:16])
+
+    n_bins_per_hour = self.n_bins_per_hour
+    hours = np.repeat(np.arange(start_hour, end_hour + 1), n_bins_per_hour)
+    w = np.tile(np.arange(n_bins_per_hour), max(end_hour - start_hour + 1, 0))
+    first = w * self.fact
+    last = (w + 1) * self.fact - 1
+
+    keep = np.ones(len(hours), dtype=bool)
+    if (n_bins_per_hour > 1):
+      # for example, if we have bins of 30 minutes and the start minute is 30 or higher, then we just have the second bin of that hour
+      keep &= ~((w != n_bins_per_hour - 1) & (hours == start_hour) & (start_minute > last))
+      keep &= ~((hours == end_hour) & (end_minute < first))
+
+    starts = np.where((hours == start_hour) & (start_minute >= first) & (start_minute <= last), start_minute, first)
+    ends = np.where((hours == end_hour) & (end_minute <= last + 1), end_minute, last)
+
+    return [(hours * n_bins_per_hour + w + 1)[keep], hours[keep], starts[keep], ends[keep]]
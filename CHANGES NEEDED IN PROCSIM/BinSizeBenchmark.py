@@ -0,0 +1,142 @@
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from BinAggregator import BinAggregator
+from ProfileRangeIndex import ProfileRangeIndex
+from ProfileWorkspace import ProfileWorkspace
+from ProfileShiftEngine import ProfileShiftEngine
+from CopyOnWriteFolder import CopyOnWriteFolder
+from TimeslotItems import TimeslotItems
+
+
+class BinSizeBenchmark:
+
+  APPLIANCES = ["DISHWASHER", "WASHINGMACHINE", "DRYER", "IRON", "VACUUMCLEANER"]
+
+  def __init__(self, path, n_houses=20, days=1, timeslots_per_house=10, seed=0):
+    """
+    Benchmark of the steps of the optimization which depend on the size of the bins (bins aggregation, items of the timeslots and update of the profiles), with a synthetic community.
+
+    Args:
+      path: folder where the synthetic consumption profiles are created
+      n_houses: number of houses of the community
+      days: number of days of the profiles
+      timeslots_per_house: number of flexible timeslots of each house
+      seed: seed of the random generator
+    """
+    self.path = path
+    self.n_houses = n_houses
+    self.days = days
+    self.timeslots_per_house = timeslots_per_house
+    self.random = np.random.default_rng(seed)
+    self.timeslots = []
+
+
+  def create_profiles(self):
+    """
+    Creates the synthetic consumption profiles (1/60Hz) and timeslots of the community in path + "/minute"
+    """
+    minutes_path = self.path + '/minute'
+    if os.path.exists(minutes_path):
+      shutil.rmtree(minutes_path)
+
+    dates = pd.date_range('2030-01-01', periods=self.days * 24 * 60, freq='min').astype(str).to_numpy()
+    community = np.zeros(len(dates))
+    self.timeslots = []
+
+    for house in range(self.n_houses):
+      os.makedirs(minutes_path + '/house' + str(house))
+      total = self.random.uniform(50, 300, len(dates)).round(3)
+
+      for appliance in self.APPLIANCES:
+        power = np.zeros(len(dates))
+        for timeslot in range(self.timeslots_per_house // len(self.APPLIANCES) + 1):
+          start = int(self.random.integers(0, 24 * 60 - 180))
+          length = int(self.random.integers(10, 150))
+          power[start:start + length] = self.random.uniform(100, 2000, length).round(3)
+          self.timeslots.append({"House": house, "Appliance": appliance, "Start": dates[start], "End": dates[start + length - 1]})
+        total = total + power
+        pd.DataFrame({'Date': dates, 'Power': power}).to_csv(minutes_path + '/house' + str(house) + '/' + appliance + '.csv', sep=';', index=False)
+
+      community = community + total
+      pd.DataFrame({'Date': dates, 'Power': total}).to_csv(minutes_path + '/house' + str(house) + '/total.csv', sep=';', index=False)
+
+    production = np.clip(np.sin(np.linspace(0, np.pi * self.days * 2, len(dates))), 0, None) * 500 * self.n_houses
+    pd.DataFrame({'Date': dates, 'Power': community}).to_csv(minutes_path + '/community.csv', sep=';', index=False)
+    pd.DataFrame({'Date': dates, 'Demand': community, 'PV_Production': production, 'Wind_Production': 0.0, 'Production': production,
+                  'Netload': community - production}).to_csv(minutes_path + '/netload.csv', sep=';', index=False)
+
+
+  def run(self, fact):
+    """
+    Runs the steps which depend on the size of the bins
+    The items are built as in prepare_inputs (its other inputs do not depend on the size of the bins) and the update includes writing the updated profiles.
+
+    Args:
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+
+    Returns:
+      dictionary with the time (in seconds) of each step ("bins", "items" and "update") and the number of items
+    """
+    times = {}
+    minutes_path = self.path + '/minute'
+    netload = pd.read_csv(minutes_path + '/netload.csv', sep=';')
+    fd = str(netload.iloc[0]["Date"])[0:10]
+    aggregator = BinAggregator(fd, fact)
+
+    # Mean and maximum production of each bin
+    begin = time.perf_counter()
+    aggregator.reduce(netload['Date'], netload['Production'])
+    times["bins"] = time.perf_counter() - begin
+
+    # Items of each timeslot (one per bin)
+    begin = time.perf_counter()
+    range_indexes = {}
+    records = []
+    for number, timeslot in enumerate(self.timeslots):
+      profile_name = '/house' + str(timeslot['House']) + '/' + timeslot['Appliance'] + ".csv"
+      if (profile_name not in range_indexes):
+        df = pd.read_csv(minutes_path + profile_name, sep=';')
+        range_indexes[profile_name] = ProfileRangeIndex(df['Date'], df['Power'])
+
+      start_date = str(timeslot['Start'])[0:10]
+      item_bins, item_hours, item_starts, item_ends = aggregator.get_timeslot_bins(timeslot['Start'], timeslot['End'])
+      bin_starts = [start_date + ' ' + str(hour).zfill(2) + ':' + str(start).zfill(2) + ':00' for hour, start in zip(item_hours, item_starts)]
+      bin_ends = [start_date + ' ' + str(hour).zfill(2) + ':' + str(end).zfill(2) + ':00' for hour, end in zip(item_hours, item_ends)]
+      weights = range_indexes[profile_name].means(bin_starts, bin_ends) * ((item_ends - item_starts + 1) / 60)
+      maximums = range_indexes[profile_name].maxima(bin_starts, bin_ends)
+
+      # Each timeslot is moved one hour later (if it stays in the day)
+      shift = aggregator.n_bins_per_hour if item_bins[-1] + aggregator.n_bins_per_hour <= aggregator.n_bins else 0
+      for subitem in range(len(item_bins)):
+        records.append((number, subitem, weights[subitem], item_bins[subitem] + shift, len(item_bins), item_bins[0] + shift, maximums[subitem], item_bins[subitem], 1.0))
+    times["items"] = time.perf_counter() - begin
+    times["n_items"] = len(records)
+
+    # Update of the profiles with the placed items
+    final_path = self.path + '/afteroptimization'
+    CopyOnWriteFolder(minutes_path, final_path).create()
+    begin = time.perf_counter()
+    workspace = ProfileWorkspace(final_path)
+    engine = ProfileShiftEngine(ProfileWorkspace(minutes_path), workspace, aggregator.n_bins_per_hour, fact)
+    engine.apply(TimeslotItems(np.array(records, dtype=TimeslotItems.DTYPE)), self.timeslots)
+    workspace.flush()  # The updated profiles are only written when the workspace is flushed
+    times["update"] = time.perf_counter() - begin
+
+    return times
+
+
+if __name__ == '__main__':
+  path = tempfile.mkdtemp()
+  try:
+    benchmark = BinSizeBenchmark(path)
+    benchmark.create_profiles()
+    print("bin size (min) | items | bins (s) | items (s) | update (s)")
+    for fact in [60, 30, 15]:
+      times = benchmark.run(fact)
+      print(str(fact).rjust(14) + " | " + str(times["n_items"]).rjust(5) + " | " + ("%.3f" % times["bins"]).rjust(8) + " | " + ("%.3f" % times["items"]).rjust(9) + " | " + ("%.3f" % times["update"]).rjust(10))
+  finally:
+    shutil.rmtree(path)
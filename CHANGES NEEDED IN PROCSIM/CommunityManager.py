@@ -1,750 +1,432 @@
-from abc import ABC, abstractmethod
-import pandas as pd
-import os
-import math
-import shutil
-import errno
-import datetime
-from Input import Input
-import numpy as np
-
-
-class CommunityManager(ABC):
-
-
-  def calculate_bin_used_capacity(self, bins_capacities, placed_timeslots, production_baseload, n_bins_per_hour):
-    """
-    Updates the bin capacity for the second part of the optimization (increases the production_baseload to the bin capacity of the first part, and subtracts the energy of the placed timeslots in the first step.
-
-    Args:
-      bins_capacities: bin capacities of the bins in the 1st step of the optimization
-      placed_timeslots: placed timeslots in the 1st step (in order to subtract the energy of them to the bin capacity) - if they are placed, the bin capacity decreases
-      production_baseload: value to increment in the bin capacities, which corresponds to the value of energy that can be acquired from the grid in the 2nd step
-      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
-
-    Returns:
-      array with x positions in a day (where the number of positions is 24*n_bins_per_hour) with the bin capacity of each bin
-    """
-
-    binUsedCapacity = [0] * 24 * n_bins_per_hour
-
-    for bin in range(len(bins_capacities)):
-      binUsedCapacity[bin] = bins_capacities[bin]
-      binUsedCapacity[bin] += production_baseload
-
-    for timeslot in placed_timeslots:
-      tm = timeslot.split("-")
-      weight = float(tm[2])
-      bin = int(tm[3]) - 1  # bin 1 is 0 position (00:00-00:59)
-      binUsedCapacity[bin] -= weight
-
-    return binUsedCapacity
-
-
-  def get_production_max_after_first_optimization(self, netload_second_optim, fd, production_baseload, n_bins_per_hour, fact):
-    """
-    Calculates the maximum production peak for each bin of the second step (calculates the maximum in the netload dataframe after updating the profiles of 1st step, and have to increase the production_baseload and decrease the energy of the placed timeslots of the 1st step)
-
-    Args:
-      netload_second_optim: dataframe which contains the netload after updating the profiles of the 1st step (to calculate the maximum peak in the 2nd step)
-      fd: consumption profile date (to
-      production_baseload: value to increment in the bin capacities, which corresponds to the value of energy that can be acquired from the grid in the 2nd step
-      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
-      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
-
-    Returns:
-      array with x positions in a day (where the number of positions is 24*n_bins_per_hour) with the bin maximum production peak of each bin
-    """
-
-    bins_maximum_second_optimization = []
-    for z in range(0, 24):
-
-      startMin = 0
-      endMin = fact - 1
-      for w in range(0, n_bins_per_hour):
-        max = netload_second_optim[
-          (netload_second_optim['Date'] >= str(fd) + ' ' + str(z).zfill(2) + ':' + str(startMin).zfill(2) + ':00') & (
-                  netload_second_optim['Date'] <= str(fd) + ' ' + str(z).zfill(2) + ':' + str(endMin).zfill(2) + ':00')][
-          'Production'].max()
-        # demand when the production is max
-        binUsage = netload_second_optim.loc[netload_second_optim[
-          (netload_second_optim['Date'] >= str(fd) + ' ' + str(z).zfill(2) + ':' + str(startMin).zfill(2) + ':00') & (
-                  netload_second_optim['Date'] <= str(fd) + ' ' + str(z).zfill(2) + ':' + str(endMin).zfill(2) + ':00')][
-          'Production'].idxmax()]["Demand"]
-        bins_maximum_second_optimization.append(max + production_baseload - binUsage)
-
-        startMin = startMin + fact
-        endMin = endMin + fact
-
-    return bins_maximum_second_optimization
-
-
-  def remove_flexible_consumption(self):
-    """
-    Removes the flexible consumption of the consumption profile, in order to have the baseload consumption (that consumption that can not be shifted.
-    In order to do this, the consumption of the flexible appliances are subtracted from the netload and community dataframes (notice that each flexible has it own consumption profile for each house)
-
-    Returns:
-      netload dataframe with the non-flexible consumption
-    """
-
-    flexible_timeslots = self.cg.get_timeslots(self.cg.get_community(), True)
-
-    df_community = pd.read_csv(self.path_steps_after_first + '/community.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
-    df_community.columns = ['Date', 'Power']
-
-    df_netload = pd.read_csv(self.path_steps_after_first + '/netload.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
-    df_netload.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
-
-
-    for timeslot in flexible_timeslots:
-
-      df_appliance = pd.read_csv(self.path_steps_after_first + '/house' + str(timeslot["House"]) + '/' + timeslot["Appliance"] + ".csv", sep=';')  # Header=None to indicate that the first row is data and not colummn names
-      df_appliance.columns = ['Date', 'Power']
-
-      df_total = pd.read_csv(self.path_steps_after_first + '/house' + str(timeslot["House"]) + '/total.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
-      df_total.columns = ['Date', 'Power']
-
-      start_obj = datetime.datetime.strptime(timeslot["Start"], '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
-      end_obj = datetime.datetime.strptime(timeslot["End"], '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
-      obj = start_obj
-
-      while (obj != end_obj + datetime.timedelta(minutes=1)):
-
-        # Update house total consumption
-        indexTotal = df_total[df_total.Date == str(obj)].index  # Get index of the row
-
-        df_total.loc[indexTotal, 'Power'] = float(df_total[df_total.Date == str(obj)]["Power"]) - float(df_appliance[df_appliance.Date == str(obj)]["Power"])
-
-        # Update community consumption
-        indexCommunity = df_community[df_community.Date == str(obj)].index  # Get index of the row
-        df_community.loc[indexCommunity, 'Power'] = float(df_community[df_community.Date == str(obj)]["Power"]) - float(df_appliance[df_appliance.Date == str(obj)]["Power"])
-
-
-        # Update community netload
-        indexNetload = df_netload[df_netload.Date == str(obj)].index  # Get index of the row
-        df_netload.loc[indexNetload, 'Demand'] = float(df_netload[df_netload.Date == str(obj)]["Demand"]) - float(df_appliance[df_appliance.Date == str(obj)]["Power"])
-
-        # Update appliance consumption - has to be the last update since the others dataframes use this dataframe
-        indexAppliance = df_appliance[df_appliance.Date == str(obj)].index  # Get index of the row
-        df_appliance.loc[indexAppliance, 'Power'] = 0
-
-        obj = obj + datetime.timedelta(minutes=1)  # Next minute
-
-
-      # After all minutes of the appliance updated
-      output_directory = os.path.join('', self.path_steps_after_first + '/house' + str(timeslot["House"]))
-
-      outname = os.path.join(output_directory, str(timeslot["Appliance"]) + '.csv')
-      df_appliance.to_csv(outname, columns=['Date', 'Power'], sep=";", index=False)
-
-      outname = os.path.join(output_directory, 'total.csv')
-      df_total.to_csv(outname, columns=['Date', 'Power'], sep=";", index=False)
-
-    output_directory = os.path.join('', self.path_steps_after_first)
-    outname = os.path.join(output_directory, 'community.csv')
-    df_community.to_csv(outname, columns=['Date', 'Power'], sep=";", index=False)
-
-    outname = os.path.join(output_directory, 'netload.csv')
-    df_netload.to_csv(outname, columns=['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload'], sep=";", index=False)
-
-    return df_netload
-
-
-
-  def create_profiles_after_strategy(self, placed_timeslots, all_timeslots_objects, initial_path, final_path, short_initial_path, short_final_path, remove_flex_cons, n_bins_per_hour, fact):
-    """
-    Implementing the abstract function (from the parent) which updates the profiles after applying the strategy.
-
-    Args:
-      placed_timeslots: array of the placed timeslots
-      all_timeslots_objects: array of all timeslots with all the information (Start, End, Appliance, Power, House, etc)
-      initial_path: path of the minutes (1/60Hz) dataframe (e.g. "(...)/output/minute")
-      final_path: path of the dataframe after the strategy (e.g. "(...)/output/afteroptimization")
-      short_initial_path: folder of the minutes (1/60Hz) dataframe (e.g. "minutes")
-      short_final_path: folder of the dataframe after the strategy e.g. "afteroptimization")
-      remove_flex_cons: if True, the flexible consumption will be removed, otherwise the flexible consumption will not be removed (in 1st step, it was True to remove the flexible consumption and in the 2nd step it was False because the flexible consumption has already been removed)
-      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
-      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
-
-    Returns:
-      output of update_consumption_profiles_based_on_optimization function
-    """
-    return self.update_consumption_profiles_based_on_optimization(placed_timeslots, all_timeslots_objects, initial_path, final_path, short_initial_path, short_final_path, remove_flex_cons, n_bins_per_hour, fact)
-
-
-  def update_consumption_profiles_based_on_optimization(self, placed_timeslots, all_timeslots_objects, initial_path, final_path, short_initial_path, short_final_path, remove_flex_cons, n_bins_per_hour, fact):
-    """
-    Implementing the function which updates the profiles after applying the strategy.
-
-    Args:
-      placed_timeslots: array of the placed timeslots
-      all_timeslots_objects: array of all timeslots with all the information (Start, End, Appliance, Power, House, etc)
-      initial_path: path of the minutes (1/60Hz) dataframe (e.g. "(...)/output/minute")
-      final_path: path of the dataframe after the strategy (e.g. "(...)/output/afteroptimization")
-      short_initial_path: folder of the minutes (1/60Hz) dataframe (e.g. "minutes")
-      short_final_path: folder of the dataframe after the strategy e.g. "afteroptimization")
-      remove_flex_cons: if True, the flexible consumption will be removed, otherwise the flexible consumption will not be removed (in 1st step, it was True to remove the flexible consumption and in the 2nd step it was False because the flexible consumption has already been removed)
-      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
-      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
-
-    Returns:
-      array with 2 positions: array of the placed timeslots [0] and flexible dataframe [1]
-    """
-    # Remove all files of the folder and the folder (before copying the consumption profiles)
-    if os.path.exists(final_path):
-      shutil.rmtree(final_path)
-
-    # Create the folder
-    if not os.path.exists(final_path):
-      os.mkdir(final_path)
-
-
-    # Copy the consumption profiles to after optimization folder in order to change it consumption after the optimization of the timeslots
-    try:
-      src_files = os.listdir(initial_path)
-      for file_name in src_files:
-        full_file_name = os.path.join(initial_path, file_name)
-        if os.path.isfile(full_file_name):
-          shutil.copy(full_file_name, final_path)
-        elif os.path.isdir(full_file_name):
-          shutil.copytree(full_file_name, os.path.join(final_path, file_name))
-    except OSError as e:
-      if e.errno != errno.EEXIST:
-        raise
-
-    # community profile
-    # communityBefore = pd.read_csv('output/minute/community.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
-    # communityBefore.columns = ['Date', 'Power']
-
-
-    df_flexible = ""
-    if (remove_flex_cons):
-      df_flexible = self.remove_flexible_consumption()
-      #showNetloadGraph(finalPath + '/netload.csv')
-
-
-    community_after = pd.read_csv(final_path + '/community.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
-    community_after.columns = ['Date', 'Power']
-
-    netload_after = pd.read_csv(final_path + '/netload.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
-    netload_after.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
-
-
-    # Reset community consumption
-    #community_after['Power'] = 0
-    #netload_after['Demand'] = 0
-
-
-    placed_appliances = []
-    placed_houses = []
-    placed_timeslots_array = []
-
-
-    for timeslot in placed_timeslots:
-
-      timeslot = timeslot.split("-")
-      first_item_date = str(int(timeslot[5])-1)
-      timeslot_number = int(float(timeslot[0]))
-      timeslot_sub_item_number = int(float(timeslot[1]))
-      timeslot_power = float(timeslot[2])
-      timeslot_first_bin = str(int(timeslot[3]) - 1) # bin 1 corresponds to midnight, bin 2 corresponds to 1 am, etc
-      timeslot_number_of_bins = timeslot[4]
-      timeslot_last_bin = str(int(float(first_item_date)) + (int(float(timeslot_number_of_bins)) - 1))
-      timeslot_bin_before_opt = str(int(float(timeslot[7])) - 1)
-
-
-      # Gets all the fields of the timeslot (Start, End, Appliance, House, etc)
-      timeslot_obj = all_timeslots_objects[timeslot_number]  # If a timeslot is placed, all the subitemms are placed
-
-      # each house consumption profile
-      # total_before = pd.read_csv('output/minute/house' + str(timeslotObj["House"]) + '/total.csv', sep=';')
-      # total_before.columns = ['Date', 'Power']
-
-      total_after = pd.read_csv(final_path + '/house' + str(timeslot_obj["House"]) + '/total.csv', sep=';')
-      total_after.columns = ['Date', 'Power']
-
-      # Reset all houses consumption
-      #if (str(timeslot_obj["House"]) not in placed_houses):
-      #total_after['Power'] = 0
-      #placed_houses.append(str(timeslot_obj["House"]))
-
-      # each appliance consumption profile (of a specific house)
-      df_before = pd.read_csv(self.path_steps_minutes + '/house' + str(timeslot_obj["House"]) + '/' + timeslot_obj["Appliance"] + ".csv", sep=';')  # Header=None to indicate that the first row is data and not colummn names
-      df_before.columns = ['Date', 'Power']
-
-      df_after = pd.read_csv(final_path + '/house' + str(timeslot_obj["House"]) + '/' + timeslot_obj["Appliance"] + ".csv", sep=';')  # Header=None to indicate that the first row is data and not colummn names
-      df_after.columns = ['Date', 'Power']
-
-      # Reset all appliance consumption
-      #if ((str(timeslot_obj["House"]) + "-" + str(timeslot_obj["Appliance"])) not in placed_appliances):
-      #dfAfter['Power'] = 0
-      #placed_appliances.append(str(timeslot_obj["House"]) + "-" + str(timeslot_obj["Appliance"]))
-
-      # when there's more than one item of a timeslot:
-      # 1) if its the first hour - starts at the first minutes of the timeslot and ends at 59 miutes
-      # 2) if its a middle hour (not the first and not the last) - starts at 00 minutes and ends at 59 minutes
-      # 3) if its the last hour - starts at 00 and ends at the last minutes of the timeslot
-      # e.g. timeslot from 8.53 to 10.15:
-      # hour 8 (bin 9) -> 08:53 (original) - 08:59 (first)
-      # hour 9 (bin 10) -> 09:00 - 09:59 (middle)
-      # hour 10 (bin 11) -> 10:00 - 10:15 (original) (last)
-
-      tim_new_hour = int(math.floor(int(timeslot_first_bin)/n_bins_per_hour))
-      tim_new_min = int((int(timeslot_first_bin)%n_bins_per_hour)*fact)
-      tim_old_hour = int(math.floor(int(timeslot_bin_before_opt)/n_bins_per_hour))
-      tim_old_min = int((int(timeslot_bin_before_opt) % n_bins_per_hour) * fact)
-
-
-      if (int(timeslot_number_of_bins) > 1):
-        if (int(first_item_date) == int(timeslot_first_bin)):
-
-          timeslot_start_date = str(timeslot_obj["Start"])
-          timeslot_end_date = str(timeslot_obj["Start"])[0:11] + str(tim_old_hour).zfill(2) + ":" + str(tim_old_min + (fact - 1)).zfill(2) + ":00"
-          new_optimization_start_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(int(tim_new_min+(fact-1)) - (int(tim_old_min+(fact-1))-int(timeslot_obj["Start"][14:16]))).zfill(2) + ":00"
-          new_optimization_end_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(tim_new_min + (fact - 1)).zfill(2) + ":00"
-
-        elif (int(timeslot_first_bin) == int(timeslot_last_bin)):
-
-          timeslot_start_date = str(timeslot_obj["Start"])[0:11] + str(tim_old_hour).zfill(2) + ":" + str(tim_old_min).zfill(2) + ":00"
-          timeslot_end_date = str(timeslot_obj["End"])
-          new_optimization_start_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(tim_new_min).zfill(2) + ":00"
-          new_optimization_end_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(int(tim_new_min) + (int(timeslot_obj["End"][14:16])-int(tim_old_min))).zfill(2) + ":00"
-
-        else:
-
-          timeslot_start_date = str(timeslot_obj["Start"])[0:11] + str(tim_old_hour).zfill(2) + ":" + str(tim_old_min).zfill(2) + ":00"
-          timeslot_end_date = str(timeslot_obj["Start"])[0:11] + str(tim_old_hour).zfill(2) + ":" + str(tim_old_min + (fact - 1)).zfill(2) + ":00"
-          new_optimization_start_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(tim_new_min).zfill(2) + ":00"
-          new_optimization_end_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(tim_new_min + (fact - 1)).zfill(2) + ":00"
-
-      else:
-
-        timeslot_start_date = str(timeslot_obj["Start"])
-        timeslot_end_date = str(timeslot_obj["End"])
-        new_optimization_start_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(int(tim_new_min + (fact - 1)) - (int(tim_old_min + (fact - 1)) - int(timeslot_obj["Start"][14:16]))).zfill(2) + ":00"
-        new_optimization_end_date = str(timeslot_obj["Start"])[0:11] + str(tim_new_hour).zfill(2) + ":" + str(int(tim_new_min) + (int(timeslot_obj["End"][14:16]) - int(tim_old_min))).zfill(2) + ":00"
-
-
-      # list of placed timeslots
-      placed_timeslots_array.append(str(timeslot_obj["House"]) + "*" + str(timeslot_obj["Appliance"]) + "*" + str(timeslot_number) + "*" + str(new_optimization_start_date) + "*" + str(new_optimization_end_date))
-
-
-      # before optimization (original)
-      start_obj_before = datetime.datetime.strptime(timeslot_start_date, '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
-      end_obj_before = datetime.datetime.strptime(timeslot_end_date, '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
-      obj_before = start_obj_before
-
-      # after optimization
-      start_obj_after = datetime.datetime.strptime(new_optimization_start_date, '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
-      end_obj_after = datetime.datetime.strptime(new_optimization_end_date, '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
-      obj_after = start_obj_after
-
-
-      while (obj_after != end_obj_after + datetime.timedelta(minutes=1)):
-
-
-        index_netload_after = netload_after[netload_after.Date == str(obj_after)].index  # Get index of the row
-        index_after = community_after[community_after.Date == str(obj_after)].index  # Get index of the row
-        index_total_after = total_after[total_after.Date == str(obj_after)].index  # sGet index of the row
-        index_app_after = df_after[df_after.Date == str(obj_after)].index  # Get index of the row
-
-        netload_after.loc[index_netload_after, 'Demand'] = float(netload_after[netload_after.Date == str(obj_after)]["Demand"]) + float(df_before[df_before.Date == str(obj_before)]["Power"])  # Subtract the energy of that timeslot from the community energy
-        netload_after.loc[netload_after['Production'] < 0, 'Production'] = 0
-
-
-        community_after.loc[index_after, 'Power'] = float(community_after[community_after.Date == str(obj_after)]["Power"]) + float(df_before[df_before.Date == str(obj_before)]["Power"])  # Subtract the energy of that timeslot from the community energy
-
-        total_after.loc[index_total_after, 'Power'] = float(total_after[total_after.Date == str(obj_after)]["Power"]) + float(df_before[df_before.Date == str(obj_before)]["Power"])  # Subtract the energy of that timeslot from the total energy of that house (the house which corresponds the timeslot)
-        df_after.loc[index_app_after, 'Power'] = float(df_after[df_after.Date == str(obj_after)]["Power"]) + float(df_before[df_before.Date == str(obj_before)]["Power"])  # Subtract the energy of that timeslot from the total energy of that house (the house which corresponds the timeslot)
-
-        obj_before = obj_before + datetime.timedelta(minutes=1)  # Next minute
-        obj_after = obj_after + datetime.timedelta(minutes=1)  # Next minute
-
-
-      # After while - when the consumption profile is updated for each minute of the timeslot
-      output_directory = os.path.join('', final_path + '/house' + str(timeslot_obj["House"]))
-      outname = os.path.join(output_directory, str(timeslot_obj["Appliance"]) + '.csv')
-      df_after.to_csv(outname, columns=['Date', 'Power'], sep=";", index=False)
-
-      # After all timeslots updated - update the total of each house
-      output_directory = os.path.join('', final_path + '/house' + str(timeslot_obj["House"]))
-      outname = os.path.join(output_directory, 'total.csv')
-      df_after.to_csv(outname, columns=['Date', 'Power'], sep=";", index=False)
-
-    netload_after["Netload"] = netload_after["Demand"] - netload_after["Production"]
-
-    # After all timeslots updated - update the community profile
-    output_directory = os.path.join('', final_path)
-    outname = os.path.join(output_directory, 'community.csv')
-    community_after.to_csv(outname, columns=['Date', 'Power'], sep=";", index=False)
-
-    # After all timeslots updated - update the community profile
-    outname = os.path.join(output_directory, 'netload.csv')
-    netload_after.to_csv(outname, columns=['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload'], sep=";", index=False)
-
-
-    return [placed_timeslots_array, df_flexible]
-
-
-
-  def prepare_inputs(self, fact, save_to_file = False, import_prices_hour = [], export_prices_hour = []):
-    """
-    Prepares the inputs for the optimization problem.
-    :return:
-    """
-
-    netload = pd.read_csv(self.path_steps_minutes + '/netload.csv',
-                          sep=';')  # Header=None to indicate that the first row is data and not colummn names
-    netload.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
-
-    # Plotd
-    # netload.plot(x="Date", y=["Demand", "Production", "Netload"], kind="line", figsize=(10, 10))
-    # plt.show()
-
-    fd = str(netload.iloc[0]["Date"])[0:10]
-    bins_capacities = []
-    bins_maximum = []
-    bins_export_prices = []
-    bins_import_prices = []
-    houses_production = []
-    n_bins_per_hour = int(60 / fact)
-
-    # Default values (one value per bin - depends on the number of bins of the day)
-    if (len(import_prices_hour) != 24*n_bins_per_hour):
-      print("There are no enough import prices for each bin. Default values will be used.")
-      import_prices_hour = [0.0] * 24*n_bins_per_hour
-    if (len(export_prices_hour) != 24*n_bins_per_hour):
-      print("There are no enough export prices for each bin. Default values will be used.")
-      export_prices_hour = [0.0] * 24*n_bins_per_hour
-
-    for z in range(0, 24):
-      startMin = 0
-      endMin = fact - 1
-      for w in range(0, n_bins_per_hour):
-
-        tmp_prod = []
-
-        for index, house in enumerate(self.cg.get_community()):
-          prod = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/energy.csv', sep=';')
-          prod.columns = ['Date', 'Power']
-
-          prod_avg = prod[
-            (prod['Date'] >= str(fd) + ' ' + str(z).zfill(2) + ':' + str(startMin).zfill(2) + ':00') & (
-                    netload['Date'] <= str(fd) + ' ' + str(z).zfill(2) + ':' + str(endMin).zfill(2) + ':00')][
-            'Power'].mean()
-          tmp_prod.append(prod_avg)
-        houses_production.append(tmp_prod)
-
-
-        avg = netload[
-          (netload['Date'] >= str(fd) + ' ' + str(z).zfill(2) + ':' + str(startMin).zfill(2) + ':00') & (
-                  netload['Date'] <= str(fd) + ' ' + str(z).zfill(2) + ':' + str(endMin).zfill(2) + ':00')][
-          'Production'].mean()
-        max = netload[
-          (netload['Date'] >= str(fd) + ' ' + str(z).zfill(2) + ':' + str(startMin).zfill(2) + ':00') & (
-                  netload['Date'] <= str(fd) + ' ' + str(z).zfill(2) + ':' + str(endMin).zfill(2) + ':00')][
-          'Production'].max()
-        bins_capacities.append(avg)
-        #bins_capacities.append(avg+5000)
-        bins_maximum.append(max)
-        bins_export_prices.append(export_prices_hour[z])
-        bins_import_prices.append(import_prices_hour[z])
-
-        startMin = startMin + fact
-        endMin = endMin + fact
-
-    self.timeslots = self.cg.get_timeslots(self.cg.get_community(), True)
-
-    community = self.cg.get_community()
-    appliances_flexibility = {"DISHWASHER": 12, "VACUUMCLEANER": 8, "WASHINGMACHINE": 10, "DRYER": 5, "IRON": 5,
-                              "COOKINGSTOVE": 1}
-    # appliances_flexibility = {"DISHWASHER": 12, "VACUUMCLEANER": 12, "WASHINGMACHINE": 12, "DRYER": 12, "IRON": 12, "COOKINGSTOVE": 12}
-    flexibilities_array = self.cg.get_community_flexibility(community)
-    contracted_power = self.cg.calculate_contracted_power(community)
-
-
-    house_items = [ [] for i in range(len(community))]
-    house_items_max = [ [] for i in range(len(community))]
-    house_items_date = [ [] for i in range(len(community))]
-    house_items_num = [ [] for i in range(len(community))]
-    house_items_flex = [ [] for i in range(len(community))]
-
-    house_s_soc = [ [] for i in range(len(community))]
-    house_s_min = [ [] for i in range(len(community))]
-    house_s_max = [ [] for i in range(len(community))]
-
-
-    if (save_to_file):
-
-      dates = []
-      items = []
-      items_max = []
-      timeslot_numbers = []
-      count = 0
-      flexibilities = []
-
-      print("Timeslots List")
-      for timeslot in self.timeslots:
-
-        print(timeslot)
-
-        # Fill timeslots (with subitems) array
-        df = pd.read_csv(self.path_steps_minutes + '/house' + str(timeslot['House']) + '/' + timeslot['Appliance'] + ".csv",
-                         sep=';')  # Header=None to indicate that the first row is data and not colummn names
-        df.columns = ['Date', 'Power']
-        df = df[:24 * 60 * 60]  # Only the first day is important (24 hours * 60 minutes * 60 seconds)
-        # df = df.fillna(0) # fills nan with 0
-
-        # Fill dates array
-        start_hour = int(str(timeslot['Start'])[11:13])
-        end_hour = int(str(timeslot['End'])[11:13])
-        start_date = str(timeslot['Start'])[0:10]
-        start_minute = int(str(timeslot['Start'])[14:16])
-        end_minute = int(str(timeslot['End'])[14:16])
-
-        hour = start_hour
-        temp_date = []
-        temp_tim = []
-        temp_num = []
-        temp_max = []
-        temp_flex = []
-
-        while (hour <= end_hour):
-
-          for w in range(0, n_bins_per_hour):
-
-            if (n_bins_per_hour > 1):
-              # for example, if we have bins of 30 minutes and the startMinute is 30 or higher, then we just have the second bin of that hour
-              if (w != n_bins_per_hour - 1 and hour == start_hour and start_minute >= fact * (w + 1)):
-                continue
-
-              if (hour == end_hour and end_minute < fact * w):
-                continue
-
-            if (hour == start_hour and start_minute < fact * (w + 1) and start_minute >= fact * w):
-              start = start_minute
-            else:
-              start = w * fact
-
-            if (hour == end_hour and fact * (w + 1) >= end_minute):
-              end = end_minute
-            elif (hour == start_hour and w == 0):
-              end = fact - 1
-            else:
-              end = (w + 1) * fact - 1
-
-            duration_in_minutes = end - start + 1
-            tim = (df[(df['Date'] >= str(start_date) + ' ' + str(hour).zfill(2) + ':' + str(start).zfill(2) + ':00') & (
-                    df['Date'] <= str(start_date) + ' ' + str(hour).zfill(2) + ':' + str(end).zfill(2) + ':00')][
-                     'Power'].mean()) * (duration_in_minutes / 60)
-            max = df[(df['Date'] >= str(start_date) + ' ' + str(hour).zfill(2) + ':' + str(start).zfill(2) + ':00') & (
-                    df['Date'] <= str(start_date) + ' ' + str(hour).zfill(2) + ':' + str(end).zfill(2) + ':00')][
-              'Power'].max()
-
-            temp_date.append((hour * n_bins_per_hour) + w + 1)  # 10 am corresponds to bin 11
-            temp_tim.append(tim)
-            temp_max.append(max)
-            temp_num.append(count)
-            temp_flex.append(flexibilities_array[int(timeslot['House'])] * appliances_flexibility[timeslot['Appliance']])
-
-          hour = hour + 1
-
-        # Individual houses inputs
-        house_items[int(timeslot["House"])].append(temp_tim)
-        house_items_max[int(timeslot["House"])].append(temp_max)
-        house_items_date[int(timeslot["House"])].append(temp_date)
-        house_items_num[int(timeslot["House"])].append(temp_num)
-        house_items_flex[int(timeslot["House"])].append(temp_flex)
-
-
-        dates.append(temp_date)
-        items.append(temp_tim)
-        items_max.append(temp_max)
-        timeslot_numbers.append(temp_num)
-        flexibilities.append(temp_flex)
-        count = count + 1
-
-
-      df = pd.DataFrame(flexibilities)
-      df.to_csv('inputs/flexibilities.csv', index=False)
-
-      df = pd.DataFrame(dates)
-      df.to_csv('inputs/dates.csv', index=False)
-
-      df = pd.DataFrame(items)
-      df.to_csv('inputs/items.csv', index=False)
-
-      df = pd.DataFrame(items_max)
-      df.to_csv('inputs/items_max.csv', index=False)
-
-      df = pd.DataFrame(timeslot_numbers)
-      df.to_csv('inputs/timeslot_numbers.csv', index=False)
-
-      df = pd.DataFrame(houses_production)
-      df.to_csv('inputs/houses_production.csv', index=False)
-
-      for index, house in enumerate(community):
-
-        df = pd.DataFrame(house_items[index])
-        df.to_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items.csv', index=False)
-
-        df = pd.DataFrame(house_items_max[index])
-        df.to_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_max.csv', index=False)
-
-        df = pd.DataFrame(house_items_date[index])
-        df.to_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_date.csv', index=False)
-
-        df = pd.DataFrame(house_items_num[index])
-        df.to_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_num.csv', index=False)
-
-        df = pd.DataFrame(house_items_flex[index])
-        df.to_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_flex.csv', index=False)
-
-    else:
-
-      flexibilities = pd.read_csv('inputs/flexibilities.csv')
-      flexibilities = flexibilities.to_numpy()
-      flexibilities = [[x for x in y if not np.isnan(x)] for y in flexibilities]
-
-      dates = pd.read_csv('inputs/dates.csv')
-      dates = dates.to_numpy()
-      dates = [[x for x in y if not np.isnan(x)] for y in dates]
-
-      items = pd.read_csv('inputs/items.csv')
-      items = items.to_numpy()
-      items = [[x for x in y if not np.isnan(x)] for y in items]
-
-      items_max = pd.read_csv('inputs/items_max.csv')
-      items_max = items_max.to_numpy()
-      items_max = [[x for x in y if not np.isnan(x)] for y in items_max]
-
-      timeslot_numbers = pd.read_csv('inputs/timeslot_numbers.csv')
-      timeslot_numbers = timeslot_numbers.to_numpy()
-      timeslot_numbers = [[x for x in y if not np.isnan(x)] for y in timeslot_numbers]
-
-      houses_production = pd.read_csv('inputs/houses_production.csv')
-      houses_production = houses_production.to_numpy()
-      houses_production = [[x for x in y if not np.isnan(x)] for y in houses_production]
-
-      for index, house in enumerate(community):
-
-        try:
-          df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items.csv')
-          house_items[index] = df.to_numpy()
-          house_items[index] = [[x for x in y if not np.isnan(x)] for y in house_items[index]]
-        except:
-          house_items[index] = []
-
-        try:
-          df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_max.csv')
-          house_items_max[index] = df.to_numpy()
-          house_items_max[index] = [[x for x in y if not np.isnan(x)] for y in house_items_max[index]]
-        except:
-          house_items_max[index] = []
-
-        try:
-          df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_date.csv')
-          house_items_date[index] = df.to_numpy()
-          house_items_date[index] = [[x for x in y if not np.isnan(x)] for y in house_items_date[index]]
-        except:
-          house_items_date[index] = []
-
-        try:
-          df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_num.csv')
-          house_items_num[index] = df.to_numpy()
-          house_items_num[index] = [[x for x in y if not np.isnan(x)] for y in house_items_num[index]]
-        except:
-          house_items_num[index] = []
-
-        try:
-          df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_items_flex.csv')
-          house_items_flex[index] = df.to_numpy()
-          house_items_flex[index] = [[x for x in y if not np.isnan(x)] for y in house_items_flex[index]]
-        except:
-          house_items_flex[index] = []
-
-
-    for index, house in enumerate(community):
-
-      df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_s.csv', sep=";")
-      house_s_soc[index] = df.to_numpy()[:,0] * 1000
-      house_s_soc[index] = [x for x in house_s_soc[index]]
-
-      df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_s.csv', sep=";")
-      house_s_min[index] = df.to_numpy()[:,1] * 1000
-      house_s_min[index] = [x for x in house_s_min[index]]
-
-      df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_s.csv', sep=";")
-      house_s_max[index] = df.to_numpy()[:,2] * 1000
-      house_s_max[index] = [x for x in house_s_max[index]]
-
-
-    num_houses = len(community)
-
-    # Storage Inputs
-    storage_df = pd.read_csv('inputs/s_inputs.csv')
-    s_initial_soc = storage_df.to_numpy()[:,0] * 1000
-    s_min = storage_df.to_numpy()[:,1] * 1000
-    s_max = storage_df.to_numpy()[:,2] * 1000
-
-
-    print("Community Flexibilities:")
-    print(flexibilities)
-    print("Bin Capacities:")
-    print(bins_capacities)
-    print("Bin Maximum:")
-    print(bins_maximum)
-    print("Dates:")
-    print(dates)
-    print("Timeslots:")
-    print(items)
-    print("Timeslots Maximum:")
-    print(items_max)
-    print("Numbers:")
-    print(timeslot_numbers)
-    print("Storage Max")
-    print(s_max)
-    print("Storage Min")
-    print(s_min)
-    print("Storage Initial SOC")
-    print(s_initial_soc)
-    print("Houses Production:")
-    print(houses_production)
-    print("Export Price:")
-    print(bins_export_prices)
-    print("Import Price:")
-    print(bins_import_prices)
-    print("Timeslots (Individual):")
-    print(house_items)
-    print("Timeslots Maximum (Individual):")
-    print(house_items_max)
-    print("Dates (Individual):")
-    print(house_items_date)
-    print("Numbers (Individual):")
-    print(house_items_num)
-    print("Flexibilities (Individual):")
-    print(house_items_flex)
-    print("S SOC (Individual):")
-    print(house_s_soc)
-    print("S Max (Individual):")
-    print(house_s_max)
-    print("S Min (Individual):")
-    print(house_s_min)
-
-    res = Input(contracted_power, fd, dates, items, bins_capacities, timeslot_numbers, bins_maximum, items_max, n_bins_per_hour, flexibilities, bins_export_prices, bins_import_prices, s_max, s_min, s_initial_soc, num_houses, houses_production, house_items, house_items_max, house_items_date, house_items_num, house_items_flex, house_s_soc, house_s_max, house_s_min)
-    return res
-
-
-
-  @abstractmethod
-  def execute(self, *args):
-    """
-    This function should be implemented in a class which inherits from this one.
-    This goal is to define all the steps necessary to implement the provided strategy which will allow to do a good management of the renewable resources of the community.
-
-    Args:
-      args: can have as many arguments as you want
-    """
-    pass
-
+import os
+from abc import ABC, abstractmethod
+import pandas as pd
+from Input import Input
+from FlexibleConsumptionRemover import FlexibleConsumptionRemover
+from ProfileShiftEngine import ProfileShiftEngine
+from ProfileWorkspace import ProfileWorkspace
+from CopyOnWriteFolder import CopyOnWriteFolder
+from BinAggregator import BinAggregator
+from ProfileRangeIndex import ProfileRangeIndex
+from TimeslotItems import TimeslotItems
+from TimeslotIndex import TimeslotIndex
+from OptimizationInputs import OptimizationInputs
+from OptimizationLog import OptimizationLog
+from PlacementStore import PlacementStore
+import numpy as np
+
+logger = OptimizationLog.get_logger('CommunityManager')
+
+
+class CommunityManager(ABC):
+
+  processes = None  # Maximum number of processes to solve the windows and to read/write the profiles of the houses (None - number of CPUs)
+  compact = False  # If True, the profiles are kept in memory as float32 columns without the Date column while they are updated (see ProfileWorkspace)
+  incremental = False  # If True, the folders of the steps are updated with the difference to the previous placement, when possible (see update_consumption_profiles_based_on_optimization)
+  timeslot_index = None  # TimeslotIndex of the timeslots of the run (given to execute or built when the timeslots are read, see prepare_inputs)
+
+  def calculate_bin_used_capacity(self, bins_capacities, placed_timeslots, production_baseload, n_bins_per_hour):
+    """
+    Updates the bin capacity for the second part of the optimization (increases the production_baseload to the bin capacity of the first part, and subtracts the energy of the placed timeslots in the first step.
+
+    Args:
+      bins_capacities: bin capacities of the bins in the 1st step of the optimization
+      placed_timeslots: TimeslotItems with the placed items in the 1st step (in order to subtract the energy of them to the bin capacity) - if they are placed, the bin capacity decreases
+      production_baseload: value to increment in the bin capacities, which corresponds to the value of energy that can be acquired from the grid in the 2nd step
+      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
+
+    Returns:
+      array with x positions in a day (where the number of positions is 24*n_bins_per_hour) with the bin capacity of each bin
+    """
+
+    binUsedCapacity = [0] * 24 * n_bins_per_hour
+
+    for bin in range(len(bins_capacities)):
+      binUsedCapacity[bin] = bins_capacities[bin]
+      binUsedCapacity[bin] += production_baseload
+
+    # Subtract the weight of each placed item from its bin (bin 1 is 0 position (00:00-00:59))
+    placed_timeslots = TimeslotItems.from_strings(placed_timeslots)
+    binUsedCapacity = np.array(binUsedCapacity, dtype=float)
+    np.subtract.at(binUsedCapacity, placed_timeslots['bin'] - 1, placed_timeslots['weight'])
+
+    return list(binUsedCapacity)
+
+
+  def get_production_max_after_first_optimization(self, netload_second_optim, fd, production_baseload, n_bins_per_hour, fact):
+    """
+    Calculates the maximum production peak for each bin of the second step (calculates the maximum in the netload dataframe after updating the profiles of 1st step, and have to increase the production_baseload and decrease the energy of the placed timeslots of the 1st step)
+
+    Args:
+      netload_second_optim: dataframe which contains the netload after updating the profiles of the 1st step (to calculate the maximum peak in the 2nd step)
+      fd: consumption profile date (to
+      production_baseload: value to increment in the bin capacities, which corresponds to the value of energy that can be acquired from the grid in the 2nd step
+      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+
+    Returns:
+      array with x positions in a day (where the number of positions is 24*n_bins_per_hour) with the bin maximum production peak of each bin
+    """
+
+    # Maximum production of each bin and demand when the production is max (all bins in a single pass)
+    means, maximums, argmax = BinAggregator(fd, fact).reduce(netload_second_optim['Date'], netload_second_optim['Production'])
+    demand = netload_second_optim['Demand'].to_numpy(dtype=float)
+    binUsage = np.where(argmax[:, 0] >= 0, demand[argmax[:, 0]], np.nan)
+
+    bins_maximum_second_optimization = list(maximums[:, 0] + production_baseload - binUsage)
+
+    return bins_maximum_second_optimization
+
+
+  def remove_flexible_consumption(self, workspace=None):
+    """
+    Removes the flexible consumption of the consumption profile, in order to have the baseload consumption (that consumption that can not be shifted.
+    In order to do this, the consumption of the flexible appliances are subtracted from the netload and community dataframes (notice that each flexible has it own consumption profile for each house)
+
+    Args:
+      workspace: ProfileWorkspace of the profiles to update (the files are written when the workspace is flushed). If None, the profiles of path_steps_after_first are updated and written immediately
+
+    Returns:
+      netload dataframe with the non-flexible consumption
+    """
+
+    flexible_timeslots = self.cg.get_timeslots(self.cg.get_community(), True)
+
+    flush = workspace is None
+    if (flush):
+      workspace = ProfileWorkspace(self.path_steps_after_first, compact=self.compact)
+
+    df_netload = FlexibleConsumptionRemover(workspace).remove(flexible_timeslots)
+
+    if (flush):
+      workspace.flush()
+
+    return df_netload
+
+
+
+  def create_profiles_after_strategy(self, placed_timeslots, all_timeslots_objects, initial_path, final_path, short_initial_path, short_final_path, remove_flex_cons, n_bins_per_hour, fact, initial_workspace=None, minutes_workspace=None, background_flush=False):
+    """
+    Implementing the abstract function (from the parent) which updates the profiles after applying the strategy.
+
+    Args:
+      placed_timeslots: TimeslotItems with the placed items (or array of the items strings of the optimization)
+      all_timeslots_objects: array of all timeslots with all the information (Start, End, Appliance, Power, House, etc)
+      initial_path: path of the minutes (1/60Hz) dataframe (e.g. "(...)/output/minute")
+      final_path: path of the dataframe after the strategy (e.g. "(...)/output/afteroptimization")
+      short_initial_path: folder of the minutes (1/60Hz) dataframe (e.g. "minutes")
+      short_final_path: folder of the dataframe after the strategy e.g. "afteroptimization")
+      remove_flex_cons: if True, the flexible consumption will be removed, otherwise the flexible consumption will not be removed (in 1st step, it was True to remove the flexible consumption and in the 2nd step it was False because the flexible consumption has already been removed)
+      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+      initial_workspace: ProfileWorkspace with the profiles of the initial folder (e.g. after the 1st step), so they are not read again (if None, they are read from the initial folder)
+      minutes_workspace: ProfileWorkspace of the minutes (1/60Hz) profiles, to reuse the profiles already read (if None, a new one is created)
+      background_flush: if True, the updated profiles are written in background (the returned workspace has to be waited for, see ProfileWorkspace.wait)
+
+    Returns:
+      output of update_consumption_profiles_based_on_optimization function
+    """
+    return self.update_consumption_profiles_based_on_optimization(placed_timeslots, all_timeslots_objects, initial_path, final_path, short_initial_path, short_final_path, remove_flex_cons, n_bins_per_hour, fact, initial_workspace, minutes_workspace, background_flush)
+
+
+  def update_consumption_profiles_based_on_optimization(self, placed_timeslots, all_timeslots_objects, initial_path, final_path, short_initial_path, short_final_path, remove_flex_cons, n_bins_per_hour, fact, initial_workspace=None, minutes_workspace=None, background_flush=False):
+    """
+    Implementing the function which updates the profiles after applying the strategy.
+
+    Args:
+      placed_timeslots: TimeslotItems with the placed items (or array of the items strings of the optimization)
+      all_timeslots_objects: array of all timeslots with all the information (Start, End, Appliance, Power, House, etc)
+      initial_path: path of the minutes (1/60Hz) dataframe (e.g. "(...)/output/minute")
+      final_path: path of the dataframe after the strategy (e.g. "(...)/output/afteroptimization")
+      short_initial_path: folder of the minutes (1/60Hz) dataframe (e.g. "minutes")
+      short_final_path: folder of the dataframe after the strategy e.g. "afteroptimization")
+      remove_flex_cons: if True, the flexible consumption will be removed, otherwise the flexible consumption will not be removed (in 1st step, it was True to remove the flexible consumption and in the 2nd step it was False because the flexible consumption has already been removed)
+      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+      initial_workspace: ProfileWorkspace with the profiles of the initial folder (e.g. after the 1st step), so they are not read again (if None, they are read from the initial folder)
+      minutes_workspace: ProfileWorkspace of the minutes (1/60Hz) profiles, to reuse the profiles already read (if None, a new one is created)
+      background_flush: if True, the updated profiles are written in background (the returned workspace has to be waited for, see ProfileWorkspace.wait)
+
+    If self.incremental is True and the final folder has the placement of a previous update with the same parameters, only the difference between the placements is applied (the folder is not created again and the flexible dataframe is not returned).
+
+    Returns:
+      array with 4 positions: PlacedTimeslots with the placed timeslots [0], flexible dataframe [1], ProfileWorkspace with the updated profiles [2] and ProfileWorkspace of the minutes profiles [3] (both kept in memory for the next step)
+    """
+    # The files of the initial folder have to be written before the folder is created from them
+    if (initial_workspace is not None):
+      initial_workspace.wait()
+
+    placed_timeslots = TimeslotItems.from_strings(placed_timeslots)
+
+    # Placement applied to the folder: in incremental mode, if the folder was updated with the same parameters and did not change since, only the difference is applied
+    placement_store = PlacementStore(OptimizationInputs.run_path(self.path_steps_after_first) + '/placement-' + os.path.basename(os.path.normpath(final_path)) + '.npz')
+    parameters = {"initial_path": os.path.abspath(initial_path), "initial": PlacementStore.folder_stamp(initial_path), "remove_flex_cons": bool(remove_flex_cons),
+                  "fact": int(fact), "timeslots": PlacementStore.timeslots_fingerprint(all_timeslots_objects)}
+    previous_timeslots = placement_store.load(parameters, final_path) if self.incremental else None
+
+    if (previous_timeslots is None):
+      placement_store.clear()
+
+      # Create the folder as an overlay of the initial folder (unchanged files are hardlinked instead of copied) in order to change it consumption after the optimization of the timeslots
+      CopyOnWriteFolder(initial_path, final_path).create()
+
+      # community profile
+      # communityBefore = pd.read_csv('output/minute/community.csv', sep=';')  # Header=None to indicate that the first row is data and not colummn names
+      # communityBefore.columns = ['Date', 'Power']
+
+      # The profiles of each house are read once and kept in memory while all the timeslots are applied (the houses are read in parallel)
+      placed_objects = [all_timeslots_objects[int(number)] for number in placed_timeslots['number']]
+      changed_timeslots = all_timeslots_objects if remove_flex_cons else placed_objects
+
+      # If the profiles of the initial folder are in memory (e.g. 2nd step), the update starts from them (only the missing ones are read)
+      workspace = initial_workspace.handoff(final_path) if initial_workspace is not None else ProfileWorkspace(final_path, self.processes, self.compact)
+    else:
+      # The folder already has the previous placement (and the flexible consumption removed), only the timeslots of the items which changed are read
+      placed_objects = [all_timeslots_objects[int(number)] for number in set(placed_timeslots.difference(previous_timeslots)['number'].tolist() + previous_timeslots.difference(placed_timeslots)['number'].tolist())]
+      changed_timeslots = placed_objects
+      remove_flex_cons = False
+      workspace = ProfileWorkspace(final_path, self.processes, self.compact)
+
+    workspace.preload(['netload.csv', 'community.csv'] + [workspace.house_file(timeslot["House"], name) for timeslot in changed_timeslots for name in ['total', timeslot["Appliance"]]])
+    if (minutes_workspace is None):
+      minutes_workspace = ProfileWorkspace(self.path_steps_minutes, self.processes, self.compact)
+    minutes_workspace.preload([minutes_workspace.house_file(timeslot["House"], timeslot["Appliance"]) for timeslot in placed_objects])
+
+    df_flexible = ""
+    if (remove_flex_cons):
+      df_flexible = self.remove_flexible_consumption(workspace)
+      #showNetloadGraph(finalPath + '/netload.csv')
+
+
+    # Add the consumption of the placed timeslots to the new position (the shifts are applied as whole arrays, not minute by minute)
+    engine = ProfileShiftEngine(minutes_workspace, workspace, n_bins_per_hour, fact)
+    placed_timeslots_array = engine.apply(placed_timeslots, all_timeslots_objects, previous_timeslots)
+
+    # Each updated file is written once (the houses in parallel, then the community and netload), then the placement applied to them is saved
+    if (engine.changed):
+      workspace.flush(background_flush, after=lambda: placement_store.save(placed_timeslots, parameters, final_path))
+
+    return [placed_timeslots_array, df_flexible, workspace, minutes_workspace]
+
+
+
+  def get_days(self):
+    """
+    Gets the days of the consumption profiles (each day is an independent window of the optimization)
+
+    Returns:
+      array with the days of the netload (strings with the format '%Y-%m-%d')
+    """
+    netload = pd.read_csv(self.path_steps_minutes + '/netload.csv', sep=';', usecols=[0])
+    return sorted(set(netload.iloc[:, 0].astype(str).str.slice(0, 10)))
+
+
+  def prepare_inputs(self, fact, save_to_file = False, import_prices_hour = [], export_prices_hour = [], day = None):
+    """
+    Prepares the inputs for the optimization problem.
+    If a day is given, only the bins and the timeslots (starting) of that day are prepared (the timeslot numbers are still the positions in self.timeslots).
+    The inputs are saved to (or, if save_to_file is False, read from) the inputs folder of the run, next to the folders of the steps (see OptimizationInputs).
+    :return:
+    """
+
+    if (fact <= 0 or 60 % fact != 0):
+      raise ValueError("The bins have to divide an hour (e.g. 15, 30 or 60 minutes), not " + str(fact) + " minutes")
+
+    netload = pd.read_csv(self.path_steps_minutes + '/netload.csv',
+                          sep=';')  # Header=None to indicate that the first row is data and not colummn names
+    netload.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
+
+    # Plotd
+    # netload.plot(x="Date", y=["Demand", "Production", "Netload"], kind="line", figsize=(10, 10))
+    # plt.show()
+
+    fd = str(netload.iloc[0]["Date"])[0:10] if day is None else str(day)
+    bins_capacities = []
+    bins_maximum = []
+    bins_export_prices = []
+    bins_import_prices = []
+    houses_production = []
+    n_bins_per_hour = int(60 / fact)
+
+    # Default values (one value per bin - depends on the number of bins of the day - or one value per hour, used by all the bins of the hour)
+    if (len(import_prices_hour) not in (24, 24*n_bins_per_hour)):
+      logger.warning("There are no enough import prices for each bin. Default values will be used.")
+      import_prices_hour = [0.0] * 24*n_bins_per_hour
+    if (len(export_prices_hour) not in (24, 24*n_bins_per_hour)):
+      logger.warning("There are no enough export prices for each bin. Default values will be used.")
+      export_prices_hour = [0.0] * 24*n_bins_per_hour
+    import_bins_per_price = 1 if len(import_prices_hour) == 24*n_bins_per_hour else n_bins_per_hour
+    export_bins_per_price = 1 if len(export_prices_hour) == 24*n_bins_per_hour else n_bins_per_hour
+
+    # Mean and maximum production of each bin and mean production of each house (each series is read once)
+    aggregator = BinAggregator(fd, fact)
+    means, maximums, argmax = aggregator.reduce(netload['Date'], netload['Production'])
+
+    house_means = []
+    for index, house in enumerate(self.cg.get_community()):
+      prod = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/energy.csv', sep=';')
+      prod.columns = ['Date', 'Power']
+      house_means.append(aggregator.reduce(prod['Date'], prod['Power'])[0][:, 0])
+
+    for bin in range(24 * n_bins_per_hour):
+      houses_production.append([house_mean[bin] for house_mean in house_means])
+      bins_capacities.append(means[bin, 0])
+      #bins_capacities.append(means[bin, 0]+5000)
+      bins_maximum.append(maximums[bin, 0])
+      bins_export_prices.append(export_prices_hour[bin // export_bins_per_price])
+      bins_import_prices.append(import_prices_hour[bin // import_bins_per_price])
+
+    # The timeslots and their index are built once per run (the windows of the other days use the same ones), unless the index was given to execute
+    if (self.timeslot_index is None):
+      self.timeslot_index = TimeslotIndex(self.cg.get_timeslots(self.cg.get_community(), True))
+    self.timeslots = self.timeslot_index.timeslots
+
+    community = self.cg.get_community()
+    appliances_flexibility = {"DISHWASHER": 12, "VACUUMCLEANER": 8, "WASHINGMACHINE": 10, "DRYER": 5, "IRON": 5,
+                              "COOKINGSTOVE": 1}
+    # appliances_flexibility = {"DISHWASHER": 12, "VACUUMCLEANER": 12, "WASHINGMACHINE": 12, "DRYER": 12, "IRON": 12, "COOKINGSTOVE": 12}
+    flexibilities_array = self.cg.get_community_flexibility(community)
+    contracted_power = self.cg.calculate_contracted_power(community)
+
+
+    house_items = [ [] for i in range(len(community))]
+    house_items_max = [ [] for i in range(len(community))]
+    house_items_date = [ [] for i in range(len(community))]
+    house_items_num = [ [] for i in range(len(community))]
+    house_items_flex = [ [] for i in range(len(community))]
+
+    house_s_soc = [ [] for i in range(len(community))]
+    house_s_min = [ [] for i in range(len(community))]
+    house_s_max = [ [] for i in range(len(community))]
+
+
+    run_inputs = OptimizationInputs(OptimizationInputs.run_path(self.path_steps_after_first))
+
+    if (save_to_file):
+
+      dates = []
+      items = []
+      items_max = []
+      timeslot_numbers = []
+      flexibilities = []
+
+      range_indexes = {}  # Range index of each appliance profile (each profile is read once, even if it has more than one timeslot)
+
+      logger.debug("Timeslots List")
+      # Timeslots of the window (the ones which start in the day, found in the index)
+      numbers = list(range(len(self.timeslots))) if day is None else self.timeslot_index.day(fd).tolist()
+      for count in numbers:
+
+        timeslot = self.timeslots[count]
+        logger.debug("%s", timeslot)
+
+        # Fill timeslots (with subitems) array
+        profile_name = '/house' + str(timeslot['House']) + '/' + timeslot['Appliance'] + ".csv"
+        if (profile_name not in range_indexes):
+          df = pd.read_csv(self.path_steps_minutes + profile_name, sep=';')  # Header=None to indicate that the first row is data and not colummn names
+          df.columns = ['Date', 'Power']
+          df = df[:24 * 60 * 60]  # Only the first day is important (24 hours * 60 minutes * 60 seconds)
+          # df = df.fillna(0) # fills nan with 0
+          range_indexes[profile_name] = ProfileRangeIndex(df['Date'], df['Power'])
+        range_index = range_indexes[profile_name]
+
+        # Fill dates array (all the items of the timeslot at once: bin, first and last minute of each item)
+        start_date = str(timeslot['Start'])[0:10]
+        item_bins, item_hours, item_starts, item_ends = aggregator.get_timeslot_bins(timeslot['Start'], timeslot['End'])
+
+        bin_starts = [start_date + ' ' + str(hour).zfill(2) + ':' + str(start).zfill(2) + ':00' for hour, start in zip(item_hours, item_starts)]
+        bin_ends = [start_date + ' ' + str(hour).zfill(2) + ':' + str(end).zfill(2) + ':00' for hour, end in zip(item_hours, item_ends)]
+        durations_in_minutes = item_ends - item_starts + 1
+
+        temp_date = item_bins.tolist()  # 10 am corresponds to bin 11
+        temp_tim = list(range_index.means(bin_starts, bin_ends) * (durations_in_minutes / 60))
+        temp_max = list(range_index.maxima(bin_starts, bin_ends))
+        temp_num = [count] * len(temp_date)
+        temp_flex = [flexibilities_array[int(timeslot['House'])] * appliances_flexibility[timeslot['Appliance']]] * len(temp_date)
+
+        # Individual houses inputs
+        house_items[int(timeslot["House"])].append(temp_tim)
+        house_items_max[int(timeslot["House"])].append(temp_max)
+        house_items_date[int(timeslot["House"])].append(temp_date)
+        house_items_num[int(timeslot["House"])].append(temp_num)
+        house_items_flex[int(timeslot["House"])].append(temp_flex)
+
+
+        dates.append(temp_date)
+        items.append(temp_tim)
+        items_max.append(temp_max)
+        timeslot_numbers.append(temp_num)
+        flexibilities.append(temp_flex)
+
+
+      # The inputs are saved in the inputs folder of the run (one binary file per window)
+      run_inputs.save(fd, {'flexibilities': flexibilities, 'dates': dates, 'items': items, 'items_max': items_max, 'timeslot_numbers': timeslot_numbers,
+                           'houses_production': houses_production, 'house_items': house_items, 'house_items_max': house_items_max,
+                           'house_items_date': house_items_date, 'house_items_num': house_items_num, 'house_items_flex': house_items_flex})
+
+    else:
+
+      saved_inputs = run_inputs.load(fd)
+      flexibilities = saved_inputs['flexibilities']
+      dates = saved_inputs['dates']
+      items = saved_inputs['items']
+      items_max = saved_inputs['items_max']
+      timeslot_numbers = saved_inputs['timeslot_numbers']
+      houses_production = saved_inputs['houses_production']
+
+      house_items = saved_inputs['house_items']
+      house_items_max = saved_inputs['house_items_max']
+      house_items_date = saved_inputs['house_items_date']
+      house_items_num = saved_inputs['house_items_num']
+      house_items_flex = saved_inputs['house_items_flex']
+
+
+    for index, house in enumerate(community):
+
+      df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_s.csv', sep=";")
+      house_s_soc[index] = df.to_numpy()[:,0] * 1000
+      house_s_soc[index] = [x for x in house_s_soc[index]]
+
+      df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_s.csv', sep=";")
+      house_s_min[index] = df.to_numpy()[:,1] * 1000
+      house_s_min[index] = [x for x in house_s_min[index]]
+
+      df = pd.read_csv(self.path_steps_minutes + '/house' + str(index) + '/house_s.csv', sep=";")
+      house_s_max[index] = df.to_numpy()[:,2] * 1000
+      house_s_max[index] = [x for x in house_s_max[index]]
+
+
+    num_houses = len(community)
+
+    # Storage Inputs
+    storage_df = pd.read_csv(run_inputs.static_file('s_inputs.csv'))
+    s_initial_soc = storage_df.to_numpy()[:,0] * 1000
+    s_min = storage_df.to_numpy()[:,1] * 1000
+    s_max = storage_df.to_numpy()[:,2] * 1000
+
+
+    # The inputs are only logged (or dumped in binary) at the DEBUG level
+    OptimizationLog.dump(logger, 'inputs', {'Community Flexibilities': flexibilities, 'Bin Capacities': bins_capacities, 'Bin Maximum': bins_maximum,
+                                            'Dates': dates, 'Timeslots': items, 'Timeslots Maximum': items_max, 'Numbers': timeslot_numbers,
+                                            'Storage Max': s_max, 'Storage Min': s_min, 'Storage Initial SOC': s_initial_soc, 'Houses Production': houses_production,
+                                            'Export Price': bins_export_prices, 'Import Price': bins_import_prices, 'Timeslots (Individual)': house_items,
+                                            'Timeslots Maximum (Individual)': house_items_max, 'Dates (Individual)': house_items_date,
+                                            'Numbers (Individual)': house_items_num, 'Flexibilities (Individual)': house_items_flex,
+                                            'S SOC (Individual)': house_s_soc, 'S Max (Individual)': house_s_max, 'S Min (Individual)': house_s_min})
+
+    res = Input(contracted_power, fd, dates, items, bins_capacities, timeslot_numbers, bins_maximum, items_max, n_bins_per_hour, flexibilities, bins_export_prices, bins_import_prices, s_max, s_min, s_initial_soc, num_houses, houses_production, house_items, house_items_max, house_items_date, house_items_num, house_items_flex, house_s_soc, house_s_max, house_s_min)
+    return res
+
+
+
+  @abstractmethod
+  def execute(self, *args):
+    """
+    This function should be implemented in a class which inherits from this one.
+    This goal is to define all the steps necessary to implement the provided strategy which will allow to do a good management of the renewable resources of the community.
+
+    Args:
+      args: can have as many arguments as you want
+    """
+    pass
+
@@ -0,0 +1,20 @@
+from CommunityManagerStrategy import CommunityManagerStrategy
+from GreedyKnapsack import GreedyKnapsack
+
+
+class CommunityManagerGreedy(CommunityManagerStrategy):
+
+  optimizer = GreedyKnapsack
+
+  def __init__(self, cg, path_steps_minutes, path_steps_after_first, path_steps_after_second):
+    """
+    This class is the load balancing strategy of the CommunityManagerStrategy (two steps), with the timeslots placed by a heuristic (GreedyKnapsack) instead of the Knapsack.
+    It is meant for communities with too many flexible timeslots for the exact methods (it finishes in seconds for thousands of timeslots), the placed weight may be lower (see GreedyBenchmark).
+
+    Args:
+      cg: Consumption Generator instance (to allow to use its functions)
+      path_steps_minutes: path of the resampled consumption profiles (at 1/60Hz)
+      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization
+      path_steps_after_second: path of the consumption profiles after the 2nd step of the optimization
+    """
+    super().__init__(cg, path_steps_minutes, path_steps_after_first, path_steps_after_second)
@@ -1,146 +1,214 @@
-from CommunityManager import CommunityManager
-from ConsumptionGenerator import ConsumptionGenerator
-from Knapsack import Knapsack
-import pandas as pd
-
-
-
-class CommunityManagerStrategy(CommunityManager):
-
-  def __init__(self, cg, path_steps_minutes, path_steps_after_first, path_steps_after_second):
-    """
-    This class is a load balancing strategy implemented using Multiple Knapsack (which is a combinatorial optimization problem).
-    Taking in consideration the objective functions and constraints, it shifts the consumption of the activities.
-
-    Args:
-      cg: Consumption Generator instance (to allow to use its functions)
-      path_steps_minutes: path of the resampled consumption profiles (at 1/60Hz)
-      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization
-      path_steps_after_second: path of the consumption profiles after the 2nd step of the optimization
-    """
-    self.cg = cg
-    self.path_steps_minutes = path_steps_minutes
-    self.path_steps_after_first = path_steps_after_first
-    self.path_steps_after_second = path_steps_after_second
-
-
-  def execute(self, save_to_file=False):
-    """
-    Executes the optimization process (implemented strategy using Multiple Knapsack):
-    1) First step
-    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
-    - Calls the Knapsack class with the input processed (execute_knapsack function)
-    - Updates the consumption profiles based on the output of the knapsack
-    2) Second Step
-    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
-    - Calls the Knapsack class with the input processed (execute_knapsack function)
-    - Updates the consumption profiles based on the output of the knapsack
-    """
-
-    print("Optimization the community using the implemented strategy")
-
-    fact = 60
-    inputs = self.prepare_inputs(fact, save_to_file)
-
-    self.production_baseload = 0.85 * float(inputs.contracted_power)
-
-    exec = Knapsack(inputs.dates, inputs.items, inputs.bins_capacities, inputs.timeslot_numbers, inputs.bins_maximum, inputs.items_max, self.production_baseload, fact, inputs.n_bins_per_hour, inputs.flexibilities)
-    otimization = exec.execute_knapsack(1)
-
-    # Remove all the consumption (all timeslots - placed and not placed ones)
-    # Add the consumption of the placed timeslots (just the ones that were placed by the optimization process)
-    self.placed_timeslots = otimization[1]
-    self.not_placed_timeslots = otimization[2]
-
-    # showNetloadGraph('output/minute/netload.csv')
-
-    updt = self.create_profiles_after_strategy(self.placed_timeslots, self.timeslots, self.path_steps_minutes, self.path_steps_after_first, self.path_steps_minutes.split("/")[-1], self.path_steps_after_first.split("/")[-1], True, inputs.n_bins_per_hour, fact)
-    self.placed_timeslots_array = updt[0]
-    df_flexible = updt[1]
-
-    # prepare dates and timeslots for the second optimization (the ones that were not placed in the first optimization)
-    tmp_index = -1
-    dates_second_optim = []
-    items_second_optim = []
-    numbers_second_optim = []
-    items_max_second_optim = []
-    flexibilities_second_optim = []
-    count = 0
-    for tim in self.not_placed_timeslots:
-
-      if (tmp_index != int(float(tim.split("-")[0]))):
-        tmp_dates = []
-        tmp_weights = []
-        tmp_nums = []
-        tmp_max = []
-        tmp_flexibility = []
-
-      tmp_dates.append(int(float(tim.split("-")[3])))
-      tmp_weights.append(float(tim.split("-")[2]))
-      tmp_nums.append(int(float(tim.split("-")[0])))
-      tmp_max.append(float(tim.split("-")[6]))
-      tmp_flexibility.append(tim.split("-")[8])
-
-      if (count == int(float(tim.split("-")[4])) - 1):
-        dates_second_optim.append(tmp_dates)
-        items_second_optim.append(tmp_weights)
-        numbers_second_optim.append(tmp_nums)
-        items_max_second_optim.append(tmp_max)
-        flexibilities_second_optim.append(tmp_flexibility)
-        count = 0
-      else:
-        count = count + 1
-      tmp_index = int(float(tim.split("-")[0]))
-
-    netload_second_optim = pd.read_csv(self.path_steps_after_first + '/netload.csv', sep=';')
-    netload_second_optim.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
-
-    # Update Production after first optimization (in order to update bin capacities)
-    # Remove flexible consumption from netload (update production after optimization by removing placed timeslots consumption
-    bins_capacities_second_optimization = self.calculate_bin_used_capacity(inputs.bins_capacities, self.placed_timeslots, self.production_baseload, inputs.n_bins_per_hour)
-    bins_maximum_second_optimization = self.get_production_max_after_first_optimization(netload_second_optim, inputs.first_date, self.production_baseload, inputs.n_bins_per_hour, fact)
-
-
-    print("Community Flexibilities (2nd):")
-    print(flexibilities_second_optim)
-    print("Bin Capacities (2nd):")
-    print(bins_capacities_second_optimization)
-    print("Bin Maximum (2nd):")
-    print(bins_maximum_second_optimization)
-    print("Dates (2nd):")
-    print(dates_second_optim)
-    print("Timeslots (2nd):")
-    print(items_second_optim)
-    print("Timeslots Maximum (2nd):")
-    print(items_max_second_optim)
-    print("Numbers (2nd):")
-    print(numbers_second_optim)
-
-    # showNetloadGraph('output/afteroptimization/netload.csv')
-
-    if (len(items_second_optim) > 0 and len(dates_second_optim) > 0):
-      # Second Optimization
-      second_exec = Knapsack(dates_second_optim, items_second_optim, bins_capacities_second_optimization, numbers_second_optim,
-                            bins_maximum_second_optimization, items_max_second_optim, self.production_baseload, fact,
-                            inputs.n_bins_per_hour, flexibilities_second_optim)
-      second_optim = second_exec.execute_knapsack(2)
-
-      self.second_placed_timeslots = second_optim[1]
-      self.second_not_placed_timeslots = second_optim[2]
-
-      print("Not Placed 2nd:")
-      print(self.second_not_placed_timeslots)
-
-      updt = self.create_profiles_after_strategy(self.second_placed_timeslots, self.timeslots,
-                                                   self.path_steps_after_first, self.path_steps_after_second,
-                                                   self.path_steps_after_first.split("/")[-1], self.path_steps_after_second.split("/")[-1], False, inputs.n_bins_per_hour,
-                                                   fact)
-      self.second_placed_timeslots_array = updt[0]
-      # showNetloadGraph('output/aftersecoptimization/netload.csv')
-
-    # print(timeslots)
-    # community = ConsumptionGenerator.get_community()
-    # ConsumptionGenerator.show_community_graph(community, 'output/minute/house')
-    # ConsumptionGenerator.show_community_graph(community, 'output/afteroptimization/house')
-
-    return [df_flexible]
+from CommunityManager import CommunityManager
+from ConsumptionGenerator import ConsumptionGenerator
+from Knapsack import Knapsack
+from TimeslotItems import TimeslotItems
+from DayWindows import DayWindows
+from ResultCache import ResultCache
+from OptimizationLog import OptimizationLog
+import time
+import numpy as np
+
+logger = OptimizationLog.get_logger('CommunityManagerStrategy')
+
+
+
+class CommunityManagerStrategy(CommunityManager):
+
+  optimizer = Knapsack  # Class which places the timeslots of each window in the bins (execute_knapsack function)
+
+  def __init__(self, cg, path_steps_minutes, path_steps_after_first, path_steps_after_second):
+    """
+    This class is a load balancing strategy implemented using Multiple Knapsack (which is a combinatorial optimization problem).
+    Taking in consideration the objective functions and constraints, it shifts the consumption of the activities.
+
+    Args:
+      cg: Consumption Generator instance (to allow to use its functions)
+      path_steps_minutes: path of the resampled consumption profiles (at 1/60Hz)
+      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization
+      path_steps_after_second: path of the consumption profiles after the 2nd step of the optimization
+    """
+    self.cg = cg
+    self.path_steps_minutes = path_steps_minutes
+    self.path_steps_after_first = path_steps_after_first
+    self.path_steps_after_second = path_steps_after_second
+    self.step_stats = []
+
+
+  def execute(self, save_to_file=False, fact=60, multi_day=False, processes=None, incremental=False, compact=False, cache=False, timeslot_index=None):
+    """
+    Executes the optimization process (implemented strategy using Multiple Knapsack):
+    1) First step
+    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
+    - Calls the Knapsack class with the input processed (execute_knapsack function)
+    - Updates the consumption profiles based on the output of the knapsack
+    2) Second Step
+    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
+    - Calls the Knapsack class with the input processed (execute_knapsack function)
+    - Updates the consumption profiles based on the output of the knapsack
+    The 2nd step starts from the 1st one: the bin capacities are the residual capacities after the 1st step and the timeslots which can not fit in them are not given to the Knapsack (see fitting_timeslots).
+    The time and the placed timeslots/weight of each step are logged and kept in step_stats.
+    If multi_day is True, each day is an independent window: the knapsacks of the days are solved concurrently (DayWindows) and their placements are merged into the same profiles.
+
+    Args:
+      save_to_file: if True, the inputs of the optimization are calculated and saved to the inputs folder of the run, otherwise they are read from it
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30) - it has to divide an hour (e.g. 15, 30 or 60)
+      multi_day: if True, all the days are optimized (one window per day), otherwise only the first day (if save_to_file is False, the inputs of each day have to be saved before)
+      processes: maximum number of processes to solve the windows and to read/write the profiles of the houses (if None, the number of CPUs)
+      incremental: if True and the folders of the steps were updated before with the same timeslots and parameters, only the timeslots whose placement changed are shifted (instead of creating the folders again)
+      compact: if True, the profiles are updated in memory as float32 arrays (less memory, the values written are rounded to float32 precision)
+      cache: if True, the outputs of the windows are kept in the inputs folder of the run (see ResultCache) and the windows solved before with exactly the same inputs and parameters are not solved again
+      timeslot_index: TimeslotIndex of the flexible timeslots of the community (e.g. built once by ProcsimRun for the simulation and the optimisations), if None the timeslots are read from the profiles in this run
+    """
+
+    logger.info("Optimization the community using the implemented strategy")
+    self.processes = processes
+    self.incremental = incremental
+    self.compact = compact
+    self.timeslot_index = timeslot_index  # If None, the timeslots are read again in this run
+
+    # Each window has its own inputs in the inputs folder of the run, so the saved inputs can also be read by day
+    days = self.get_days() if multi_day else [None]
+
+    windows_inputs = [self.prepare_inputs(fact, save_to_file, day=day) for day in days]
+    inputs = windows_inputs[0]
+    if (len(windows_inputs) > 1):
+      windows_inputs = [window for window in windows_inputs if len(window.items) > 0]  # Days without flexible timeslots have nothing to optimize
+
+    self.production_baseload = 0.85 * float(inputs.contracted_power)
+    day_windows = DayWindows(processes, ResultCache(ResultCache.run_path(self.path_steps_after_first)) if cache else None)
+
+    first_windows = []
+    for window in windows_inputs:
+      first_windows.append([self.optimizer, [window.dates, window.items, window.bins_capacities, window.timeslot_numbers, window.bins_maximum, window.items_max, self.production_baseload, fact, window.n_bins_per_hour, window.flexibilities], [1]])
+    begin = time.perf_counter()
+    first_outputs = day_windows.solve(first_windows)
+    first_time = time.perf_counter() - begin
+
+    # Remove all the consumption (all timeslots - placed and not placed ones)
+    # Add the consumption of the placed timeslots (just the ones that were placed by the optimization process)
+    # The items strings of the Knapsack are parsed once
+    placed_windows = [TimeslotItems.from_strings(output[0]) for output in first_outputs]
+    not_placed_windows = [TimeslotItems.from_strings(output[1]) for output in first_outputs]
+    self.step_stats = [self.get_step_stats(1, first_time, [window.items for window in windows_inputs], TimeslotItems.concatenate(placed_windows), 0)]
+    self.placed_timeslots = TimeslotItems.concatenate(placed_windows)
+    self.not_placed_timeslots = TimeslotItems.concatenate(not_placed_windows)
+
+    # showNetloadGraph('output/minute/netload.csv')
+
+    # The profiles after the 1st step are written in background and kept in memory for the 2nd step
+    updt = self.create_profiles_after_strategy(self.placed_timeslots, self.timeslots, self.path_steps_minutes, self.path_steps_after_first, self.path_steps_minutes.split("/")[-1], self.path_steps_after_first.split("/")[-1], True, inputs.n_bins_per_hour, fact, background_flush=True)
+    self.placed_timeslots_array = updt[0]
+    df_flexible = updt[1]
+    first_workspace = updt[2]
+    minutes_workspace = updt[3]
+
+    # Netload after the 1st step (from memory, it is not read again from the file)
+    netload_second_optim = first_workspace.dataframe('netload.csv')
+
+    second_windows = []
+    second_items = []
+    pruned_windows = []
+    pruned = 0
+    for window, placed, not_placed in zip(windows_inputs, placed_windows, not_placed_windows):
+
+      # prepare dates and timeslots for the second optimization (the ones that were not placed in the first optimization)
+      dates_second_optim, items_second_optim, numbers_second_optim, items_max_second_optim, flexibilities_second_optim = not_placed.group_by_timeslot()
+
+      # Update Production after first optimization (in order to update bin capacities)
+      # Remove flexible consumption from netload (update production after optimization by removing placed timeslots consumption
+      bins_capacities_second_optimization = self.calculate_bin_used_capacity(window.bins_capacities, placed, self.production_baseload, window.n_bins_per_hour)
+      bins_maximum_second_optimization = self.get_production_max_after_first_optimization(netload_second_optim, window.first_date, self.production_baseload, window.n_bins_per_hour, fact)
+
+      # The timeslots which can not fit in the residual capacities are not placed (the Knapsack does not have to consider them)
+      fitting = self.fitting_timeslots(items_second_optim, bins_capacities_second_optimization)
+      pruned_numbers = [numbers[0] for numbers, fits in zip(numbers_second_optim, fitting) if not fits]
+      pruned_windows.append(TimeslotItems(not_placed.records[np.isin(not_placed['number'], pruned_numbers)]))
+      pruned += len(pruned_numbers)
+      second_items += items_second_optim
+      dates_second_optim, items_second_optim, numbers_second_optim, items_max_second_optim, flexibilities_second_optim = [
+        [values for values, fits in zip(group, fitting) if fits]
+        for group in [dates_second_optim, items_second_optim, numbers_second_optim, items_max_second_optim, flexibilities_second_optim]]
+
+
+      OptimizationLog.dump(logger, 'second_inputs', {'Community Flexibilities (2nd)': flexibilities_second_optim, 'Bin Capacities (2nd)': bins_capacities_second_optimization,
+                                                     'Bin Maximum (2nd)': bins_maximum_second_optimization, 'Dates (2nd)': dates_second_optim,
+                                                     'Timeslots (2nd)': items_second_optim, 'Timeslots Maximum (2nd)': items_max_second_optim,
+                                                     'Numbers (2nd)': numbers_second_optim})
+
+      # showNetloadGraph('output/afteroptimization/netload.csv')
+
+      if (len(items_second_optim) > 0 and len(dates_second_optim) > 0):
+        second_windows.append([self.optimizer, [dates_second_optim, items_second_optim, bins_capacities_second_optimization, numbers_second_optim,
+                                          bins_maximum_second_optimization, items_max_second_optim, self.production_baseload, fact,
+                                          window.n_bins_per_hour, flexibilities_second_optim], [2]])
+
+    if (len(second_windows) > 0):
+      # Second Optimization
+      begin = time.perf_counter()
+      second_outputs = day_windows.solve(second_windows)
+      second_time = time.perf_counter() - begin
+
+      self.second_placed_timeslots = TimeslotItems.concatenate([output[0] for output in second_outputs])
+      self.second_not_placed_timeslots = TimeslotItems.concatenate([output[1] for output in second_outputs] + pruned_windows)
+      self.step_stats.append(self.get_step_stats(2, second_time, [second_items], self.second_placed_timeslots, pruned))
+
+      OptimizationLog.dump(logger, 'not_placed', {'Not Placed 2nd': self.second_not_placed_timeslots.records})
+
+      updt = self.create_profiles_after_strategy(self.second_placed_timeslots, self.timeslots,
+                                                   self.path_steps_after_first, self.path_steps_after_second,
+                                                   self.path_steps_after_first.split("/")[-1], self.path_steps_after_second.split("/")[-1], False, inputs.n_bins_per_hour,
+                                                   fact, first_workspace, minutes_workspace)
+      self.second_placed_timeslots_array = updt[0]
+      # showNetloadGraph('output/aftersecoptimization/netload.csv')
+    else:
+      first_workspace.wait()
+
+    # print(timeslots)
+    # community = ConsumptionGenerator.get_community()
+    # ConsumptionGenerator.show_community_graph(community, 'output/minute/house')
+    # ConsumptionGenerator.show_community_graph(community, 'output/afteroptimization/house')
+
+    return [df_flexible]
+
+
+  def fitting_timeslots(self, items, bins_capacities):
+    """
+    Checks which timeslots of the 2nd step can still fit in the residual bin capacities of the 1st step (dominance pruning).
+    A timeslot whose heaviest item is heavier than the largest capacity of the bins, or whose items together are heavier than the capacity of all the bins, can not be placed in any bin, so it does not have to be given to the Knapsack.
+
+    Args:
+      items: array of the weights of the items of each timeslot
+      bins_capacities: residual capacity of each bin (see calculate_bin_used_capacity)
+
+    Returns:
+      array with True for each timeslot which can fit in the bins, otherwise False
+    """
+    capacities = np.array(bins_capacities, dtype=float)
+    if (len(capacities) == 0 or not np.isfinite(capacities).all()):
+      return [True] * len(items)
+
+    largest = capacities.max()
+    total = np.clip(capacities, 0, None).sum()
+    return [len(weights) > 0 and max(weights) <= largest and sum(weights) <= total for weights in items]
+
+
+  def get_step_stats(self, step, seconds, windows_items, placed_timeslots, pruned):
+    """
+    Logs and returns the time and the quality (placed timeslots and weight) of a step of the optimization
+
+    Args:
+      step: number of the step (1 or 2)
+      seconds: time of the optimization of all the windows of the step
+      windows_items: array with the weights of the items of each timeslot of each window (all the timeslots given to the step, including the pruned ones)
+      placed_timeslots: TimeslotItems with the placed items of the step
+      pruned: number of timeslots which were not given to the Knapsack since they could not fit (see fitting_timeslots)
+
+    Returns:
+      dictionary with the step, time, number of timeslots, placed timeslots, pruned timeslots, weight of all the items and weight of the placed items
+    """
+    weights = [weights for items in windows_items for weights in items]
+    stats = {"step": step, "time": seconds, "timeslots": len(weights), "placed": len(np.unique(placed_timeslots['number'])), "pruned": pruned,
+             "weight": float(sum(sum(timeslot) for timeslot in weights)), "placed_weight": float(np.sum(placed_timeslots['weight']))}
+    logger.info("Step %d: %.3f s, %d of %d timeslots placed (%d pruned), %.1f of %.1f weight placed", step, seconds, stats["placed"], stats["timeslots"],
+                pruned, stats["placed_weight"], stats["weight"])
+    return stats
@@ -0,0 +1,187 @@
+import os
+import json
+import shutil
+
+
+class CopyOnWriteFolder:
+
+  MANIFEST = '.overlay'
+  OVERLAYS = '.overlays'  # List of the overlay folders created from a folder (see invalidate)
+
+  def __init__(self, initial_path, final_path):
+    """
+    Output folder (e.g. afteroptimization) created as an overlay of other folder (e.g. minute), instead of a full copy.
+    The files are hardlinked to the files of the initial folder, so only the files which are changed use space (they have to be replaced, see replace_file, and never written in place).
+    If a file can not be hardlinked (e.g. the folders are in different disks), it is not copied: it is listed in a manifest and resolved from the initial folder (see resolve).
+    The overlay folders created from a folder have to be removed before its files are written again (see invalidate), otherwise they would show the new files of the initial folder with their old changed files.
+
+    Args:
+      initial_path: path of the folder with the profiles to copy (e.g. "(...)/output/minute")
+      final_path: path of the folder to create (e.g. "(...)/output/afteroptimization")
+    """
+    self.initial_path = initial_path
+    self.final_path = final_path
+
+
+  def create(self):
+    """
+    Removes the final folder (if it exists) and creates it again as an overlay of the initial folder (and adds it to the overlays of the initial folder, see invalidate)
+    """
+    if os.path.exists(self.final_path):
+      shutil.rmtree(self.final_path)
+    os.makedirs(self.final_path)
+
+    resolved_files = []
+
+    for root, dirs, files in os.walk(self.initial_path):
+      relative_root = os.path.relpath(root, self.initial_path)
+      final_root = os.path.normpath(os.path.join(self.final_path, relative_root))
+
+      for directory in dirs:
+        os.makedirs(os.path.join(final_root, directory), exist_ok=True)
+
+      for file_name in files:
+        if (relative_root == '.' and file_name in [self.MANIFEST, self.OVERLAYS]):
+          continue
+        try:
+          os.link(os.path.join(root, file_name), os.path.join(final_root, file_name))
+        except OSError:
+          resolved_files.append(self.relative_name(relative_root, file_name))
+
+    # Files that the initial folder also resolves from its own initial folder
+    manifest = self.read_manifest(self.initial_path)
+    if (manifest is not None):
+      resolved_files.extend(manifest["files"])
+
+    if (len(resolved_files) > 0):
+      manifest = {"parent": os.path.relpath(self.initial_path, self.final_path).replace(os.sep, '/'), "files": sorted(set(resolved_files))}
+      with open(os.path.join(self.final_path, self.MANIFEST), "w") as f:
+        json.dump(manifest, f)
+
+    overlays = self.read_overlays(self.initial_path)
+    relative_path = os.path.relpath(self.final_path, self.initial_path).replace(os.sep, '/')
+    if (relative_path not in overlays):
+      with open(os.path.join(self.initial_path, self.OVERLAYS), "w") as f:
+        json.dump(overlays + [relative_path], f)
+
+
+  @staticmethod
+  def relative_name(relative_root, file_name):
+    """
+    Gets the name of a file relative to the folder (always separated with "/")
+
+    Args:
+      relative_root: directory of the file relative to the folder
+      file_name: name of the file
+
+    Returns:
+      relative name of the file (e.g. "house0/total.csv")
+    """
+    if (relative_root == '.'):
+      return file_name
+    return relative_root.replace(os.sep, '/') + '/' + file_name
+
+
+  @staticmethod
+  def read_manifest(path):
+    """
+    Reads the manifest of a folder
+
+    Args:
+      path: path of the folder
+
+    Returns:
+      dictionary with the parent folder ("parent") and the files resolved from it ("files"), or None if the folder has no manifest
+    """
+    manifest_path = os.path.join(path, CopyOnWriteFolder.MANIFEST)
+    if (not os.path.isfile(manifest_path)):
+      return None
+    with open(manifest_path, "r") as f:
+      return json.load(f)
+
+
+  @staticmethod
+  def read_overlays(path):
+    """
+    Reads the overlay folders created from a folder
+
+    Args:
+      path: path of the folder
+
+    Returns:
+      array with the paths of the overlay folders, relative to the folder (empty if none was created)
+    """
+    overlays_path = os.path.join(path, CopyOnWriteFolder.OVERLAYS)
+    if (not os.path.isfile(overlays_path)):
+      return []
+    with open(overlays_path, "r") as f:
+      return json.load(f)
+
+
+  @staticmethod
+  def invalidate(path):
+    """
+    Removes the overlay folders created from a folder (and the ones created from them, e.g. aftersecoptimization from afteroptimization), before the files of the folder are written again (e.g. by a new simulation):
+    their unchanged files are hardlinks to the files of the folder (or resolved from it), so the files written in place would also change in them
+
+    Args:
+      path: path of the folder (e.g. "(...)/output/minute")
+
+    Returns:
+      array with the paths of the removed folders
+    """
+    removed = []
+    for relative_path in CopyOnWriteFolder.read_overlays(path):
+      overlay_path = os.path.normpath(os.path.join(path, relative_path))
+      if (os.path.isdir(overlay_path)):
+        removed.extend(CopyOnWriteFolder.invalidate(overlay_path))
+        shutil.rmtree(overlay_path)
+        removed.append(overlay_path)
+
+    overlays_path = os.path.join(path, CopyOnWriteFolder.OVERLAYS)
+    if (os.path.isfile(overlays_path)):
+      os.remove(overlays_path)
+    return removed
+
+
+  @staticmethod
+  def resolve(path):
+    """
+    Gets the path where a file of a folder really is (the path itself, or the path in the parent folder if the file is listed in the manifest of an overlay folder)
+
+    Args:
+      path: path of the file
+
+    Returns:
+      path to read the file from (the given path if the file is not found)
+    """
+    if (os.path.isfile(path)):
+      return path
+
+    folder = os.path.dirname(os.path.abspath(path))
+    while True:
+      manifest = CopyOnWriteFolder.read_manifest(folder)
+      if (manifest is not None):
+        relative = os.path.relpath(os.path.abspath(path), folder).replace(os.sep, '/')
+        if (relative in manifest["files"]):
+          return CopyOnWriteFolder.resolve(os.path.normpath(os.path.join(folder, manifest["parent"], relative)))
+        return path
+
+      parent = os.path.dirname(folder)
+      if (parent == folder):
+        return path
+      folder = parent
+
+
+  @staticmethod
+  def replace_file(path, write):
+    """
+    Writes a file of an overlay folder by replacing it (a new file is written and moved to the path), so that the hardlinked file of the initial folder is not changed
+
+    Args:
+      path: path of the file
+      write: function which writes the file to the path it receives
+    """
+    tmp_path = path + '.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
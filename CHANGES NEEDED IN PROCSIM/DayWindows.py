@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class DayWindows:
+
+  def __init__(self, processes=None, cache=None):
+    """
+    Solves the optimization of independent windows (e.g. the days of the simulation) concurrently, in a pool of processes (one window per process).
+    The windows do not share bins, so the placements of each window are independent and can be merged after all the windows are solved.
+
+    Args:
+      processes: maximum number of processes (if None, the number of CPUs of the machine; if 1, the windows are solved one after the other, in this process)
+      cache: ResultCache with the outputs of the windows solved before (if None, all the windows are solved)
+    """
+    self.processes = processes if processes is not None else (os.cpu_count() or 1)
+    self.cache = cache
+
+
+  def solve(self, windows):
+    """
+    Solves the optimization of each window (if there is a cache, only the windows which are not in it, the outputs of the others are read from it)
+
+    Args:
+      windows: array of the windows to solve, each one an array with 3 positions: optimizer class [0] (e.g. Knapsack, or a function which creates the optimizer, e.g. MinimizeCostsPyomo.create_optimizer), arguments of the optimizer [1] and arguments of its execute_knapsack function [2] (and, optionally, the SolverOptions of the optimizer [3], see solve_window)
+
+    Returns:
+      array with the output of each window (in the same order), see solve_window
+    """
+    if (self.cache is None):
+      return self.solve_windows(windows)
+
+    keys = [self.cache.key(window) for window in windows]
+    outputs = [self.cache.load(key) for key in keys]
+    missing = [index for index, output in enumerate(outputs) if output is None]
+    for index, output in zip(missing, self.solve_windows([windows[index] for index in missing])):
+      self.cache.save(keys[index], output)
+      outputs[index] = output
+    return outputs
+
+
+  def solve_windows(self, windows):
+    """
+    Solves the optimization of each window (in this process or in the pool of processes)
+
+    Args:
+      windows: array of the windows to solve (see solve)
+
+    Returns:
+      array with the output of each window (in the same order), see solve_window
+    """
+    if (self.processes <= 1 or len(windows) <= 1):
+      return [self.solve_window(window) for window in windows]
+
+    with ProcessPoolExecutor(max_workers=min(self.processes, len(windows))) as pool:
+      return list(pool.map(DayWindows.solve_window, windows))
+
+
+  @staticmethod
+  def solve_window(window):
+    """
+    Solves the optimization of a window (it runs in the worker process, so only the output is sent back)
+
+    Args:
+      window: array with 3 positions: optimizer class [0], arguments of the optimizer [1] and arguments of its execute_knapsack function [2] (and, optionally, the SolverOptions of the optimizer [3])
+
+    Returns:
+      array with 4 positions: placed timeslots [0], not placed timeslots [1], dataframes of the optimizer [2] (empty if the optimizer has none) and statistics of the solve [3] (build and solve times, cached - False, it is True only in the outputs read from the ResultCache -, options_applied - True if the optimizer took the SolverOptions, see SolverOptions.apply - and, if there are SolverOptions, the statistics of the model, see SolverOptions.statistics)
+    """
+    optimizer_class, arguments, execute_arguments = window[0:3]
+    solver_options = window[3] if len(window) > 3 else None
+
+    begin = time.perf_counter()
+    optimizer = optimizer_class(*arguments)
+    build_time = time.perf_counter() - begin
+    applied = solver_options.apply(optimizer) if solver_options is not None else False
+
+    begin = time.perf_counter()
+    otimization = optimizer.execute_knapsack(*execute_arguments)
+    stats = {"build_time": build_time, "solve_time": time.perf_counter() - begin, "cached": False, "options_applied": applied}
+    if (solver_options is not None):
+      stats.update(solver_options.statistics(optimizer))
+
+    return [otimization[1], otimization[2], getattr(optimizer, 'dataframes', {}), stats]
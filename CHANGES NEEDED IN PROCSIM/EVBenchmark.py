@@ -0,0 +1,94 @@
+import time
+import types
+import shutil
+import tempfile
+import pandas as pd
+from EVInputs import EVInputs
+from DayWindows import DayWindows
+from GreedyBenchmark import GreedyBenchmark
+from OptimizationInputs import OptimizationInputs
+
+
+class EVBenchmark:
+
+  def __init__(self, path, n_timeslots=50, seed=0):
+    """
+    Benchmark of the inputs of the EVs (EVInputs) and of the model of the MinimizeCostsPyomo (KnapsackBalancing, if it is installed) as the number of EVs grows, with synthetic inputs.
+
+    Args:
+      path: folder where the synthetic inputs of the EVs and of the storage are created
+      n_timeslots: number of flexible timeslots of the synthetic window
+      seed: seed of the random generator
+    """
+    self.path = path
+    self.seed = seed
+    self.window = self.create_window(n_timeslots)
+
+
+  def create_window(self, n_timeslots):
+    """
+    Creates the inputs of a synthetic window of one house (with the same attributes as the inputs of CommunityManager.prepare_inputs)
+
+    Args:
+      n_timeslots: number of flexible timeslots of the window
+
+    Returns:
+      inputs of the window
+    """
+    dates, items, bins_capacities, numbers, bins_maximum, items_max, production_baseload, fact, n_bins_per_hour, flexibilities = GreedyBenchmark(seed=self.seed).create_window(n_timeslots)
+    return types.SimpleNamespace(first_date='2030-01-01', dates=dates, items=items, bins_capacities=bins_capacities, timeslot_numbers=numbers, bins_maximum=bins_maximum,
+                                 items_max=items_max, n_bins_per_hour=n_bins_per_hour, flexibilities=flexibilities, bins_export_prices=[0.05] * len(bins_capacities),
+                                 bins_import_prices=[0.15] * len(bins_capacities), s_max=None, s_min=None, s_initial_soc=None, num_houses=1,
+                                 houses_production=[[capacity] for capacity in bins_capacities], house_items=[items], house_items_max=[items_max],
+                                 house_items_date=[dates], house_items_num=[numbers], house_items_flex=[flexibilities], house_s_soc=[[10000.0]],
+                                 house_s_max=[[20000.0]], house_s_min=[[2000.0]])
+
+
+  def run(self, num_evs, solve=True):
+    """
+    Creates and reads the inputs of num_evs EVs and (if the KnapsackBalancing is installed and solve is True) builds and solves the model of the synthetic window
+
+    Args:
+      num_evs: number of EVs
+      solve: if True, the model is built and solved
+
+    Returns:
+      dictionary with the time to read the inputs ("read"), the bytes of the availability and travels matrices ("bits" - as bit matrices, "dense" - all the hours unpacked)
+      and the time to build and solve the model ("build" and "solve", None if the model was not solved)
+    """
+    EVInputs.create(self.path, num_evs, seed=self.seed)
+    begin = time.perf_counter()
+    ev_inputs = EVInputs(OptimizationInputs(self.path))
+    results = {"read": time.perf_counter() - begin, "bits": ev_inputs.availability_bits.nbytes + ev_inputs.is_traveling_bits.nbytes,
+               "dense": ev_inputs.availability().nbytes + ev_inputs.is_traveling().nbytes, "build": None, "solve": None}
+
+    if (solve):
+      try:
+        from MinimizeCostsPyomo import MinimizeCostsPyomo  # It needs the KnapsackBalancing (and the rest of the procsim)
+      except ImportError:
+        return results
+
+      storage = pd.read_csv(self.path + '/s_inputs.csv').to_numpy() * 1000
+      self.window.s_initial_soc, self.window.s_min, self.window.s_max = storage[:,0], storage[:,1], storage[:,2]
+      optimization = MinimizeCostsPyomo(None, self.path, self.path, self.path)
+      optimization.production_baseload = 0.0
+      evs = {'initial_soc': ev_inputs.initial_soc, 'evs_min': ev_inputs.evs_min, 'evs_max': ev_inputs.evs_max, 'evs_trip': ev_inputs.evs_trip,
+             'ev_inputs': ev_inputs, 'efficiency': 0.97, 'p_charger': 7200,
+             'p_grid_max': 10000, 'degradation_cost': 0.08, 'num_evs': ev_inputs.num_evs, 'num_ess': ev_inputs.num_ess}
+      stats = DayWindows.solve_window(optimization.get_window(self.window, 60 // self.window.n_bins_per_hour, evs, None)[0:3])[3]
+      results["build"], results["solve"] = stats["build_time"], stats["solve_time"]
+    return results
+
+
+if __name__ == '__main__':
+  path = tempfile.mkdtemp()
+  try:
+    benchmark = EVBenchmark(path)
+    print("EVs | read (s) | bits (B) | dense (B) | build (s) | solve (s)")
+    for num_evs in [2, 10, 50, 100, 200, 500]:
+      results = benchmark.run(num_evs)
+      model = ["-", "-"] if results["build"] is None else ["%.3f" % results["build"], "%.3f" % results["solve"]]
+      print(str(num_evs).rjust(3) + " | " + ("%.3f" % results["read"]).rjust(8) + " | " + str(results["bits"]).rjust(8) + " | " + str(results["dense"]).rjust(9) + " | "
+            + model[0].rjust(9) + " | " + model[1])
+  finally:
+    shutil.rmtree(path)
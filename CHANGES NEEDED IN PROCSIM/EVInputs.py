@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pandas as pd
+
+
+class EVInputs:
+
+  def __init__(self, run_inputs):
+    """
+    Inputs of the EVs and of the storage of a community (EVs_Inputs.csv, alpha.csv, S.csv and s_inputs.csv of the run, if they exist, otherwise the global ones - see OptimizationInputs.static_file).
+    The number of EVs is the number of rows of EVs_Inputs.csv (one per EV) and the number of batteries (ESS) is the number of rows of s_inputs.csv, so they are not fixed.
+    The availability (alpha.csv) and the travels (S.csv) of the EVs are 0/1 matrices (one row per EV and one column per hour), kept as bit matrices (8 hours per byte) in the inputs of the windows
+    and only the hours of a window are unpacked when its model is built (see MinimizeCostsPyomo.create_optimizer).
+
+    Args:
+      run_inputs: OptimizationInputs of the run
+    """
+    evs = pd.read_csv(run_inputs.static_file('EVs_Inputs.csv')).to_numpy()
+    self.initial_soc = evs[:,0] * 1000
+    self.evs_min = evs[:,1] * 1000
+    self.evs_max = evs[:,2] * 1000
+    self.evs_trip = evs[:,3] * 1000
+    self.num_evs = len(evs)
+    self.num_ess = len(pd.read_csv(run_inputs.static_file('s_inputs.csv')))
+
+    availability = pd.read_csv(run_inputs.static_file('alpha.csv')).to_numpy()
+    is_traveling = pd.read_csv(run_inputs.static_file('S.csv')).to_numpy()
+    for name, matrix in [('alpha.csv', availability), ('S.csv', is_traveling)]:
+      if (len(matrix) != self.num_evs):
+        raise ValueError(name + " has " + str(len(matrix)) + " rows, but there are " + str(self.num_evs) + " EVs in EVs_Inputs.csv (it has to have one row per EV)")
+
+    self.hours = [availability.shape[1], is_traveling.shape[1]]
+    self.availability_bits = np.packbits(availability != 0, axis=1)
+    self.is_traveling_bits = np.packbits(is_traveling != 0, axis=1)
+
+
+  @staticmethod
+  def unpack(bits, columns, hours=None):
+    """
+    Unpacks the first hours of a bit matrix (only the bytes of those hours)
+
+    Args:
+      bits: bit matrix (8 hours per byte)
+      columns: number of hours of the matrix
+      hours: number of hours to unpack (if None, all of them)
+
+    Returns:
+      0/1 matrix with one row per EV and one column per hour
+    """
+    hours = columns if hours is None else min(hours, columns)
+    return np.unpackbits(bits[:, :(hours + 7) // 8], axis=1, count=hours).astype(np.int64)
+
+
+  def availability(self, hours=None):
+    """
+    Args:
+      hours: number of hours to unpack, from the first one (if None, all of them)
+
+    Returns:
+      matrix with the availability of each EV (row) in each hour (column), 1 if it is available to charge, otherwise 0
+    """
+    return self.unpack(self.availability_bits, self.hours[0], hours)
+
+
+  def is_traveling(self, hours=None):
+    """
+    Args:
+      hours: number of hours to unpack, from the first one (if None, all of them)
+
+    Returns:
+      matrix with the travels of each EV (row) in each hour (column), 1 if it is traveling, otherwise 0
+    """
+    return self.unpack(self.is_traveling_bits, self.hours[1], hours)
+
+
+  @staticmethod
+  def create(path, num_evs, num_ess=1, hours=24, seed=0):
+    """
+    Creates a synthetic set of inputs of the EVs and of the storage (e.g. in the inputs folder of a run, to optimize a community with many EVs)
+    Each EV travels twice a day (away from the community between the travels) and is available to charge when it is parked in the community
+
+    Args:
+      path: folder where the files are created (EVs_Inputs.csv, alpha.csv, S.csv and s_inputs.csv)
+      num_evs: number of EVs
+      num_ess: number of batteries
+      hours: number of hours of the availability and travels matrices
+      seed: seed of the random generator
+    """
+    random = np.random.default_rng(seed)
+    os.makedirs(path, exist_ok=True)
+
+    capacity = random.uniform(40, 80, num_evs).round(2)
+    pd.DataFrame({'Esoc': (capacity * random.uniform(0.3, 0.9, num_evs)).round(2), 'EEVmin': 1.5, 'EEVmax': capacity,
+                  'Etrip': random.uniform(1, 8, num_evs).round(2)}).to_csv(path + '/EVs_Inputs.csv', index=False)
+
+    availability = np.zeros((num_evs, hours), dtype=np.int64)
+    is_traveling = np.zeros((num_evs, hours), dtype=np.int64)
+    for ev in range(num_evs):
+      for day in range(0, hours, 24):
+        leave = day + int(random.integers(6, 10))
+        back = day + int(random.integers(16, 20))
+        availability[ev, day:min(leave, hours)] = 1
+        availability[ev, min(back + 1, hours):min(day + 24, hours)] = 1
+        is_traveling[ev, [hour for hour in (leave, back) if hour < hours]] = 1
+
+    columns = [str(hour + 1) for hour in range(hours)]
+    pd.DataFrame(availability, columns=columns).to_csv(path + '/alpha.csv', index=False)
+    pd.DataFrame(is_traveling, columns=columns).to_csv(path + '/S.csv', index=False)
+    pd.DataFrame({'Ssoc': [10] * num_ess, 'Smin': [2] * num_ess, 'Smax': [20] * num_ess}).to_csv(path + '/s_inputs.csv', index=False)
@@ -0,0 +1,72 @@
+class FlexibleConsumptionRemover:
+
+  def __init__(self, workspace):
+    """
+    Engine which removes the consumption of the flexible timeslots from the consumption profiles of a folder (appliances, houses total, community and netload).
+    Each timeslot is converted into a positional slice of the minute timeline and the whole interval is subtracted at once.
+
+    Args:
+      workspace: ProfileWorkspace of the consumption profiles to update (e.g. of "(...)/output/afteroptimization")
+    """
+    self.workspace = workspace
+
+
+  def subtract(self, profile, column, start, end, values):
+    """
+    Subtracts an array of values from the interval [start, end] of a column (the same as doing it minute by minute)
+
+    Args:
+      profile: array with the dataframe to update [0] and its MinuteTimeline [1]
+      column: name of the column to update
+      start: first minute of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      end: last minute of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      values: array with one value per minute of the interval
+    """
+    df, timeline = profile
+    rows = timeline.interval(start, end)
+    column_index = df.columns.get_loc(column)
+    updated = df.iloc[rows, column_index].to_numpy(dtype=float) - values
+    if (self.workspace.compact):
+      updated = updated.astype(df.dtypes.iloc[column_index], copy=False)  # Kept as float32
+    elif (df.dtypes.iloc[column_index].kind != 'f' and (updated % 1 != 0).any()):
+      df[column] = df[column].astype(float)  # Fractional values change an integer column to float64 (as the pandas arithmetic did)
+    df.iloc[rows, column_index] = updated
+
+
+  def remove(self, flexible_timeslots):
+    """
+    Removes the consumption of the flexible timeslots (the timeslots are applied in order, as if it was done minute by minute).
+    The updated profiles are marked as dirty in the workspace (they are written when the workspace is flushed).
+
+    Args:
+      flexible_timeslots: array of the flexible timeslots (Start, End, Appliance, House, etc)
+
+    Returns:
+      netload dataframe with the non-flexible consumption
+    """
+    workspace = self.workspace
+    netload = workspace.netload()
+    community = workspace.community()
+    workspace.mark_dirty('netload.csv')
+    workspace.mark_dirty('community.csv')
+
+    for timeslot in flexible_timeslots:
+
+      total = workspace.total(timeslot["House"])
+      df_appliance, appliance_timeline = workspace.appliance(timeslot["House"], timeslot["Appliance"])
+      workspace.mark_dirty(workspace.house_file(timeslot["House"], 'total'))
+      workspace.mark_dirty(workspace.house_file(timeslot["House"], timeslot["Appliance"]))
+
+      appliance_rows = appliance_timeline.interval(timeslot["Start"], timeslot["End"])
+      appliance_power = df_appliance['Power'].iloc[appliance_rows].to_numpy(dtype=float)
+
+      # Update house total consumption, community consumption and community netload
+      self.subtract(total, 'Power', timeslot["Start"], timeslot["End"], appliance_power)
+      self.subtract(community, 'Power', timeslot["Start"], timeslot["End"], appliance_power)
+      self.subtract(netload, 'Demand', timeslot["Start"], timeslot["End"], appliance_power)
+
+      # Update appliance consumption - has to be the last update since the others dataframes use this dataframe
+      df_appliance.iloc[appliance_rows, df_appliance.columns.get_loc('Power')] = 0
+
+    # Copy, since the netload of the workspace can still be updated after removing the flexible consumption
+    return workspace.dataframe('netload.csv')
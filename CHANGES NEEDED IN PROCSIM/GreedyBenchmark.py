@@ -0,0 +1,104 @@
+import time
+import importlib
+import numpy as np
+from GreedyKnapsack import GreedyKnapsack
+
+
+class GreedyBenchmark:
+
+  FLEXIBILITIES = [12, 8, 10, 5, 5, 1]  # Flexibility (hours) of the appliances (see CommunityManager.prepare_inputs)
+
+  def __init__(self, n_bins_per_hour=1, seed=0):
+    """
+    Benchmark of the heuristic (GreedyKnapsack) against the exact method (Knapsack), with synthetic windows (timeslots and bin capacities of a day).
+    The quality is the placed weight (the objective of the 1st step), the gap is the weight placed by the exact method and not by the heuristic (relative to the exact one).
+    Both methods solve the same problem (each timeslot can only be shifted up to n_bins_per_hour * flexibility bins), so the gap is only negative if the exact method stops before the optimum (e.g. at its time limit).
+
+    Args:
+      n_bins_per_hour: number of bins per hour
+      seed: seed of the random generator
+    """
+    self.n_bins_per_hour = n_bins_per_hour
+    self.n_bins = 24 * n_bins_per_hour
+    self.random = np.random.default_rng(seed)
+
+
+  def create_window(self, n_timeslots):
+    """
+    Creates the inputs of a synthetic window (the production of the day is a sinusoid which can take about half of the weight of the timeslots and the flexibility of each timeslot is the one of an appliance, see FLEXIBILITIES)
+
+    Args:
+      n_timeslots: number of flexible timeslots of the window
+
+    Returns:
+      array with the arguments of the optimizer (see GreedyKnapsack)
+    """
+    dates, items, numbers, items_max, flexibilities = [], [], [], [], []
+    for number in range(n_timeslots):
+      length = int(self.random.integers(1, 3 * self.n_bins_per_hour + 1))
+      first = int(self.random.integers(1, self.n_bins - length + 2))
+      weights = self.random.uniform(100, 2000, length).round(3)
+      dates.append(list(range(first, first + length)))
+      items.append(weights.tolist())
+      numbers.append([number] * length)
+      items_max.append((weights * 1.2).tolist())
+      flexibilities.append([float(self.random.choice(self.FLEXIBILITIES))] * length)
+
+    total = sum(sum(weights) for weights in items)
+    production = np.clip(np.sin(np.linspace(0, np.pi, self.n_bins)), 0, None)
+    bins_capacities = (production / production.sum() * total * 0.5).tolist()
+    return [dates, items, bins_capacities, numbers, [capacity * 1.2 for capacity in bins_capacities], items_max, 0.0, 60 // self.n_bins_per_hour,
+            self.n_bins_per_hour, flexibilities]
+
+
+  @staticmethod
+  def solve(optimizer_class, window):
+    """
+    Solves a window with an optimizer
+
+    Args:
+      optimizer_class: class of the optimizer (e.g. GreedyKnapsack or Knapsack)
+      window: arguments of the optimizer (see create_window)
+
+    Returns:
+      array with 2 positions: time of the solve in seconds [0] and placed weight [1]
+    """
+    begin = time.perf_counter()
+    output = optimizer_class(*window).execute_knapsack(1)
+    seconds = time.perf_counter() - begin
+    return [seconds, float(sum(float(item.split("-")[2]) for item in output[1]))]
+
+
+  def run(self, n_timeslots, exact=True):
+    """
+    Solves a synthetic window with the heuristic and (if it is installed and exact is True) with the exact method
+
+    Args:
+      n_timeslots: number of flexible timeslots of the window
+      exact: if True, the window is also solved with the Knapsack
+
+    Returns:
+      dictionary with the time and placed weight of each method ("greedy_time", "greedy_weight", "exact_time", "exact_weight") and the gap (None if the exact method was not run)
+    """
+    window = self.create_window(n_timeslots)
+    results = dict(zip(["greedy_time", "greedy_weight"], self.solve(GreedyKnapsack, window)))
+    results.update({"exact_time": None, "exact_weight": None, "gap": None})
+
+    if (exact):
+      try:
+        knapsack = importlib.import_module('Knapsack').Knapsack
+      except ImportError:
+        return results
+      results["exact_time"], results["exact_weight"] = self.solve(knapsack, window)
+      results["gap"] = (results["exact_weight"] - results["greedy_weight"]) / max(results["exact_weight"], 1e-10)
+    return results
+
+
+if __name__ == '__main__':
+  benchmark = GreedyBenchmark()
+  print("timeslots | greedy (s) | greedy weight | exact (s) | exact weight | gap")
+  for n_timeslots in [50, 200, 1000, 5000]:
+    results = benchmark.run(n_timeslots, exact=n_timeslots <= 200)
+    exact = ["-", "-", "-"] if results["gap"] is None else ["%.3f" % results["exact_time"], "%.1f" % results["exact_weight"], "%.2f%%" % (100 * results["gap"])]
+    print(str(n_timeslots).rjust(9) + " | " + ("%.3f" % results["greedy_time"]).rjust(10) + " | " + ("%.1f" % results["greedy_weight"]).rjust(13) + " | "
+          + exact[0].rjust(9) + " | " + exact[1].rjust(12) + " | " + exact[2])
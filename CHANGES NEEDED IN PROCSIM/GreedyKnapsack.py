@@ -0,0 +1,195 @@
+import time
+import numpy as np
+
+
+class GreedyKnapsack:
+
+  def __init__(self, dates, items, bins_capacities, timeslot_numbers, bins_maximum, items_max, production_baseload, fact, n_bins_per_hour, flexibilities, time_limit=2, max_candidates=10):
+    """
+    Heuristic for the placement of the timeslots in the bins (same inputs and output as the Knapsack, so it can replace it in the strategy), for communities too large for the exact methods.
+    The timeslots are sorted by weight and placed one by one (best fit), then a local search tries to place the timeslots which were not placed by moving the placed ones (see execute_knapsack).
+    Each timeslot is shifted as a whole (all its items the same number of bins) inside its day and its flexibility (see get_shifts) and the weight of the items placed in a bin can not exceed its capacity.
+
+    Args:
+      dates: array with the bins of the items of each timeslot (bin 1 corresponds to midnight)
+      items: array with the weights of the items of each timeslot
+      bins_capacities: capacity of each bin
+      timeslot_numbers: array with the number of the timeslot of each item of each timeslot
+      bins_maximum: maximum production of each bin
+      items_max: array with the maximum power of the items of each timeslot
+      production_baseload: energy that can be acquired from the grid (not used, the capacities of the 2nd step already include it)
+      fact: minutes of each bin
+      n_bins_per_hour: number of bins per hour
+      flexibilities: array with the flexibility of the items of each timeslot (in hours, as in the Knapsack: each timeslot can only be shifted up to n_bins_per_hour * flexibility bins, the timeslots with flexibility 0 can only stay in their bins)
+      time_limit: maximum time (in seconds) of the local search
+      max_candidates: maximum number of placed timeslots (the lightest ones) tried to place each timeslot which was not placed in the local search
+    """
+    self.dates = dates
+    self.items = items
+    self.bins_capacities = bins_capacities
+    self.timeslot_numbers = timeslot_numbers
+    self.bins_maximum = bins_maximum
+    self.items_max = items_max
+    self.production_baseload = production_baseload
+    self.fact = fact
+    self.n_bins_per_hour = n_bins_per_hour
+    self.flexibilities = flexibilities
+    self.time_limit = time_limit
+    self.max_candidates = max_candidates
+    self.n_bins = 24 * n_bins_per_hour
+
+
+  def get_shifts(self, timeslot):
+    """
+    Gets the shifts (in bins) which keep all the items of a timeslot inside the day and inside its flexibility (up to n_bins_per_hour * flexibility bins earlier or later, as in the Knapsack)
+
+    Args:
+      timeslot: position of the timeslot in the inputs
+
+    Returns:
+      array with the possible shifts (0 first, then the closest ones)
+    """
+    bins = np.asarray(self.dates[timeslot], dtype=np.int64)
+    if (len(self.flexibilities[timeslot]) == 0 or float(self.flexibilities[timeslot][0]) <= 0):
+      return np.zeros(1, dtype=np.int64)
+    max_shift = int(self.n_bins_per_hour * float(self.flexibilities[timeslot][0]))
+    shifts = np.arange(max(1 - bins.min(), -max_shift), min(self.n_bins - bins.max(), max_shift) + 1)
+    return shifts[np.argsort(np.abs(shifts), kind='stable')]
+
+
+  def best_shift(self, timeslot, residual):
+    """
+    Gets the shift of a timeslot which fits in the residual capacities and leaves the least residual capacity in its bins (best fit, the closest shift in a tie)
+
+    Args:
+      timeslot: position of the timeslot in the inputs
+      residual: residual capacity of each bin (bin 1 is the position 0)
+
+    Returns:
+      shift of the timeslot (None if it does not fit)
+    """
+    bins = np.asarray(self.dates[timeslot], dtype=np.int64) - 1
+    weights = np.asarray(self.items[timeslot], dtype=float)
+    shifts = self.shifts[timeslot]
+    fits = residual[bins[None, :] + shifts[:, None]] >= weights[None, :] - 1e-9
+    feasible = fits.all(axis=1)
+    if (not feasible.any()):
+      return None
+    slack = (residual[bins[None, :] + shifts[:, None]] - weights[None, :]).sum(axis=1)
+    return int(shifts[np.flatnonzero(feasible)[np.argmin(slack[feasible])]])
+
+
+  def place(self, timeslot, shift, residual, sign=1):
+    """
+    Places (or removes, with sign -1) the items of a timeslot in the residual capacities
+
+    Args:
+      timeslot: position of the timeslot in the inputs
+      shift: shift of the timeslot
+      residual: residual capacity of each bin (updated)
+      sign: 1 to place the timeslot, -1 to remove it
+    """
+    bins = np.asarray(self.dates[timeslot], dtype=np.int64) - 1 + shift
+    np.subtract.at(residual, bins, sign * np.asarray(self.items[timeslot], dtype=float))
+    self.loads[timeslot, bins] = np.asarray(self.items[timeslot], dtype=float) if sign > 0 else 0
+
+
+  def execute_knapsack(self, step=1):
+    """
+    Places the timeslots in the bins:
+    1) Greedy - the timeslots are sorted by weight (heaviest first) and each one is placed in its best fit shift (see best_shift)
+    2) Local search - for each timeslot which was not placed (heaviest first), a placed timeslot of its bins is removed and both are placed again (in their best fit shifts, see relocate);
+    the move is kept if the placed weight increases (both are placed, or only the heaviest one), until there are no improving moves or the time limit is reached
+
+    Args:
+      step: step of the optimization (the 2nd step has the residual capacities of the 1st one, the method is the same)
+
+    Returns:
+      array with 3 positions: placed weight [0], placed items [1] and not placed items [2] (strings with the format "TimeslotNumber-SubItem-Weight-Bin-NumberOfBins-FirstBin-Maximum-BinBeforeOptimization-Flexibility")
+    """
+    residual = np.zeros(self.n_bins)
+    residual[:min(len(self.bins_capacities), self.n_bins)] = np.asarray(self.bins_capacities, dtype=float)[:self.n_bins]
+    weights = np.array([float(np.sum(items)) for items in self.items])
+    self.shifts = [self.get_shifts(timeslot) for timeslot in range(len(self.items))]
+    self.loads = np.zeros((len(self.items), self.n_bins))  # Weight of each placed timeslot in each bin
+
+    placement = {}
+    for timeslot in np.argsort(-weights, kind='stable'):
+      shift = self.best_shift(timeslot, residual)
+      if (shift is not None):
+        self.place(timeslot, shift, residual)
+        placement[int(timeslot)] = shift
+
+    begin = time.perf_counter()
+    improved = True
+    while (improved and time.perf_counter() - begin < self.time_limit):
+      improved = False
+      for timeslot in np.argsort(-weights, kind='stable'):
+        timeslot = int(timeslot)
+        if (timeslot in placement):
+          continue
+        if (self.relocate(timeslot, placement, residual, weights)):
+          improved = True
+        if (time.perf_counter() - begin >= self.time_limit):
+          break
+
+    placed, not_placed = [], []
+    for timeslot in range(len(self.items)):
+      shift = placement.get(timeslot, 0)
+      strings = placed if timeslot in placement else not_placed
+      first_bin = int(self.dates[timeslot][0]) + shift
+      for subitem in range(len(self.items[timeslot])):
+        strings.append("-".join(str(value) for value in [int(self.timeslot_numbers[timeslot][subitem]), subitem, float(self.items[timeslot][subitem]),
+                                                          int(self.dates[timeslot][subitem]) + shift, len(self.items[timeslot]), first_bin,
+                                                          float(self.items_max[timeslot][subitem]), int(self.dates[timeslot][subitem]),
+                                                          float(self.flexibilities[timeslot][subitem])]))
+
+    return [float(sum(weights[timeslot] for timeslot in placement)), placed, not_placed]
+
+
+  def relocate(self, timeslot, placement, residual, weights):
+    """
+    Tries to place a timeslot which was not placed: directly, if it already fits (the previous moves may have freed capacity), otherwise by removing a placed timeslot and placing it again, if it still fits (otherwise the move is only kept if the removed timeslot is lighter).
+    Only the placed timeslots whose removal frees the capacity missing in the bins where the timeslot does not fit (in its shift with the least missing capacity) are tried.
+
+    Args:
+      timeslot: position of the timeslot which was not placed
+      placement: shift of each placed timeslot (updated if the move is kept)
+      residual: residual capacity of each bin (updated if the move is kept)
+      weights: total weight of each timeslot
+
+    Returns:
+      True if the move was kept (the placed weight increased), otherwise False
+    """
+    shift = self.best_shift(timeslot, residual)
+    if (shift is not None):  # A previous move freed enough capacity
+      self.place(timeslot, shift, residual)
+      placement[timeslot] = shift
+      return True
+
+    bins = np.asarray(self.dates[timeslot], dtype=np.int64) - 1
+    shifts = self.shifts[timeslot]
+    missing = np.asarray(self.items[timeslot], dtype=float)[None, :] - residual[bins[None, :] + shifts[:, None]]
+    closest = np.argmin(np.clip(missing, 0, None).sum(axis=1))
+    failing = missing[closest] > 1e-9
+
+    candidates = np.array([other for other in placement if other != timeslot], dtype=np.int64)
+    candidates = candidates[(self.loads[candidates][:, (bins + shifts[closest])[failing]] >= missing[closest][failing] - 1e-9).all(axis=1)]
+    for other in candidates[np.argsort(weights[candidates], kind='stable')][:self.max_candidates]:
+      other = int(other)
+      shift = placement[other]
+      self.place(other, shift, residual, -1)
+      new_shift = self.best_shift(timeslot, residual)
+      if (new_shift is not None):
+        self.place(timeslot, new_shift, residual)
+        other_shift = self.best_shift(other, residual)
+        if (other_shift is not None or weights[timeslot] > weights[other]):
+          del placement[other]
+          placement[timeslot] = new_shift
+          if (other_shift is not None):
+            self.place(other, other_shift, residual)
+            placement[other] = other_shift
+          return True
+        self.place(timeslot, new_shift, residual, -1)
+      self.place(other, shift, residual)
+    return False
@@ -0,0 +1,145 @@
+import time
+import numpy as np
+import pandas as pd
+from Input import Input
+from DayWindows import DayWindows
+from TimeslotItems import TimeslotItems
+from OptimizationLog import OptimizationLog
+
+logger = OptimizationLog.get_logger('HouseDecomposition')
+
+
+class HouseDecomposition:
+
+  def __init__(self, processes=None, iterations=10, price_step=0.1, tolerance=0.01, cache=None):
+    """
+    Decomposition of the optimization of each window by house (Lagrangian relaxation of the capacities of the bins, which are the only constraint shared by the houses).
+    Each house is a subproblem (with its own timeslots, production and storage), the subproblems of all the houses (and windows) are solved in parallel (DayWindows)
+    and a coordinator adds a price to the import price of each bin (coupling price) while the weight placed by all the houses in the bin is greater than its capacity.
+    The time of the solve is bounded by the number of iterations (and by the time limit of the SolverOptions of each subproblem).
+
+    Args:
+      processes: maximum number of processes to solve the subproblems (if None, the number of CPUs)
+      iterations: maximum number of iterations of the coordinator (each iteration solves all the subproblems once), at least 1
+      price_step: increase of the coupling price of a bin for a weight placed over its capacity equal to the largest capacity of the window
+      tolerance: weight placed over the capacity of a bin (relative to the largest capacity of the window) which is accepted
+      cache: ResultCache with the outputs of the subproblems solved before (if None, all the subproblems are solved)
+    """
+    if (iterations < 1):
+      raise ValueError("The decomposition needs at least 1 iteration, not " + str(iterations))
+    self.processes = processes
+    self.iterations = iterations
+    self.price_step = price_step
+    self.tolerance = tolerance
+    self.cache = cache
+    self.history = []
+    self.converged = None
+
+
+  @staticmethod
+  def split(window, house, coupling_prices):
+    """
+    Gets the inputs of the subproblem of a house (the timeslots, production and storage of the house and the capacities of the bins of the community)
+
+    Args:
+      window: inputs of the window (see CommunityManager.prepare_inputs)
+      house: number of the house
+      coupling_prices: price added to the import price of each bin
+
+    Returns:
+      Input of the subproblem (with only one house)
+    """
+    import_prices = list(np.asarray(window.bins_import_prices, dtype=float) + coupling_prices)
+    houses_production = [[production[house]] for production in window.houses_production]
+    return Input(window.contracted_power, window.first_date, window.house_items_date[house], window.house_items[house], window.bins_capacities, window.house_items_num[house],
+                 window.bins_maximum, window.house_items_max[house], window.n_bins_per_hour, window.house_items_flex[house], window.bins_export_prices, import_prices,
+                 window.s_max, window.s_min, window.s_initial_soc, 1, houses_production, [window.house_items[house]], [window.house_items_max[house]],
+                 [window.house_items_date[house]], [window.house_items_num[house]], [window.house_items_flex[house]], [window.house_s_soc[house]],
+                 [window.house_s_max[house]], [window.house_s_min[house]])
+
+
+  @staticmethod
+  def bins_weights(placed, n_bins):
+    """
+    Gets the weight placed in each bin
+
+    Args:
+      placed: placed timeslots (TimeslotItems or array of the items strings)
+      n_bins: number of bins of the window
+
+    Returns:
+      array with the weight placed in each bin (bin 1 is the position 0)
+    """
+    records = TimeslotItems.from_strings(placed).records
+    return np.bincount(records['bin'], weights=records['weight'], minlength=n_bins + 1)[1:n_bins + 1]
+
+
+  @staticmethod
+  def merge(outputs):
+    """
+    Joins the outputs of the subproblems of a window into the output of the window
+
+    Args:
+      outputs: output of the subproblem of each house (see DayWindows.solve_window)
+
+    Returns:
+      array with 4 positions (see DayWindows.solve_window): placed [0] and not placed [1] timeslots, dataframes [2] (of all the houses, one after the other) and statistics [3] (times, objective, variables and constraints summed, largest gap, and cached and options_applied if they are True in all the subproblems)
+    """
+    dataframes = {}
+    for output in outputs:
+      for key, df in output[2].items():
+        dataframes[key] = df if key not in dataframes else pd.concat([dataframes[key], df])
+
+    stats = {}
+    for name in dict.fromkeys(name for output in outputs for name in output[3]):  # All the statistics of the subproblems (in order)
+      values = [output[3].get(name) for output in outputs]
+      if (name in ["cached", "options_applied"]):
+        stats[name] = all(bool(value) for value in values)
+      elif (any(value is None for value in values)):
+        stats[name] = None
+      else:
+        stats[name] = max(values) if name == "gap" else sum(values)
+
+    return [TimeslotItems.concatenate([output[0] for output in outputs]), TimeslotItems.concatenate([output[1] for output in outputs]), dataframes, stats]
+
+
+  def solve(self, windows_inputs, get_window):
+    """
+    Solves the windows by house, updating the coupling prices of the bins until the capacities of the bins are respected (or the maximum number of iterations is reached)
+
+    Args:
+      windows_inputs: inputs of each window (see CommunityManager.prepare_inputs)
+      get_window: function which gets the window to solve (see DayWindows.solve_window) of the inputs of a subproblem and the number of its house
+
+    Returns:
+      array with the output of each window (in the same order), see DayWindows.solve_window.
+      If the maximum number of iterations is reached with bins over their capacity, the outputs of the last iteration are returned (converged is False and a warning is logged)
+    """
+    prices = [np.zeros(len(window.bins_capacities)) for window in windows_inputs]
+    subproblems = [(index, house) for index, window in enumerate(windows_inputs) for house in range(window.num_houses)]
+    self.history = []
+    self.converged = False
+
+    for iteration in range(1, self.iterations + 1):
+      begin = time.perf_counter()
+      outputs = DayWindows(self.processes, self.cache).solve([get_window(self.split(windows_inputs[index], house, prices[index]), house) for index, house in subproblems])
+      windows_outputs = [self.merge([output for (index, house), output in zip(subproblems, outputs) if index == window]) for window in range(len(windows_inputs))]
+
+      # Subgradient step of the coupling prices (only the bins with more weight than capacity)
+      violation = 0.0
+      for index, window in enumerate(windows_inputs):
+        capacities = np.asarray(window.bins_capacities, dtype=float)
+        scale = max(np.abs(capacities).max() if len(capacities) > 0 else 0.0, 1e-10)
+        excess = (self.bins_weights(windows_outputs[index][0], len(capacities)) - capacities) / scale
+        prices[index] = np.maximum(prices[index] + self.price_step * excess, 0.0)
+        violation = max(violation, excess.max() if len(excess) > 0 else 0.0)
+
+      self.converged = violation <= self.tolerance
+      self.history.append({"iteration": iteration, "subproblems": len(subproblems), "violation": violation, "converged": self.converged, "time": time.perf_counter() - begin})
+      logger.info("Iteration %d: %d subproblems, largest excess of the bins %.4f, %.3f s", iteration, len(subproblems), violation, self.history[-1]["time"])
+      if (self.converged):
+        break
+
+    if (not self.converged):
+      logger.warning("The decomposition did not converge in %d iterations: the weight placed in some bins is over their capacity (largest excess %.4f, tolerance %.4f)", self.iterations, violation, self.tolerance)
+    return windows_outputs
@@ -0,0 +1,300 @@
+import os
+import time
+import types
+import shutil
+import tempfile
+import importlib
+import tracemalloc
+import numpy as np
+import pandas as pd
+from EVInputs import EVInputs
+from CopyOnWriteFolder import CopyOnWriteFolder
+from OptimizationInputs import OptimizationInputs
+from OptimizationLog import OptimizationLog
+
+logger = OptimizationLog.get_logger('MethodBenchmark')
+
+
+class MethodBenchmark:
+
+  APPLIANCES = ["DISHWASHER", "WASHINGMACHINE", "DRYER", "IRON", "VACUUMCLEANER"]
+  METHODS = {"Default": "CommunityManagerStrategy", "Pyomo": "MinimizeCostsPyomo", "Greedy": "CommunityManagerGreedy"}  # Module (and class) of each optimization method, by the name of the method in the frontend
+  EXPORT_PRICES = [0.05] * 24  # Export price of each hour (euros per kWh)
+  IMPORT_PRICES = [0.10] * 7 + [0.20] * 11 + [0.25] * 4 + [0.10] * 2  # Import price of each hour (euros per kWh)
+
+  def __init__(self, path, methods=None, timeslots_per_house=4, num_evs=2, processes=1, memory=True, seed=0):
+    """
+    Benchmark of the optimization methods (runtime against the quality of the result) as the size of the community, the number of days and the size of the bins grow, with synthetic communities.
+    Each method runs the whole optimization of a community (all the days, see the execute function of the method) and the outcome is evaluated on the profiles of its last step:
+    self-sufficiency and self-consumption (procsimulator Evaluation) and the cost of the energy exchanged with the grid (with the prices of EXPORT_PRICES and IMPORT_PRICES).
+    The methods which are not installed (e.g. without the Knapsack, the KnapsackBalancing or a solver) are skipped and their rows keep the error.
+
+    Args:
+      path: folder where the synthetic communities and the profiles of each run are created
+      methods: names of the methods to run (keys of METHODS), if None all of them
+      timeslots_per_house: number of flexible timeslots of each house in each day
+      num_evs: number of EVs of the community (see EVInputs.create)
+      processes: maximum number of processes of each run (1 by default, so the peak memory includes the solve of the windows, which is done in this process)
+      memory: if True, the peak memory of each run is measured (with tracemalloc, which makes the runs a bit slower)
+      seed: seed of the random generator
+    """
+    self.path = path
+    self.methods = list(self.METHODS) if methods is None else methods
+    self.timeslots_per_house = timeslots_per_house
+    self.num_evs = num_evs
+    self.processes = processes
+    self.memory = memory
+    self.seed = seed
+
+
+  def create_community(self, n_houses, days):
+    """
+    Creates a synthetic community (1/60Hz consumption and production profiles of each house, storage of each house, timeslots and inputs of the EVs) in path + "/<n_houses>houses-<days>days"
+
+    Args:
+      n_houses: number of houses of the community
+      days: number of days of the profiles
+
+    Returns:
+      dictionary with the folder of the community ("path"), the number of houses ("houses") and its flexible timeslots ("timeslots")
+    """
+    random = np.random.default_rng(self.seed)
+    community_path = self.path + '/' + str(n_houses) + 'houses-' + str(days) + 'days'
+    minutes_path = community_path + '/minute'
+    if os.path.exists(community_path):
+      shutil.rmtree(community_path)
+
+    dates = pd.date_range('2030-01-01', periods=days * 24 * 60, freq='min').astype(str).to_numpy()
+    sun = np.clip(np.sin(np.linspace(0, np.pi * days * 2, len(dates))), 0, None)
+    community = np.zeros(len(dates))
+    production = np.zeros(len(dates))
+    timeslots = []
+
+    for house in range(n_houses):
+      house_path = minutes_path + '/house' + str(house)
+      os.makedirs(house_path)
+      total = random.uniform(50, 300, len(dates)).round(3)
+
+      power = {appliance: np.zeros(len(dates)) for appliance in self.APPLIANCES}
+      for day in range(days):
+        for timeslot in range(self.timeslots_per_house):
+          appliance = self.APPLIANCES[int(random.integers(0, len(self.APPLIANCES)))]
+          start = day * 24 * 60 + int(random.integers(0, 24 * 60 - 180))
+          length = int(random.integers(10, 150))
+          if (power[appliance][start:start + length].any()):
+            continue  # The timeslots of an appliance do not overlap
+          power[appliance][start:start + length] = random.uniform(100, 2000, length).round(3)
+          timeslots.append({"House": house, "Appliance": appliance, "Start": dates[start], "End": dates[start + length - 1]})
+
+      for appliance in self.APPLIANCES:
+        total = total + power[appliance]
+        pd.DataFrame({'Date': dates, 'Power': power[appliance]}).to_csv(house_path + '/' + appliance + '.csv', sep=';', index=False)
+      pd.DataFrame({'Date': dates, 'Power': total}).to_csv(house_path + '/total.csv', sep=';', index=False)
+
+      house_production = (sun * random.uniform(500, 1500)).round(3)
+      pd.DataFrame({'Date': dates, 'Power': house_production}).to_csv(house_path + '/energy.csv', sep=';', index=False)
+      pd.DataFrame({'Ssoc': [5], 'Smin': [1], 'Smax': [10]}).to_csv(house_path + '/house_s.csv', sep=';', index=False)
+
+      community = community + total
+      production = production + house_production
+
+    pd.DataFrame({'Date': dates, 'Power': community}).to_csv(minutes_path + '/community.csv', sep=';', index=False)
+    pd.DataFrame({'Date': dates, 'Demand': community, 'PV_Production': production, 'Wind_Production': 0.0, 'Production': production,
+                  'Netload': community - production}).to_csv(minutes_path + '/netload.csv', sep=';', index=False)
+
+    return {"path": community_path, "houses": n_houses, "timeslots": timeslots}
+
+
+  @staticmethod
+  def get_generator(community):
+    """
+    Gets the functions of the Consumption Generator used by the optimization methods, for a synthetic community
+
+    Args:
+      community: synthetic community (see create_community)
+
+    Returns:
+      object with the functions get_community, get_timeslots, get_community_flexibility and calculate_contracted_power
+    """
+    houses = [{"contracted_power": 6.9} for house in range(community["houses"])]
+    return types.SimpleNamespace(get_community=lambda: houses, get_timeslots=lambda houses, flexible: community["timeslots"],
+                                 get_community_flexibility=lambda houses: [1.0] * len(houses),
+                                 calculate_contracted_power=lambda houses: sum(house["contracted_power"] for house in houses) * 1000)
+
+
+  def evaluate(self, path):
+    """
+    Evaluates the profiles of a step of the optimization
+
+    Args:
+      path: folder of the profiles (e.g. "(...)/afteroptimization")
+
+    Returns:
+      dictionary with the self-sufficiency and self-consumption in % ("self_sufficiency" and "self_consumption", None if the procsimulator Evaluation is not installed)
+      and the cost of the energy imported from the grid minus the revenue of the energy exported to it in euros ("cost")
+    """
+    df = pd.read_csv(CopyOnWriteFolder.resolve(path + '/netload.csv'), sep=';')
+    df.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
+
+    # Energy (kWh) of each minute, at the price of its hour
+    hours = pd.to_datetime(df['Date']).dt.hour.to_numpy()
+    netload = df['Netload'].to_numpy(dtype=float) / 60 / 1000
+    cost = np.sum(np.clip(netload, 0, None) * np.array(self.IMPORT_PRICES)[hours]) - np.sum(np.clip(-netload, 0, None) * np.array(self.EXPORT_PRICES)[hours])
+    results = {"self_sufficiency": None, "self_consumption": None, "cost": float(cost)}
+
+    try:
+      from Evaluation import Evaluation  # procsimulator Evaluation
+    except ImportError:
+      return results
+
+    df['Date'] = pd.to_datetime(df['Date'])
+    evaluation = Evaluation(None, df)
+    results["self_sufficiency"] = evaluation.get_self_sufficiency() * 100
+    results["self_consumption"] = evaluation.get_self_consumption() * 100
+    return results
+
+
+  def run_method(self, method, community, fact):
+    """
+    Runs the optimization of a community with a method
+
+    Args:
+      method: name of the method (key of METHODS)
+      community: synthetic community (see create_community)
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+
+    Returns:
+      dictionary with the wall time in seconds ("time"), the peak memory in MB ("memory", None if it is not measured), the number of placed timeslots ("placed"),
+      the outcome of the last step (see evaluate) and the error of the run ("error", None if it ran)
+    """
+    results = {"time": None, "memory": None, "placed": None, "self_sufficiency": None, "self_consumption": None, "cost": None, "error": None}
+    try:
+      method_class = getattr(importlib.import_module(self.METHODS[method]), self.METHODS[method])
+    except ImportError as error:
+      results["error"] = "not installed (" + str(error) + ")"
+      return results
+
+    run_path = community["path"] + '/' + method.lower() + '-' + str(fact) + 'min'
+    if os.path.exists(run_path):
+      shutil.rmtree(run_path)
+    EVInputs.create(OptimizationInputs.run_path(run_path + '/afteroptimization'), self.num_evs, hours=24, seed=self.seed)
+
+    manager = method_class(self.get_generator(community), community["path"] + '/minute', run_path + '/afteroptimization', run_path + '/aftersecoptimization')
+    arguments = {"save_to_file": True, "fact": fact, "multi_day": True, "processes": self.processes}
+    if (method == "Pyomo"):
+      arguments.update(export_prices_hour=self.EXPORT_PRICES, import_prices_hour=self.IMPORT_PRICES)
+
+    if (self.memory):
+      tracemalloc.start()
+    begin = time.perf_counter()
+    try:
+      manager.execute(**arguments)
+    except Exception as error:
+      logger.warning("The %s method failed: %s", method, error)
+      results["error"] = type(error).__name__ + ": " + str(error)
+      return results
+    finally:
+      results["time"] = time.perf_counter() - begin
+      if (self.memory):
+        results["memory"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    # The profiles of the last step (the 2nd one, if the method has it) and the timeslots placed in all the steps
+    placed = [manager.placed_timeslots_array]
+    last_path = run_path + '/afteroptimization'
+    if (hasattr(manager, 'second_placed_timeslots_array')):
+      placed.append(manager.second_placed_timeslots_array)
+      last_path = run_path + '/aftersecoptimization'
+    results["placed"] = len(np.unique(np.concatenate([timeslots['number'] for timeslots in placed])))  # PlacedTimeslots of each step
+    results.update(self.evaluate(last_path))
+    return results
+
+
+  def run(self, houses=[5, 10, 20], days=[1, 2], facts=[60, 30]):
+    """
+    Runs each method over a grid of synthetic communities (each community is created once and optimized by every method and size of the bins)
+
+    Args:
+      houses: numbers of houses of the communities
+      days: numbers of days of the communities
+      facts: minutes of each bin (sizes of the bins)
+
+    Returns:
+      dataframe with one row per community, size of the bins and method (the "Original" rows are the outcome of the community before the optimization)
+    """
+    rows = []
+    for n_houses in houses:
+      for n_days in days:
+        community = self.create_community(n_houses, n_days)
+        configuration = {"houses": n_houses, "days": n_days, "timeslots": len(community["timeslots"])}
+        original = self.evaluate(community["path"] + '/minute')
+        for fact in facts:
+          rows.append(dict(configuration, fact=fact, method="Original", time=0.0, memory=None, placed=0, error=None, **original))
+          for method in self.methods:
+            logger.info("Benchmark of the %s method: %d houses, %d days, bins of %d minutes", method, n_houses, n_days, fact)
+            rows.append(dict(configuration, fact=fact, method=method, **self.run_method(method, community, fact)))
+
+    return pd.DataFrame(rows, columns=["houses", "days", "timeslots", "fact", "method", "time", "memory", "placed", "self_sufficiency", "self_consumption", "cost", "error"])
+
+
+  def save(self, results, path=None):
+    """
+    Saves the comparison table (results.csv) and the plots of the wall time, peak memory and outcome of each method (by configuration) and of the outcome against the wall time (if matplotlib is installed)
+
+    Args:
+      results: dataframe of the results (see run)
+      path: folder of the files (if None, the folder of the benchmark)
+    """
+    path = self.path if path is None else path
+    os.makedirs(path, exist_ok=True)
+    results.to_csv(path + '/results.csv', sep=';', index=False)
+
+    try:
+      import matplotlib
+      matplotlib.use('Agg')
+      import matplotlib.pyplot as plt
+    except ImportError:
+      logger.warning("matplotlib is not installed, the plots of the benchmark are not created")
+      return
+
+    configurations = results[["houses", "days", "fact"]].drop_duplicates()
+    labels = [str(row.houses) + "h " + str(row.days) + "d " + str(row.fact) + "min" for row in configurations.itertuples()]
+    metrics = [("time", "Wall time (s)"), ("memory", "Peak memory (MB)"), ("self_sufficiency", "Self.Suf. (%)"), ("cost", "Cost (€)")]
+
+    fig, axes = plt.subplots(len(metrics), 1, figsize=(max(8, len(labels)), 3 * len(metrics)), sharex=True)
+    for method in results["method"].unique():
+      values = configurations.merge(results[results["method"] == method], on=["houses", "days", "fact"], how="left")
+      for ax, (metric, title) in zip(axes, metrics):
+        ax.plot(np.arange(len(labels)), pd.to_numeric(values[metric]), marker='o', label=method)
+        ax.set_ylabel(title)
+    axes[-1].set_xticks(np.arange(len(labels)))
+    axes[-1].set_xticklabels(labels, rotation=45, ha='right')
+    axes[0].set_title("Optimization methods by configuration")
+    axes[0].legend()
+    fig.tight_layout()
+    fig.savefig(path + '/methods.png')
+    plt.close(fig)
+
+    fig, ax = plt.subplots()
+    for method in results["method"].unique():
+      values = results[(results["method"] == method) & results["error"].isna()]
+      ax.scatter(pd.to_numeric(values["time"]), pd.to_numeric(values["self_sufficiency"]), label=method)
+    ax.set_xlabel("Wall time (s)")
+    ax.set_ylabel("Self.Suf. (%)")
+    ax.set_title("Self sufficiency against wall time")
+    ax.legend()
+    fig.savefig(path + '/tradeoff.png')
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+  path = tempfile.mkdtemp()
+  try:
+    benchmark = MethodBenchmark(path)
+    results = benchmark.run()
+    benchmark.save(results, os.getcwd() + '/benchmark')
+    print(results.drop(columns=["error"]).to_string(index=False, float_format=lambda value: "%.3f" % value))
+    for row in results[results["error"].notna()].itertuples():
+      print(row.method + " (" + str(row.houses) + " houses, " + str(row.days) + " days, " + str(row.fact) + " min): " + row.error)
+  finally:
+    shutil.rmtree(path)
@@ -1,92 +1,273 @@
-from CommunityManager import CommunityManager
-from ConsumptionGenerator import ConsumptionGenerator
-from KnapsackBalancing import KnapsackBalancing
-import pandas as pd
-
-
-class MinimizeCostsPyomo(CommunityManager):
-
-  def __init__(self, cg, path_steps_minutes, path_steps_after_first, path_steps_after_second):
-    """
-    This class is a load balancing strategy implemented using Multiple Knapsack (which is a combinatorial optimization problem).
-    Taking in consideration the objective functions and constraints, it shifts the consumption of the activities.
-
-    Args:
-      cg: Consumption Generator instance (to allow to use its functions)
-      path_steps_minutes: path of the resampled consumption profiles (at 1/60Hz)
-      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization
-      path_steps_after_second: path of the consumption profiles after the 2nd step of the optimization
-    """
-    self.cg = cg
-    self.path_steps_minutes = path_steps_minutes
-    self.path_steps_after_first = path_steps_after_first
-    self.path_steps_after_second = path_steps_after_second
-    self.dataframes = {}
-
-
-
-  def execute(self, export_prices_hour = [0]*24, import_prices_hour = [0]*24, save_to_file=False):
-    """
-    Executes the optimization process (implemented strategy using Multiple Knapsack):
-    1) First step
-    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
-    - Calls the Knapsack class with the input processed (execute_knapsack function)
-    - Updates the consumption profiles based on the output of the knapsack
-    2) Second Step
-    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
-    - Calls the Knapsack class with the input processed (execute_knapsack function)
-    - Updates the consumption profiles based on the output of the knapsack
-    """
-
-    print("Optimization of the community using the implemented strategy")
-
-
-    fact = 60
-    inputs = self.prepare_inputs(fact, save_to_file=save_to_file, export_prices_hour=export_prices_hour, import_prices_hour=import_prices_hour)
-
-
-    # EVs inputs from EVs simulator
-    evs_data = {}
-    evs_data['EVs_Inputs'] = pd.read_csv('inputs/EVs_Inputs.csv')
-    evs_data['availability'] = pd.read_csv('inputs/alpha.csv')
-    evs_data['is_traveling'] = pd.read_csv('inputs/S.csv')
-
-
-    initial_soc = evs_data['EVs_Inputs'].to_numpy()[:,0] * 1000
-    evs_min = evs_data['EVs_Inputs'].to_numpy()[:,1] * 1000
-    evs_max = evs_data['EVs_Inputs'].to_numpy()[:,2] * 1000
-    evs_trip = evs_data['EVs_Inputs'].to_numpy()[:,3] * 1000
-    evs_availability = evs_data['availability'].to_numpy()
-    is_traveling = evs_data['is_traveling'].to_numpy()
-    efficiency = 0.97
-    p_charger = 7200
-    #p_charger = contracted_power*0.95
-    p_grid_max = 10000
-    degradation_cost = 0.08
-    num_evs = 2
-    num_ess = 1
-    community = self.cg.get_community()
-    self.production_baseload = 0.85 * float(inputs.contracted_power)
-
-
-    exec = KnapsackBalancing(inputs.dates, inputs.items, inputs.bins_capacities, inputs.timeslot_numbers, inputs.bins_maximum, inputs.items_max, self.production_baseload, fact, inputs.n_bins_per_hour, inputs.flexibilities, inputs.bins_export_prices, inputs.bins_import_prices, num_evs, evs_max, evs_min, evs_trip, initial_soc, evs_availability, is_traveling, efficiency, p_charger, degradation_cost, p_grid_max, num_ess, inputs.s_max, inputs.s_min, inputs.s_initial_soc, inputs.num_houses, inputs.houses_production, inputs.house_items, inputs.house_items_max, inputs.house_items_date, inputs.house_items_num, inputs.house_items_flex, inputs.house_s_soc, inputs.house_s_max, inputs.house_s_min)
-    otimization = exec.execute_knapsack()
-    self.dataframes = exec.dataframes
-
-    # Remove all the consumption (all timeslots - placed and not placed ones)
-    # Add the consumption of the placed timeslots (just the ones that were placed by the optimization process)
-    self.placed_timeslots = otimization[1]
-    self.not_placed_timeslots = otimization[2]
-
-    # showNetloadGraph('output/minute/netload.csv')
-
-    updt = self.create_profiles_after_strategy(self.placed_timeslots, self.timeslots, self.path_steps_minutes, self.path_steps_after_first, self.path_steps_minutes.split("/")[-1], self.path_steps_after_first.split("/")[-1], True, inputs.n_bins_per_hour, fact)
-    self.placed_timeslots_array = updt[0]
-    df_flexible = updt[1]
-
-
-    # community = ConsumptionGenerator.get_community()
-    # ConsumptionGenerator.show_community_graph(community, 'output/minute/house')
-    # ConsumptionGenerator.show_community_graph(community, 'output/afterknapsack/house')
-    # ConsumptionGenerator.show_community_graph(community, 'output/afteroptimization/house')
-    # ConsumptionGenerator.show_community_graph(community, 'output/afterexchanges/house')
\ No newline at end of file
+from CommunityManager import CommunityManager
+from ConsumptionGenerator import ConsumptionGenerator
+from KnapsackBalancing import KnapsackBalancing
+from TimeslotItems import TimeslotItems
+from DayWindows import DayWindows
+from ResultCache import ResultCache
+from HouseDecomposition import HouseDecomposition
+from OptimizationInputs import OptimizationInputs
+from OptimizationLog import OptimizationLog
+from SolverOptions import SolverOptions
+from EVInputs import EVInputs
+import os
+import datetime
+import pandas as pd
+
+logger = OptimizationLog.get_logger('MinimizeCostsPyomo')
+
+
+class MinimizeCostsPyomo(CommunityManager):
+
+  # Columns of the solver_stats.csv file (the same in all the runs, so the rows of each run can be appended to it)
+  SOLVER_STATS_COLUMNS = ["run", "window", "solver", "time_limit", "mip_gap", "threads", "build_time", "solve_time", "cached", "objective", "gap", "variables", "constraints"]
+
+  def __init__(self, cg, path_steps_minutes, path_steps_after_first, path_steps_after_second):
+    """
+    This class is a load balancing strategy implemented using Multiple Knapsack (which is a combinatorial optimization problem).
+    Taking in consideration the objective functions and constraints, it shifts the consumption of the activities.
+
+    Args:
+      cg: Consumption Generator instance (to allow to use its functions)
+      path_steps_minutes: path of the resampled consumption profiles (at 1/60Hz)
+      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization
+      path_steps_after_second: path of the consumption profiles after the 2nd step of the optimization
+    """
+    self.cg = cg
+    self.path_steps_minutes = path_steps_minutes
+    self.path_steps_after_first = path_steps_after_first
+    self.path_steps_after_second = path_steps_after_second
+    self.dataframes = {}
+    self.solver_stats = pd.DataFrame()
+
+
+
+  def execute(self, export_prices_hour = [0]*24, import_prices_hour = [0]*24, save_to_file=False, fact=60, multi_day=False, processes=None, incremental=False, compact=False, solver_options=None, rolling_horizon=False, decomposition=False, iterations=10, cache=False, timeslot_index=None):
+    """
+    Executes the optimization process (implemented strategy using Multiple Knapsack):
+    1) First step
+    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
+    - Calls the Knapsack class with the input processed (execute_knapsack function)
+    - Updates the consumption profiles based on the output of the knapsack
+    2) Second Step
+    - Prepares the input (arrays) for the process (bin_capacities, bin_maximums, timeslots_number, flexibitilies, items_max, etc)
+    - Calls the Knapsack class with the input processed (execute_knapsack function)
+    - Updates the consumption profiles based on the output of the knapsack
+    If multi_day is True, each day is an independent window: the models of the days are solved concurrently (DayWindows) and their placements are merged into the same profiles.
+    If rolling_horizon is True, the days are solved one after the other instead (see solve_rolling_horizon), each one starting from the state of charge of the EVs and storage at the end of the previous one (see get_final_state).
+    If decomposition is True, each window is decomposed by house (see HouseDecomposition): the subproblems of the houses are solved in parallel and coordinated by the prices of the bins.
+
+    Args:
+      export_prices_hour: export price of each bin
+      import_prices_hour: import price of each bin
+      save_to_file: if True, the inputs of the optimization are calculated and saved to the inputs folder of the run, otherwise they are read from it
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30) - it has to divide an hour (e.g. 15, 30 or 60)
+      multi_day: if True, all the days are optimized (one window per day), otherwise only the first day (if save_to_file is False, the inputs of each day have to be saved before)
+      processes: maximum number of processes to solve the windows and to read/write the profiles of the houses (if None, the number of CPUs)
+      incremental: if True and the folders of the steps were updated before with the same timeslots and parameters, only the timeslots whose placement changed are shifted (instead of creating the folders again)
+      compact: if True, the profiles are updated in memory as float32 arrays (less memory, the values written are rounded to float32 precision)
+      solver_options: SolverOptions of the model (solver, time limit, MIP gap and threads), if None the first solver installed is used with its defaults
+      rolling_horizon: if True, all the days are optimized (as with multi_day) in a rolling horizon, carrying the state of charge of the EVs and storage from each day to the next one
+      decomposition: if True, each window is solved by house (the EVs and the storage of the community are in the subproblem of the first house), it can not be combined with rolling_horizon
+      iterations: maximum number of iterations of the coordination of the houses (if decomposition is True), at least 1
+      cache: if True, the outputs of the windows are kept in the inputs folder of the run (see ResultCache) and the windows solved before with exactly the same inputs and parameters are not solved again
+      timeslot_index: TimeslotIndex of the flexible timeslots of the community (e.g. built once by ProcsimRun for the simulation and the optimisations), if None the timeslots are read from the profiles in this run
+    """
+
+    logger.info("Optimization of the community using the implemented strategy")
+    if (rolling_horizon and decomposition):
+      raise ValueError("The rolling horizon and the decomposition by house can not be combined")
+    self.processes = processes
+    self.incremental = incremental
+    self.compact = compact
+    self.timeslot_index = timeslot_index  # If None, the timeslots are read again in this run
+
+
+    # Each window has its own inputs in the inputs folder of the run, so the saved inputs can also be read by day
+    days = self.get_days() if (multi_day or rolling_horizon) else [None]
+
+    windows_inputs = [self.prepare_inputs(fact, save_to_file=save_to_file, export_prices_hour=export_prices_hour, import_prices_hour=import_prices_hour, day=day) for day in days]
+    inputs = windows_inputs[0]
+    if (len(windows_inputs) > 1):
+      windows_inputs = [window for window in windows_inputs if len(window.items) > 0]  # Days without flexible timeslots have nothing to optimize
+
+
+    # EVs and storage inputs from EVs simulator (the ones of the run, if they exist, otherwise the global ones), one EV per row of EVs_Inputs.csv and one battery per row of s_inputs.csv
+    run_inputs = OptimizationInputs(OptimizationInputs.run_path(self.path_steps_after_first))
+    self.ev_inputs = EVInputs(run_inputs)
+
+
+    evs = {}
+    evs['initial_soc'] = self.ev_inputs.initial_soc
+    evs['evs_min'] = self.ev_inputs.evs_min
+    evs['evs_max'] = self.ev_inputs.evs_max
+    evs['evs_trip'] = self.ev_inputs.evs_trip
+    evs['ev_inputs'] = self.ev_inputs  # Availability and travels of the EVs (bit matrices, unpacked only when the model of each window is built)
+    evs['efficiency'] = 0.97
+    evs['p_charger'] = 7200
+    #evs['p_charger'] = contracted_power*0.95
+    evs['p_grid_max'] = 10000
+    evs['degradation_cost'] = 0.08
+    evs['num_evs'] = self.ev_inputs.num_evs
+    evs['num_ess'] = self.ev_inputs.num_ess
+    community = self.cg.get_community()
+    self.production_baseload = 0.85 * float(inputs.contracted_power)
+
+
+    if (solver_options is None):
+      solver_options = SolverOptions()
+
+    result_cache = ResultCache(ResultCache.run_path(self.path_steps_after_first)) if cache else None
+    if (rolling_horizon):
+      outputs = self.solve_rolling_horizon(windows_inputs, fact, evs, solver_options, result_cache)
+    elif (decomposition):
+      shared = dict(evs, num_evs=0, num_ess=0)  # Only the first house has the EVs and the storage of the community
+      self.decomposition = HouseDecomposition(processes, iterations, cache=result_cache)
+      outputs = self.decomposition.solve(windows_inputs, lambda window, house: self.get_window(window, fact, evs if house == 0 else shared, solver_options))
+    else:
+      outputs = DayWindows(processes, result_cache).solve([self.get_window(window, fact, evs, solver_options) for window in windows_inputs])
+    self.save_solver_stats(solver_options, [window.first_date for window in windows_inputs], [output[3] for output in outputs])
+
+    # Dataframes of the solver (of all the windows, one after the other)
+    self.windows_dataframes = [output[2] for output in outputs]
+    self.dataframes = self.windows_dataframes[0] if len(outputs) == 1 else {}
+    if (len(outputs) > 1):
+      for key in self.windows_dataframes[0]:
+        self.dataframes[key] = pd.concat([dataframes[key] for dataframes in self.windows_dataframes if key in dataframes])
+
+    # Remove all the consumption (all timeslots - placed and not placed ones)
+    # Add the consumption of the placed timeslots (just the ones that were placed by the optimization process)
+    # The items strings of the optimization are parsed once
+    self.placed_timeslots = TimeslotItems.concatenate([output[0] for output in outputs])
+    self.not_placed_timeslots = TimeslotItems.concatenate([output[1] for output in outputs])
+
+    # showNetloadGraph('output/minute/netload.csv')
+
+    updt = self.create_profiles_after_strategy(self.placed_timeslots, self.timeslots, self.path_steps_minutes, self.path_steps_after_first, self.path_steps_minutes.split("/")[-1], self.path_steps_after_first.split("/")[-1], True, inputs.n_bins_per_hour, fact)
+    self.placed_timeslots_array = updt[0]
+    df_flexible = updt[1]
+
+
+    # community = ConsumptionGenerator.get_community()
+    # ConsumptionGenerator.show_community_graph(community, 'output/minute/house')
+    # ConsumptionGenerator.show_community_graph(community, 'output/afterknapsack/house')
+    # ConsumptionGenerator.show_community_graph(community, 'output/afteroptimization/house')
+    # ConsumptionGenerator.show_community_graph(community, 'output/afterexchanges/house')
+
+
+  def get_window(self, window, fact, evs, solver_options, state=None):
+    """
+    Gets the window of the optimization of a day (optimizer and its arguments), to be solved by DayWindows
+
+    Args:
+      window: inputs of the day (see prepare_inputs)
+      fact: minutes of each bin
+      evs: dictionary with the inputs of the EVs and storage which are the same for all the days (initial_soc, evs_max, ev_inputs, num_evs, num_ess, etc)
+      solver_options: SolverOptions of the model
+      state: state at the end of the previous day (see get_final_state), if None the initial state of charge of the inputs is used
+
+    Returns:
+      array with 4 positions (see DayWindows.solve_window): function which creates the optimizer [0] (see create_optimizer), its arguments [1], arguments of the execute_knapsack function of the optimizer [2] and SolverOptions [3]
+    """
+    initial_soc = evs['initial_soc']
+    s_initial_soc = window.s_initial_soc
+    house_s_soc = window.house_s_soc
+    if (state is not None):
+      initial_soc = state.get('evs_soc', initial_soc)
+      s_initial_soc = state.get('s_soc', s_initial_soc)
+      house_s_soc = state.get('house_s_soc', house_s_soc)
+
+    return [MinimizeCostsPyomo.create_optimizer, [evs['ev_inputs'], window.dates, window.items, window.bins_capacities, window.timeslot_numbers, window.bins_maximum, window.items_max, self.production_baseload, fact, window.n_bins_per_hour, window.flexibilities, window.bins_export_prices, window.bins_import_prices, evs['num_evs'], evs['evs_max'], evs['evs_min'], evs['evs_trip'], initial_soc, evs['efficiency'], evs['p_charger'], evs['degradation_cost'], evs['p_grid_max'], evs['num_ess'], window.s_max, window.s_min, s_initial_soc, window.num_houses, window.houses_production, window.house_items, window.house_items_max, window.house_items_date, window.house_items_num, window.house_items_flex, house_s_soc, window.house_s_max, window.house_s_min], [], solver_options]
+
+
+  @staticmethod
+  def create_optimizer(ev_inputs, *arguments):
+    """
+    Creates the KnapsackBalancing of a window (in the process which solves it): the model of a window is a day, so only the first 24 hours of the availability and travels matrices of the EVs are unpacked
+
+    Args:
+      ev_inputs: EVInputs of the community
+      arguments: arguments of the KnapsackBalancing without the availability and travels matrices (see get_window)
+
+    Returns:
+      KnapsackBalancing of the window
+    """
+    arguments = list(arguments)
+    arguments[17:17] = [ev_inputs.availability(24), ev_inputs.is_traveling(24)]
+    return KnapsackBalancing(*arguments)
+
+
+  @staticmethod
+  def get_final_state(window, dataframes):
+    """
+    Gets the state of charge of the EVs and storage at the end of a window (in its last bin), from the dataframes of its KnapsackBalancing
+
+    Args:
+      window: inputs of the window (see prepare_inputs)
+      dataframes: dataframes of the optimizer of the window (see DayWindows.solve_window): evSoc_df and sSoc_df (one row per EV/battery and one column per bin) and h_s_soc_df (one row per bin and battery of the house and one column per house)
+
+    Returns:
+      dictionary with the state of charge of the EVs (evs_soc), of the storage of the community (s_soc) and of the storage of each house (house_s_soc), only of the ones in the dataframes
+    """
+    state = {}
+    for name, key in [('evs_soc', 'evSoc_df'), ('s_soc', 'sSoc_df')]:
+      df = dataframes.get(key)
+      if (df is not None and len(df.columns) > 0):
+        state[name] = df[df.columns.max()].sort_index().to_numpy(dtype=float)
+
+    df = dataframes.get('h_s_soc_df')
+    if (df is not None and len(df) > 0):
+      last = df.xs(df.index.get_level_values(0).max(), level=0)  # Batteries (rows) of each house (columns) in the last bin
+      state['house_s_soc'] = [[float(last.loc[battery + 1, house + 1]) for battery in range(len(socs))] for house, socs in enumerate(window.house_s_soc)]
+    return state
+
+
+  def solve_rolling_horizon(self, windows_inputs, fact, evs, solver_options, cache=None):
+    """
+    Solves the days one after the other (rolling horizon): each day is a model of its own bins (so the size of each model does not grow with the days of the simulation)
+    and starts from the state of charge of the EVs and storage at the end of the previous day (read from the dataframes of its solve, see get_final_state)
+    The windows do not overlap, because the bins of the model are the bins of a day (the placements are shifted from the midnight of their day)
+
+    Args:
+      windows_inputs: inputs of each day (in order)
+      fact: minutes of each bin
+      evs: dictionary with the inputs of the EVs and storage (see get_window)
+      solver_options: SolverOptions of the model
+      cache: ResultCache with the outputs of the days solved before (if None, all the days are solved)
+
+    Returns:
+      array with the output of each day (in the same order), see DayWindows.solve_window
+    """
+    outputs = []
+    state = None
+    for window in windows_inputs:
+      outputs.append(DayWindows(1, cache).solve([self.get_window(window, fact, evs, solver_options, state)])[0])
+      state = self.get_final_state(window, outputs[-1][2])
+      logger.debug("State of charge at the end of the window %s: %s", str(window.first_date)[0:10], state)
+    return outputs
+
+
+  def save_solver_stats(self, solver_options, windows_dates, windows_stats):
+    """
+    Keeps the statistics of the solve of each window (solver_stats) and adds them to the solver_stats.csv file of the run (next to the folders of the steps), one row per window.
+    The solver, time limit, MIP gap and threads are only written in the rows of the windows whose optimizer took them (see SolverOptions.apply), a warning is logged if the chosen options were not taken.
+    The rows have the columns of SOLVER_STATS_COLUMNS (a statistic which the solve did not give is empty), if the file has other columns (e.g. written by an older version) its rows are rewritten with these columns
+
+    Args:
+      solver_options: SolverOptions used in the solve
+      windows_dates: first date of each window
+      windows_stats: statistics of the solve of each window (see DayWindows.solve_window)
+    """
+    run = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = []
+    for date, stats in zip(windows_dates, windows_stats):
+      options = {"solver": solver_options.get_solver(), "time_limit": solver_options.time_limit, "mip_gap": solver_options.mip_gap, "threads": solver_options.threads} if stats.get("options_applied") else {}
+      rows.append(dict({"run": run, "window": str(date)[0:10]}, **options, **stats))
+      logger.info("Window %s: build %.3f s, solve %.3f s, objective %s, gap %s", rows[-1]["window"], stats["build_time"], stats["solve_time"], stats.get("objective"), stats.get("gap"))
+    self.solver_stats = pd.DataFrame(rows).reindex(columns=self.SOLVER_STATS_COLUMNS)
+    if (solver_options.is_set() and not all(stats.get("options_applied") for stats in windows_stats)):
+      logger.warning("The optimizer does not take the solver options (solver %s, time limit %s, MIP gap %s, threads %s): the windows were solved with its own solver and options", solver_options.solver, solver_options.time_limit, solver_options.mip_gap, solver_options.threads)
+
+    path = os.path.dirname(os.path.normpath(self.path_steps_after_first)) + '/solver_stats.csv'
+    if (os.path.isfile(path) and list(pd.read_csv(path, nrows=0).columns) != self.SOLVER_STATS_COLUMNS):
+      pd.read_csv(path, on_bad_lines='skip').reindex(columns=self.SOLVER_STATS_COLUMNS).to_csv(path, index=False)
+    self.solver_stats.to_csv(path, mode='a', header=not os.path.isfile(path), index=False)
@@ -0,0 +1,167 @@
+import datetime
+import functools
+import numpy as np
+import pandas as pd
+
+
+class MinuteTimeline:
+
+  def __init__(self, dates):
+    """
+    Maps the dates of a resampled (1/60Hz) dataframe to row positions, so that an interval of minutes becomes a positional slice of the dataframe (instead of a boolean scan of the Date column for each minute).
+    When the dates are not a contiguous sequence of minutes, a dictionary lookup is used instead (the result is the same, it is just slower).
+
+    Args:
+      dates: Date column of the dataframe (strings with the format '%Y-%m-%d %H:%M:%S', one row per minute)
+    """
+    self.dates = np.asarray(dates, dtype=object)
+    self.length = len(self.dates)
+    self.start = datetime.datetime.strptime(str(self.dates[0]), '%Y-%m-%d %H:%M:%S') if self.length > 0 else None
+
+    expected = MinuteTimeline.minutes(self.start, self.length) if self.length > 0 else []
+    self.contiguous = bool(np.array_equal(self.dates, expected))
+
+    self.positions = None
+    if (not self.contiguous):
+      self.positions = {str(date): position for position, date in enumerate(self.dates)}
+
+
+  @staticmethod
+  @functools.lru_cache(maxsize=4)
+  def minutes(start, length):
+    """
+    Gets the dates of consecutive minutes (the last ones are kept, since the profiles of a folder usually have the same dates; the array must not be changed)
+
+    Args:
+      start: first minute (datetime object)
+      length: number of minutes
+
+    Returns:
+      array with the dates strings (format '%Y-%m-%d %H:%M:%S')
+    """
+    return np.asarray(pd.date_range(start, periods=length, freq='min').strftime('%Y-%m-%d %H:%M:%S'), dtype=object)
+
+
+  def matches(self, dates):
+    """
+    Checks if other dataframe has exactly the same Date column (so that this timeline can be shared between both dataframes)
+
+    Args:
+      dates: Date column of the other dataframe
+
+    Returns:
+      True if the dates are the same (and in the same order), otherwise False
+    """
+    dates = np.asarray(dates, dtype=object)
+    return len(dates) == self.length and bool((dates == self.column()).all())
+
+
+  def same(self, other):
+    """
+    Checks if other timeline has exactly the same dates (so that only one of them has to be kept)
+
+    Args:
+      other: MinuteTimeline
+
+    Returns:
+      True if the dates are the same (and in the same order), otherwise False
+    """
+    if (self.contiguous and other.contiguous):
+      return self.length == other.length and self.start == other.start
+    return self.contiguous == other.contiguous and other.matches(self.column())
+
+
+  def compact(self):
+    """
+    Drops the dates of a contiguous timeline (they are calculated from the first minute when needed, see column), so that the dates strings are not kept in memory
+
+    Returns:
+      this timeline
+    """
+    if (self.contiguous):
+      self.dates = None
+    return self
+
+
+  def column(self):
+    """
+    Gets the dates of the timeline (e.g. to write the Date column of a profile kept without it)
+
+    Returns:
+      array with the dates strings (format '%Y-%m-%d %H:%M:%S')
+    """
+    if (self.dates is None):
+      return MinuteTimeline.minutes(self.start, self.length)
+    return self.dates
+
+
+  def offset(self, date):
+    """
+    Gets the position of a date in the timeline
+
+    Args:
+      date: date (string with the format '%Y-%m-%d %H:%M:%S' or datetime object)
+
+    Returns:
+      row position of the date in the dataframe
+    """
+    if (self.contiguous):
+      if (not isinstance(date, datetime.datetime)):
+        date = datetime.datetime.strptime(str(date), '%Y-%m-%d %H:%M:%S')
+      position = int((date - self.start) // datetime.timedelta(minutes=1))
+      if (position < 0 or position >= self.length or date != self.start + datetime.timedelta(minutes=position)):
+        raise KeyError("Date " + str(date) + " is not in the timeline")
+      return position
+
+    return self.positions[str(date)]
+
+
+  def date(self, offset):
+    """
+    Gets the date of a position of the timeline
+
+    Args:
+      offset: row position in the dataframe
+
+    Returns:
+      date string with the format '%Y-%m-%d %H:%M:%S'
+    """
+    if (self.dates is None):
+      return str(self.start + datetime.timedelta(minutes=int(offset)))
+    return str(self.dates[offset])
+
+
+  def rows(self, start, length):
+    """
+    Gets the rows of a number of consecutive minutes
+
+    Args:
+      start: first minute (datetime object)
+      length: number of minutes
+
+    Returns:
+      slice with the positions of the minutes (or an array of positions if the timeline is not contiguous), to be used with iloc
+    """
+    if (self.contiguous):
+      first = self.offset(start)
+      if (length > 0):
+        self.offset(start + datetime.timedelta(minutes=length - 1))  # Checks that the last minute is in the timeline
+      return slice(first, first + length)
+
+    return np.array([self.positions[str(start + datetime.timedelta(minutes=m))] for m in range(length)], dtype=int)
+
+
+  def interval(self, start_date, end_date):
+    """
+    Gets the rows of all the minutes between two dates (both included)
+
+    Args:
+      start_date: first minute of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      end_date: last minute of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      slice with the positions of the interval (or an array of positions if the timeline is not contiguous), to be used with iloc
+    """
+    start_obj = datetime.datetime.strptime(str(start_date), '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
+    end_obj = datetime.datetime.strptime(str(end_date), '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
+    return self.rows(start_obj, int((end_obj - start_obj) // datetime.timedelta(minutes=1)) + 1)
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import numpy as np
+
+
+class OptimizationInputs:
+
+  FIELDS = ['flexibilities', 'dates', 'items', 'items_max', 'timeslot_numbers', 'houses_production']
+  HOUSE_FIELDS = ['house_items', 'house_items_max', 'house_items_date', 'house_items_num', 'house_items_flex']
+
+  def __init__(self, path):
+    """
+    Inputs of the optimization of a run (timeslots items, dates, maximums, numbers and flexibilities of the community and of each house), saved in the run folder instead of the global inputs folder, so that runs at the same time do not overwrite the inputs of each other.
+    Each window (day) is saved in a binary file (.npz) where each array of arrays (rows with different lengths) is kept as its values (one after the other) and the offsets of the rows, instead of a csv with the rows padded with NaN.
+
+    Args:
+      path: folder of the inputs of the run (e.g. "(...)/output/community-1days/strategy/inputs")
+    """
+    self.path = path
+
+
+  @staticmethod
+  def run_path(path_steps_after_first):
+    """
+    Gets the inputs folder of a run (next to the folders of the steps of the optimization)
+
+    Args:
+      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization (e.g. "(...)/output/community-1days/strategy/afteroptimization")
+
+    Returns:
+      path of the inputs folder (e.g. "(...)/output/community-1days/strategy/inputs")
+    """
+    return os.path.dirname(os.path.normpath(path_steps_after_first)) + '/inputs'
+
+
+  def window_file(self, fd):
+    """
+    Args:
+      fd: first date of the window (string with the format '%Y-%m-%d')
+
+    Returns:
+      path of the file with the inputs of the window
+    """
+    return self.path + '/inputs-' + str(fd) + '.npz'
+
+
+  def static_file(self, name):
+    """
+    Gets the path of an input which is not calculated (e.g. "EVs_Inputs.csv" or "s_inputs.csv"): the one of the run, if it exists, otherwise the one of the global inputs folder
+
+    Args:
+      name: name of the file
+
+    Returns:
+      path of the file
+    """
+    path = self.path + '/' + name
+    return path if os.path.isfile(path) else 'inputs/' + name
+
+
+  @staticmethod
+  def flatten(rows):
+    """
+    Converts an array of arrays (rows with different lengths) to its values and offsets
+
+    Args:
+      rows: array of arrays
+
+    Returns:
+      array with 2 positions: values of all the rows [0] and offsets of the rows [1] (row i is values[offsets[i]:offsets[i + 1]])
+    """
+    offsets = np.cumsum([0] + [len(row) for row in rows]).astype(np.int64)
+    values = np.concatenate([np.asarray(row) for row in rows]) if offsets[-1] > 0 else np.zeros(0)
+    return [values, offsets]
+
+
+  @staticmethod
+  def unflatten(values, offsets):
+    """
+    Converts values and offsets back to an array of arrays (see flatten)
+
+    Args:
+      values: values of all the rows
+      offsets: offsets of the rows
+
+    Returns:
+      array of arrays
+    """
+    return [values[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+  def save(self, fd, inputs):
+    """
+    Saves the inputs of a window. The file is written with a temporary name and then moved, so a run reading it never finds it half written.
+
+    Args:
+      fd: first date of the window
+      inputs: dictionary with the arrays of arrays of FIELDS and, for each one of HOUSE_FIELDS, an array with the array of arrays of each house
+    """
+    arrays = {}
+    for name in self.FIELDS:
+      arrays[name + '_values'], arrays[name + '_offsets'] = self.flatten(inputs[name])
+    for name in self.HOUSE_FIELDS:
+      arrays[name + '_values'], arrays[name + '_offsets'] = self.flatten([row for house in inputs[name] for row in house])
+      arrays[name + '_houses'] = np.cumsum([0] + [len(house) for house in inputs[name]]).astype(np.int64)
+
+    os.makedirs(self.path, exist_ok=True)
+    file, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+    try:
+      with os.fdopen(file, 'wb') as tmp_file:
+        np.savez(tmp_file, **arrays)
+      os.replace(tmp_path, self.window_file(fd))
+    except BaseException:
+      if (os.path.exists(tmp_path)):
+        os.remove(tmp_path)
+      raise
+
+
+  def load(self, fd):
+    """
+    Loads the inputs of a window (saved by save)
+
+    Args:
+      fd: first date of the window
+
+    Returns:
+      dictionary with the arrays of arrays of FIELDS and, for each one of HOUSE_FIELDS, an array with the array of arrays of each house
+    """
+    path = self.window_file(fd)
+    if (not os.path.isfile(path)):
+      raise FileNotFoundError("There are no saved inputs of " + str(fd) + " in " + self.path + " (the inputs have to be calculated, with save_to_file = True)")
+
+    inputs = {}
+    with np.load(path) as arrays:
+      for name in self.FIELDS:
+        inputs[name] = self.unflatten(arrays[name + '_values'], arrays[name + '_offsets'])
+      for name in self.HOUSE_FIELDS:
+        rows = self.unflatten(arrays[name + '_values'], arrays[name + '_offsets'])
+        houses = arrays[name + '_houses']
+        inputs[name] = [rows[start:end] for start, end in zip(houses[:-1], houses[1:])]
+    return inputs
@@ -0,0 +1,96 @@
+import os
+import logging
+import tempfile
+import numpy as np
+
+
+class OptimizationLog:
+
+  ROOT = 'procsim'
+  dump_path = None  # Folder of the binary dumps of the DEBUG level (if None, the arrays are logged as text)
+
+  @staticmethod
+  def get_logger(module):
+    """
+    Gets the logger of a module (all the loggers are children of the ROOT logger, so their level can be set at once or per module, see configure)
+
+    Args:
+      module: name of the module (e.g. "CommunityManager")
+
+    Returns:
+      logger of the module (e.g. "procsim.CommunityManager")
+    """
+    return logging.getLogger(OptimizationLog.ROOT + '.' + module)
+
+
+  @staticmethod
+  def configure(level=None, levels={}, dump_path=None):
+    """
+    Sets the levels of the loggers and the folder of the binary dumps.
+    By default (if this function is not called) the level is the one of the root logger (WARNING, unless it was configured), so the arrays are not logged and not even formatted.
+
+    Args:
+      level: level of all the loggers (e.g. logging.INFO), if None it is not changed
+      levels: dictionary with the level of each module (e.g. {"CommunityManager": logging.DEBUG})
+      dump_path: folder where the arrays of the DEBUG level are dumped in binary (.npz) instead of logged as text (if None, they are logged as text)
+    """
+    if (level is not None):
+      logging.getLogger(OptimizationLog.ROOT).setLevel(level)
+    for module, module_level in levels.items():
+      OptimizationLog.get_logger(module).setLevel(module_level)
+    OptimizationLog.dump_path = dump_path
+
+
+  @staticmethod
+  def dump(logger, name, arrays):
+    """
+    Logs arrays (e.g. the inputs of the optimization) at the DEBUG level. If the DEBUG level is not enabled, nothing is done.
+    If there is a dump folder (see configure), the arrays are written to a binary file (.npz) and only its path is logged, otherwise each array is logged as text.
+
+    Args:
+      logger: logger of the module
+      name: name of the dump (e.g. "inputs"), used in the name of the file
+      arrays: dictionary with the arrays to log (arrays of arrays with different lengths are written as their values and offsets)
+    """
+    if (not logger.isEnabledFor(logging.DEBUG)):
+      return
+
+    if (OptimizationLog.dump_path is None):
+      for key, value in arrays.items():
+        logger.debug("%s - %s: %s", name, key, value)
+      return
+
+    flat_arrays = {}
+    for key, value in arrays.items():
+      OptimizationLog.flatten(key, value, flat_arrays)
+
+    os.makedirs(OptimizationLog.dump_path, exist_ok=True)
+    file, path = tempfile.mkstemp(dir=OptimizationLog.dump_path, prefix=name + '-', suffix='.npz')
+    with os.fdopen(file, 'wb') as dump_file:
+      np.savez(dump_file, **flat_arrays)
+    logger.debug("%s dumped to %s", name, path)
+
+
+  @staticmethod
+  def flatten(key, value, flat_arrays, level=0):
+    """
+    Converts an array to arrays which can be written in binary: a regular array is kept as it is, an array of arrays with different lengths is kept as the offsets of its rows (key + "_offsets" + level) and its values (flattened again, if they are arrays of arrays)
+
+    Args:
+      key: name of the array
+      value: array
+      flat_arrays: dictionary where the arrays are added
+      level: number of times the array was flattened
+    """
+    try:
+      array = np.asarray(value)
+    except ValueError:
+      array = None  # Rows with different lengths
+
+    if (array is not None and array.dtype != object):
+      flat_arrays[key] = array
+      return
+
+    rows = list(value)
+    flat_arrays[key + '_offsets' + str(level)] = np.cumsum([0] + [len(row) for row in rows]).astype(np.int64)
+    OptimizationLog.flatten(key, [item for row in rows for item in row], flat_arrays, level + 1)
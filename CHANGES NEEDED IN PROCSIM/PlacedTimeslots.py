@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class PlacedTimeslots:
+
+  DTYPE = np.dtype([('house', np.int64), ('appliance', 'U32'), ('number', np.int64), ('start', 'U19'), ('end', 'U19')])
+
+  def __init__(self, records=None):
+    """
+    Timeslots placed by the optimization with their new position, kept in a structured array (one field per column) instead of strings with the fields separated by "*".
+
+    Args:
+      records: structured array with the DTYPE fields (empty if None)
+    """
+    self.records = np.zeros(0, dtype=self.DTYPE) if records is None else np.asarray(records, dtype=self.DTYPE)
+
+
+  @staticmethod
+  def from_list(timeslots):
+    """
+    Creates the placed timeslots from an array of tuples
+
+    Args:
+      timeslots: array of tuples (House, Appliance, TimeslotNumber, NewStart, NewEnd)
+
+    Returns:
+      PlacedTimeslots with the timeslots
+    """
+    return PlacedTimeslots(np.array([tuple(timeslot) for timeslot in timeslots], dtype=PlacedTimeslots.DTYPE))
+
+
+  @staticmethod
+  def from_strings(timeslots):
+    """
+    Parses placed timeslots strings with the format "House*Appliance*TimeslotNumber*NewStart*NewEnd"
+
+    Args:
+      timeslots: array of the timeslots strings
+
+    Returns:
+      PlacedTimeslots with the timeslots
+    """
+    return PlacedTimeslots.from_list([str(timeslot).split("*") for timeslot in timeslots])
+
+
+  def to_strings(self):
+    """
+    Converts the timeslots to strings (compatibility with the code that still uses them)
+
+    Returns:
+      array of the timeslots strings with the format "House*Appliance*TimeslotNumber*NewStart*NewEnd"
+    """
+    return ["*".join(str(value) for value in record.tolist()) for record in self.records]
+
+
+  def __len__(self):
+    return len(self.records)
+
+
+  def __iter__(self):
+    return iter(self.records)
+
+
+  def __getitem__(self, index):
+    return self.records[index]
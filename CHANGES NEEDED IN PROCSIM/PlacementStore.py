@@ -0,0 +1,102 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from TimeslotItems import TimeslotItems
+from CopyOnWriteFolder import CopyOnWriteFolder
+
+
+class PlacementStore:
+
+  def __init__(self, path):
+    """
+    Placement (items of the optimization) applied to the profiles of a folder (e.g. afteroptimization), kept with the parameters of the update.
+    If the next update of the folder has the same parameters (same timeslots, bins, initial folder and the folder was not changed since), only the difference between the placements has to be applied (see ProfileShiftEngine.apply).
+
+    Args:
+      path: path of the file of the placement (e.g. "(...)/inputs/placement-afteroptimization.npz")
+    """
+    self.path = path
+
+
+  @staticmethod
+  def folder_stamp(path):
+    """
+    Gets a stamp of the profiles of a folder (the netload file is replaced in every update of the folder, so its stamp changes whenever the folder changes)
+
+    Args:
+      path: path of the folder
+
+    Returns:
+      string with the inode, modification time and size of the netload file (empty if it does not exist)
+    """
+    netload = CopyOnWriteFolder.resolve(path + '/netload.csv')
+    if (not os.path.isfile(netload)):
+      return ""
+    stat = os.stat(netload)
+    return str(stat.st_ino) + '-' + str(stat.st_mtime_ns) + '-' + str(stat.st_size)
+
+
+  @staticmethod
+  def timeslots_fingerprint(timeslots):
+    """
+    Gets a fingerprint of the timeslots (the item numbers are positions in the timeslots, so the placements can only be compared if the timeslots are the same)
+
+    Args:
+      timeslots: array of all timeslots with all the information (Start, End, Appliance, House, etc)
+
+    Returns:
+      hash of the House, Appliance, Start and End of the timeslots
+    """
+    digest = hashlib.sha1()
+    for timeslot in timeslots:
+      digest.update((str(timeslot["House"]) + '|' + str(timeslot["Appliance"]) + '|' + str(timeslot["Start"]) + '|' + str(timeslot["End"]) + '\n').encode())
+    return digest.hexdigest()
+
+
+  def load(self, parameters, final_path):
+    """
+    Loads the placement applied to a folder, if it can be updated with the difference
+
+    Args:
+      parameters: dictionary with the parameters of the update (they have to be the same of the saved placement)
+      final_path: path of the folder (it can not have changed since the placement was saved)
+
+    Returns:
+      TimeslotItems with the items of the placement, or None if there is no placement or the folder has to be created again
+    """
+    if (not os.path.isfile(self.path)):
+      return None
+
+    with np.load(self.path) as arrays:
+      saved_parameters = json.loads(str(arrays['parameters']))
+      records = arrays['records']
+
+    if (saved_parameters != dict(parameters, final=self.folder_stamp(final_path))):
+      return None
+    return TimeslotItems(records)
+
+
+  def save(self, placed_timeslots, parameters, final_path):
+    """
+    Saves the placement applied to a folder (after the files of the folder are written)
+
+    Args:
+      placed_timeslots: TimeslotItems with the placed items
+      parameters: dictionary with the parameters of the update
+      final_path: path of the folder
+    """
+    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+    file, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+    with os.fdopen(file, 'wb') as tmp_file:
+      np.savez(tmp_file, records=TimeslotItems.from_strings(placed_timeslots).records, parameters=np.array(json.dumps(dict(parameters, final=self.folder_stamp(final_path)))))
+    os.replace(tmp_path, self.path)
+
+
+  def clear(self):
+    """
+    Removes the saved placement (e.g. before the folder is created again)
+    """
+    if (os.path.isfile(self.path)):
+      os.remove(self.path)
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+class ProfileRangeIndex:
+
+  def __init__(self, dates, values):
+    """
+    Index of a consumption profile (e.g. of an appliance) to get the mean and the maximum of any interval of dates in constant time.
+    The mean uses prefix sums and the maximum uses a sparse table (maximum of each interval of 2^k rows), both calculated once when the index is created.
+
+    Args:
+      dates: Date column of the profile (strings with the format '%Y-%m-%d %H:%M:%S')
+      values: Power column of the profile
+    """
+    dates = np.asarray(dates).astype(str)
+    values = np.asarray(values, dtype=float)
+
+    # The dates are compared as strings, so they have to be sorted to find an interval with a binary search
+    if (len(dates) > 1 and not (dates[1:] >= dates[:-1]).all()):
+      order = np.argsort(dates, kind='stable')
+      dates = dates[order]
+      values = values[order]
+
+    self.dates = dates
+    valid = ~np.isnan(values)
+
+    # Prefix sums (NaN values are ignored, as in pandas)
+    self.prefix_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    self.prefix_count = np.concatenate(([0], np.cumsum(valid)))
+
+    # Sparse table: level k has the maximum of the 2^k rows starting at each row
+    self.sparse_table = [values]
+    k = 1
+    while ((1 << k) <= len(values)):
+      previous = self.sparse_table[k - 1]
+      half = 1 << (k - 1)
+      self.sparse_table.append(np.fmax(previous[:len(previous) - half], previous[half:]))
+      k = k + 1
+
+
+  def rows(self, start_date, end_date):
+    """
+    Gets the rows of the dates between two dates (both included, compared as strings)
+
+    Args:
+      start_date: first date of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      end_date: last date of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      array with 2 positions: first row [0] and row after the last one [1]
+    """
+    return [int(np.searchsorted(self.dates, start_date, side='left')), int(np.searchsorted(self.dates, end_date, side='right'))]
+
+
+  def mean(self, start_date, end_date):
+    """
+    Gets the mean of the values between two dates (both included)
+
+    Args:
+      start_date: first date of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      end_date: last date of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      mean of the values (NaN if there are no values)
+    """
+    first, last = self.rows(start_date, end_date)
+    if (last <= first):
+      return np.nan
+    count = self.prefix_count[last] - self.prefix_count[first]
+    if (count == 0):
+      return np.nan
+    return (self.prefix_sum[last] - self.prefix_sum[first]) / count
+
+
+  def max(self, start_date, end_date):
+    """
+    Gets the maximum of the values between two dates (both included)
+
+    Args:
+      start_date: first date of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      end_date: last date of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      maximum of the values (NaN if there are no values)
+    """
+    first, last = self.rows(start_date, end_date)
+    if (last <= first):
+      return np.nan
+    k = (last - first).bit_length() - 1  # Two intervals of 2^k rows cover the whole interval
+    level = self.sparse_table[k]
+    return np.fmax(level[first], level[last - (1 << k)])
+
+
+  def means(self, start_dates, end_dates):
+    """
+    Gets the mean of the values of several intervals at once
+
+    Args:
+      start_dates: array with the first date of each interval (strings with the format '%Y-%m-%d %H:%M:%S')
+      end_dates: array with the last date of each interval (strings with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      array with the mean of each interval (NaN if there are no values)
+    """
+    first = np.searchsorted(self.dates, np.asarray(start_dates, dtype=str), side='left')
+    last = np.maximum(np.searchsorted(self.dates, np.asarray(end_dates, dtype=str), side='right'), first)
+    count = self.prefix_count[last] - self.prefix_count[first]
+    with np.errstate(invalid='ignore', divide='ignore'):
+      return np.where(count > 0, (self.prefix_sum[last] - self.prefix_sum[first]) / np.maximum(count, 1), np.nan)
+
+
+  def maxima(self, start_dates, end_dates):
+    """
+    Gets the maximum of the values of several intervals at once
+
+    Args:
+      start_dates: array with the first date of each interval (strings with the format '%Y-%m-%d %H:%M:%S')
+      end_dates: array with the last date of each interval (strings with the format '%Y-%m-%d %H:%M:%S')
+
+    Returns:
+      array with the maximum of each interval (NaN if there are no values)
+    """
+    first = np.searchsorted(self.dates, np.asarray(start_dates, dtype=str), side='left')
+    last = np.searchsorted(self.dates, np.asarray(end_dates, dtype=str), side='right')
+    maximums = np.full(len(first), np.nan)
+
+    lengths = last - first
+    levels = np.zeros(len(first), dtype=int)
+    levels[lengths > 0] = np.floor(np.log2(lengths[lengths > 0])).astype(int)  # Two intervals of 2^k rows cover each interval
+    for k in np.unique(levels[lengths > 0]):
+      queries = np.flatnonzero((lengths > 0) & (levels == k))
+      level = self.sparse_table[k]
+      maximums[queries] = np.fmax(level[first[queries]], level[last[queries] - (1 << k)])
+    return maximums
@@ -0,0 +1,218 @@
+import datetime
+import numpy as np
+from TimeslotItems import TimeslotItems
+from PlacedTimeslots import PlacedTimeslots
+
+
+class ProfileShiftEngine:
+
+  def __init__(self, minutes_workspace, final_workspace, n_bins_per_hour, fact):
+    """
+    Engine which updates the consumption profiles after the optimization.
+    Each placed timeslot is represented as a (old offset, new offset, length) triple of minutes and its consumption (from the original profile) is added to the new position with whole array adds.
+    The adds of all the items are queued and applied once per profile (see add and apply_additions), so finer bins (more items per timeslot) do not mean more dataframe updates.
+
+    Args:
+      minutes_workspace: ProfileWorkspace of the original consumption profiles (1/60Hz), from where the consumption of the timeslots is copied (e.g. of "(...)/output/minute")
+      final_workspace: ProfileWorkspace of the consumption profiles to update (e.g. of "(...)/output/afteroptimization")
+      n_bins_per_hour: number of bins per hour (parameter of the strategy) to know the quantity of bins in a day (e.g. if bins of 30 minutes, n_bins_per_hour = 2)
+      fact: minutes of each bin (e.g. if bins of 30 minutes, fact = 30)
+    """
+    self.minutes_workspace = minutes_workspace
+    self.final_workspace = final_workspace
+    self.n_bins_per_hour = n_bins_per_hour
+    self.fact = fact
+    self.origin = None
+    self.additions = {}
+    self.changed = False
+
+
+  def minute(self, date):
+    """
+    Converts a date to the integer minute timeline (minutes since the first minute of the netload)
+
+    Args:
+      date: date string with the format '%Y-%m-%d %H:%M:%S'
+
+    Returns:
+      number of minutes since the origin of the timeline
+    """
+    date_obj = datetime.datetime.strptime(str(date), '%Y-%m-%d %H:%M:%S')  # Convert string to datetime object
+    return int((date_obj - self.origin) // datetime.timedelta(minutes=1))
+
+
+  def date(self, minute):
+    """
+    Converts a minute of the integer timeline to a date
+
+    Args:
+      minute: number of minutes since the origin of the timeline
+
+    Returns:
+      date string with the format '%Y-%m-%d %H:%M:%S'
+    """
+    return str(self.origin + datetime.timedelta(minutes=int(minute)))
+
+
+  def get_shift(self, timeslot, timeslot_obj):
+    """
+    Converts a placed timeslot (item of the optimization) to the minutes it has to be moved
+
+    when there's more than one item of a timeslot:
+    1) if its the first hour - starts at the first minutes of the timeslot and ends at 59 miutes
+    2) if its a middle hour (not the first and not the last) - starts at 00 minutes and ends at 59 minutes
+    3) if its the last hour - starts at 00 and ends at the last minutes of the timeslot
+    e.g. timeslot from 8.53 to 10.15:
+    hour 8 (bin 9) -> 08:53 (original) - 08:59 (first)
+    hour 9 (bin 10) -> 09:00 - 09:59 (middle)
+    hour 10 (bin 11) -> 10:00 - 10:15 (original) (last)
+
+    Args:
+      timeslot: placed item of the optimization (record of TimeslotItems)
+      timeslot_obj: timeslot with all the information (Start, End, Appliance, Power, House, etc)
+
+    Returns:
+      array with 3 positions: old offset [0], new offset [1] and length [2] (in minutes of the timeline)
+    """
+    first_item_date = int(timeslot['first_bin']) - 1
+    timeslot_first_bin = int(timeslot['bin']) - 1  # bin 1 corresponds to midnight, bin 2 corresponds to 1 am, etc
+    timeslot_number_of_bins = int(timeslot['n_bins'])
+    timeslot_last_bin = first_item_date + (timeslot_number_of_bins - 1)
+    timeslot_bin_before_opt = int(timeslot['bin_before_opt']) - 1
+
+    day = self.minute(str(timeslot_obj["Start"])[0:10] + " 00:00:00")
+    start = self.minute(timeslot_obj["Start"])
+    end = self.minute(timeslot_obj["End"])
+    old_bin = day + timeslot_bin_before_opt * self.fact
+    new_bin = day + timeslot_first_bin * self.fact
+
+    if (timeslot_number_of_bins > 1):
+      if (first_item_date == timeslot_first_bin):
+        old_start, old_end, new_start = start, old_bin + self.fact - 1, new_bin + (start - old_bin)
+      elif (timeslot_first_bin == timeslot_last_bin):
+        old_start, old_end, new_start = old_bin, end, new_bin
+      else:
+        old_start, old_end, new_start = old_bin, old_bin + self.fact - 1, new_bin
+    else:
+      old_start, old_end, new_start = start, end, new_bin + (start - old_bin)
+
+    return [old_start, new_start, old_end - old_start + 1]
+
+
+  def add(self, name, column, minute, values):
+    """
+    Queues the add of an array of values to consecutive minutes of a column (applied with apply_additions, in the same order as they are queued)
+
+    Args:
+      name: relative name of the profile file in the final workspace (e.g. "netload.csv" or "house0/total.csv")
+      column: name of the column to update
+      minute: first minute (in the integer timeline)
+      values: array with one value per minute
+    """
+    timeline = self.final_workspace.get(name)[1]
+    rows = timeline.rows(self.origin + datetime.timedelta(minutes=int(minute)), len(values))
+    if (isinstance(rows, slice)):
+      rows = np.arange(rows.start, rows.stop)
+    self.additions.setdefault((name, column), [[], []])
+    self.additions[(name, column)][0].append(rows)
+    self.additions[(name, column)][1].append(values)
+
+
+  def apply_additions(self):
+    """
+    Applies the queued adds (one update per profile column, the same as adding them one by one) and marks the profiles as dirty
+    """
+    for (name, column), (rows, values) in self.additions.items():
+      df = self.final_workspace.get(name)[0]
+      rows = np.concatenate(rows)
+      column_index = df.columns.get_loc(column)
+      updated = df.iloc[:, column_index].to_numpy(dtype=float, copy=True)
+      np.add.at(updated, rows, np.concatenate(values))  # Unbuffered, so the adds to the same minute are accumulated in order
+      touched = np.unique(rows)
+      updated = updated[touched]  # Accumulated in float64
+      if (self.final_workspace.compact):
+        updated = updated.astype(np.float32)
+      elif (df.dtypes.iloc[column_index].kind != 'f' and (updated % 1 != 0).any()):
+        df[column] = df[column].astype(float)  # Fractional values change an integer column to float64 (as the pandas arithmetic did)
+      df.iloc[touched, column_index] = updated
+      self.final_workspace.mark_dirty(name)
+
+    self.additions = {}
+
+
+  def apply(self, placed_timeslots, all_timeslots_objects, previous_timeslots=None):
+    """
+    Adds the consumption of the placed timeslots to their new position (appliance, house total, community and netload profiles).
+    If the placement which was applied before to the profiles is given, only the difference is applied: the consumption of the items which are no longer placed the same way is subtracted and the one of the new items is added.
+    The updated profiles are marked as dirty in the final workspace (they are written when the workspace is flushed). If only the difference is applied and nothing changes (same placement), no profile is marked.
+
+    Args:
+      placed_timeslots: TimeslotItems with the placed items (or array of the items strings of the optimization)
+      all_timeslots_objects: array of all timeslots with all the information (Start, End, Appliance, Power, House, etc)
+      previous_timeslots: TimeslotItems with the items already applied to the profiles of the final workspace (if None, the profiles do not have any item applied)
+
+    Returns:
+      PlacedTimeslots with the placed timeslots (House, Appliance, TimeslotNumber, NewStart, NewEnd)
+    """
+    workspace = self.final_workspace
+    netload_after = workspace.netload()
+    self.origin = netload_after[1].start
+
+    placed_timeslots = TimeslotItems.from_strings(placed_timeslots)
+    if (previous_timeslots is None):
+      shifts = [[placed_timeslots, 1]]
+    else:
+      previous_timeslots = TimeslotItems.from_strings(previous_timeslots)
+      shifts = [[previous_timeslots.difference(placed_timeslots), -1], [placed_timeslots.difference(previous_timeslots), 1]]
+    self.changed = previous_timeslots is None or any(len(items) > 0 for items, sign in shifts)
+
+    # list of placed timeslots
+    placed_timeslots_array = []
+    for timeslot in placed_timeslots:
+      timeslot_number = int(timeslot['number'])
+      timeslot_obj = all_timeslots_objects[timeslot_number]  # If a timeslot is placed, all the subitemms are placed
+      old_offset, new_offset, length = self.get_shift(timeslot, timeslot_obj)
+      placed_timeslots_array.append((timeslot_obj["House"], timeslot_obj["Appliance"], timeslot_number, self.date(new_offset), self.date(new_offset + length - 1)))
+
+    if (not self.changed):
+      return PlacedTimeslots.from_list(placed_timeslots_array)
+
+    workspace.community()
+    workspace.mark_dirty('netload.csv')
+    workspace.mark_dirty('community.csv')
+    shifted = False
+
+    for items, sign in shifts:
+      for timeslot in items:
+
+        # Gets all the fields of the timeslot (Start, End, Appliance, House, etc)
+        timeslot_obj = all_timeslots_objects[int(timeslot['number'])]
+        house = timeslot_obj["House"]
+        appliance = timeslot_obj["Appliance"]
+
+        old_offset, new_offset, length = self.get_shift(timeslot, timeslot_obj)
+
+        # Consumption of the timeslot before the optimization, added to (or, if the item is no longer placed there, subtracted from) the new position of the timeslot
+        df_before, before_timeline = self.minutes_workspace.appliance(house, appliance)
+        before_rows = before_timeline.rows(self.origin + datetime.timedelta(minutes=old_offset), length)
+        power = df_before['Power'].iloc[before_rows].to_numpy(dtype=float)
+        if (sign < 0):
+          power = -power
+
+        self.add('netload.csv', 'Demand', new_offset, power)
+        self.add('community.csv', 'Power', new_offset, power)
+        self.add(workspace.house_file(house, 'total'), 'Power', new_offset, power)
+        self.add(workspace.house_file(house, appliance), 'Power', new_offset, power)
+        workspace.mark_dirty(workspace.house_file(house, 'total'))
+        workspace.mark_dirty(workspace.house_file(house, appliance))
+        shifted = shifted or length > 0
+
+    self.apply_additions()
+
+    # After all timeslots updated - the production can not be negative and the netload is calculated once
+    df_netload = netload_after[0]
+    if (shifted):
+      df_netload.loc[df_netload['Production'] < 0, 'Production'] = 0
+    df_netload["Netload"] = df_netload["Demand"] - df_netload["Production"]
+
+    return PlacedTimeslots.from_list(placed_timeslots_array)
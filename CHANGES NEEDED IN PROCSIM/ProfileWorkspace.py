@@ -0,0 +1,338 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from MinuteTimeline import MinuteTimeline
+from CopyOnWriteFolder import CopyOnWriteFolder
+
+
+class ProfileWorkspace:
+
+  NETLOAD_COLUMNS = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
+  POWER_COLUMNS = ['Date', 'Power']
+
+  def __init__(self, path, processes=1, compact=False):
+    """
+    In-memory workspace of the consumption profiles of a folder (netload, community, houses total and appliances).
+    Each profile is read only the first time it is needed and kept in memory while it is updated. The updated (dirty) profiles are written once, when the workspace is flushed.
+    The files of different houses are independent, so they can be read (see preload) and written (see flush) by a pool of processes, one house per task. The community and netload (the sums of all the houses) are handled by this process.
+    In compact mode the profiles are kept as float32 columns without the Date column: all the profiles share the minute index of one MinuteTimeline (the Date column is only created to write the files, see dataframe).
+
+    Args:
+      path: path of the consumption profiles (e.g. "(...)/output/afteroptimization")
+      processes: maximum number of processes to read and write the files of the houses (if None, the number of CPUs; if 1, everything is done in this process)
+      compact: if True, the profiles are kept in compact mode (float32, less memory but the values are rounded to float32 precision)
+    """
+    self.path = path
+    self.processes = processes if processes is not None else (os.cpu_count() or 1)
+    self.compact = compact
+    self.profiles = {}
+    self.dirty = set()
+    self.timeline = None
+    self.flush_thread = None
+    self.flush_error = None
+
+
+  def house_file(self, house, name):
+    """
+    Gets the name (relative to the folder) of a file of a house
+
+    Args:
+      house: house number
+      name: name of the profile without extension (e.g. "total" or the appliance name)
+
+    Returns:
+      relative name of the file (e.g. "house0/total.csv")
+    """
+    return 'house' + str(house) + '/' + str(name) + '.csv'
+
+
+  def columns(self, name):
+    """
+    Gets the columns of a profile
+
+    Args:
+      name: relative name of the file
+
+    Returns:
+      array with the names of the columns
+    """
+    return self.NETLOAD_COLUMNS if name == 'netload.csv' else self.POWER_COLUMNS
+
+
+  def get(self, name):
+    """
+    Gets a profile (reads the file only the first time)
+
+    Args:
+      name: relative name of the file (e.g. "netload.csv" or "house0/total.csv")
+
+    Returns:
+      array with 2 positions: dataframe [0] and MinuteTimeline [1] of the profile (in compact mode, the dataframe has no Date column)
+    """
+    if (name not in self.profiles):
+      self.add_profile(name, *ProfileWorkspace.read_profile(self.path + '/' + name, self.columns(name), self.compact))
+
+    return self.profiles[name]
+
+
+  def dataframe(self, name):
+    """
+    Gets a copy of a profile with all its columns, including the Date column (e.g. to be used outside of the workspace)
+
+    Args:
+      name: relative name of the file
+
+    Returns:
+      dataframe of the profile
+    """
+    df, timeline = self.get(name)
+    if (not self.compact):
+      return df.copy()
+
+    df = df.copy()
+    df.insert(0, 'Date', timeline.column())
+    return df
+
+
+  def add_profile(self, name, df, timeline=None):
+    """
+    Keeps a profile which was read in the workspace (with its MinuteTimeline)
+
+    Args:
+      name: relative name of the file
+      df: dataframe of the profile
+      timeline: MinuteTimeline of the profile, if it was read in compact mode (otherwise it is created from the Date column)
+    """
+    if (timeline is not None):
+      if (self.timeline is not None and self.timeline.same(timeline)):
+        timeline = self.timeline
+    elif (self.timeline is not None and self.timeline.matches(df['Date'])):
+      timeline = self.timeline
+    else:
+      timeline = MinuteTimeline(df['Date'])
+
+    if (self.timeline is None):
+      self.timeline = timeline  # The first timeline is shared with the other profiles which have the same dates
+
+    self.profiles[name] = [df, timeline]
+
+
+  def house_groups(self, names):
+    """
+    Groups the names of the files by house (the files which are not of a house, e.g. netload and community, are in the last group)
+
+    Args:
+      names: array with the relative names of the files
+
+    Returns:
+      array of groups, each one an array with the relative names of the files of a house
+    """
+    groups = {}
+    for name in sorted(names):
+      folder = name.split('/')[0] if '/' in name else None
+      groups.setdefault(folder, []).append(name)
+    return [groups[folder] for folder in groups if folder is not None] + ([groups[None]] if None in groups else [])
+
+
+  def preload(self, names):
+    """
+    Reads several profiles at once (the houses are read in parallel, one house per task)
+
+    Args:
+      names: array with the relative names of the files (the ones already in the workspace are not read again)
+    """
+    names = [name for name in set(names) if name not in self.profiles]
+    groups = self.house_groups(names)
+    tasks = [[[self.path + '/' + name, self.columns(name), self.compact] for name in group] for group in groups]
+
+    if (self.processes <= 1 or len(tasks) <= 1):
+      dataframes = [ProfileWorkspace.read_profiles(task) for task in tasks]
+    else:
+      with ProcessPoolExecutor(max_workers=min(self.processes, len(tasks))) as pool:
+        dataframes = list(pool.map(ProfileWorkspace.read_profiles, tasks))
+
+    for group, group_dataframes in zip(groups, dataframes):
+      for name, profile in zip(group, group_dataframes):
+        self.add_profile(name, *profile)
+
+
+  @staticmethod
+  def read_profile(path, columns, compact=False):
+    """
+    Reads a profile file
+
+    Args:
+      path: path of the file (resolved if the folder is an overlay, see CopyOnWriteFolder)
+      columns: names of the columns
+      compact: if True, the Date column is replaced by a MinuteTimeline (without the dates strings, if they are contiguous) and the values are converted to float32
+
+    Returns:
+      array with 2 positions: dataframe [0] and MinuteTimeline [1] of the profile (None if not compact, it is created when the profile is added to the workspace)
+    """
+    df = pd.read_csv(CopyOnWriteFolder.resolve(path), sep=';', float_precision='round_trip')  # round_trip so the values are written back exactly as they were read
+    df.columns = columns
+    if (not compact):
+      return [df, None]
+
+    timeline = MinuteTimeline(df.pop('Date')).compact()
+    return [df.astype(np.float32), timeline]
+
+
+  @staticmethod
+  def read_profiles(files):
+    """
+    Reads the profiles of a house (task of the pool of processes)
+
+    Args:
+      files: array of the files, each one an array with the path [0], the names of the columns [1] and the compact mode [2]
+
+    Returns:
+      array with the dataframe and MinuteTimeline of each file (see read_profile)
+    """
+    return [ProfileWorkspace.read_profile(path, columns, compact) for path, columns, compact in files]
+
+
+  @staticmethod
+  def write_profiles(files):
+    """
+    Writes the profiles of a house (task of the pool of processes)
+
+    Args:
+      files: array of the files, each one an array with the path [0], the dataframe [1], the names of the columns [2] and the MinuteTimeline of the profile [3] (only used if the dataframe has no Date column)
+    """
+    for path, df, columns, timeline in files:
+      if ('Date' not in df.columns):
+        df = df.assign(Date=timeline.column())
+
+      # Replaced (instead of written in place) since it can be hardlinked to the file of other folder
+      CopyOnWriteFolder.replace_file(path, lambda tmp_path: df.to_csv(tmp_path, columns=columns, sep=";", index=False))
+
+
+  def netload(self):
+    """
+    Returns:
+      array with the netload dataframe [0] and its MinuteTimeline [1]
+    """
+    return self.get('netload.csv')
+
+
+  def community(self):
+    """
+    Returns:
+      array with the community dataframe [0] and its MinuteTimeline [1]
+    """
+    return self.get('community.csv')
+
+
+  def total(self, house):
+    """
+    Args:
+      house: house number
+
+    Returns:
+      array with the total consumption dataframe of the house [0] and its MinuteTimeline [1]
+    """
+    return self.get(self.house_file(house, 'total'))
+
+
+  def appliance(self, house, appliance):
+    """
+    Args:
+      house: house number
+      appliance: appliance name
+
+    Returns:
+      array with the appliance consumption dataframe of the house [0] and its MinuteTimeline [1]
+    """
+    return self.get(self.house_file(house, appliance))
+
+
+  def mark_dirty(self, name):
+    """
+    Marks a profile as updated (so that it is written when the workspace is flushed)
+
+    Args:
+      name: relative name of the file
+    """
+    self.dirty.add(name)
+
+
+  def flush(self, background=False, after=None):
+    """
+    Writes all the updated profiles (each one once). The houses are written in parallel (one house per task) and the community and netload by this process, at the end.
+    If background is True, the profiles are written by a thread and this function returns immediately (see wait). The profiles must not be changed until they are written.
+
+    Args:
+      background: if True, the files are written in background
+      after: function called after all the files are written (e.g. to save the placement applied to them), if any
+    """
+    if (background):
+      self.flush_thread = threading.Thread(target=self.flush_background, args=(after,))
+      self.flush_thread.start()
+      return
+
+    groups = self.house_groups(self.dirty)
+    tasks = [[[os.path.join('', self.path + '/' + name), self.profiles[name][0], self.columns(name), self.profiles[name][1]] for name in group] for group in groups]
+    house_tasks = [task for task, group in zip(tasks, groups) if '/' in group[0]]
+    other_tasks = [task for task, group in zip(tasks, groups) if '/' not in group[0]]
+
+    if (self.processes <= 1 or len(house_tasks) <= 1):
+      for task in house_tasks:
+        ProfileWorkspace.write_profiles(task)
+    else:
+      with ProcessPoolExecutor(max_workers=min(self.processes, len(house_tasks))) as pool:
+        list(pool.map(ProfileWorkspace.write_profiles, house_tasks))
+
+    for task in other_tasks:
+      ProfileWorkspace.write_profiles(task)
+
+    self.dirty = set()
+    if (after is not None):
+      after()
+
+
+  def flush_background(self, after=None):
+    """
+    Writes the updated profiles (target of the background thread), keeping the error (if any) to be raised by wait
+
+    Args:
+      after: function called after all the files are written, if any
+    """
+    try:
+      self.flush(after=after)
+    except Exception as ex:
+      self.flush_error = ex
+
+
+  def wait(self):
+    """
+    Waits until the profiles written in background are written (raises the error of the background thread, if any)
+    """
+    if (self.flush_thread is not None):
+      self.flush_thread.join()
+      self.flush_thread = None
+    if (self.flush_error is not None):
+      error = self.flush_error
+      self.flush_error = None
+      raise error
+
+
+  def handoff(self, path):
+    """
+    Creates the workspace of other folder which starts from the profiles of this workspace (e.g. the 2nd step of the optimization starts from the profiles after the 1st step), without reading them again.
+    The profiles are shared (not copied), so this workspace must not be used after the handoff. The files of this workspace have to be written before (see wait), since the folder of the new workspace is created from them.
+
+    Args:
+      path: path of the consumption profiles of the new workspace (e.g. "(...)/output/aftersecoptimization")
+
+    Returns:
+      ProfileWorkspace of the folder with the profiles of this workspace (none of them dirty)
+    """
+    self.wait()
+    workspace = ProfileWorkspace(path, self.processes, self.compact)
+    workspace.profiles = self.profiles
+    workspace.timeline = self.timeline
+    self.profiles = {}
+    return workspace
@@ -0,0 +1,179 @@
+import os
+import sys
+import shutil
+import inspect
+import pickle
+import numbers
+import hashlib
+import tempfile
+import numpy as np
+from OptimizationInputs import OptimizationInputs
+from OptimizationLog import OptimizationLog
+
+logger = OptimizationLog.get_logger('ResultCache')
+
+
+class ResultCache:
+
+  versions = {}  # Hash of the source of each module of the optimizers (see version), read once in each process
+
+  def __init__(self, path):
+    """
+    Outputs of the optimization of the windows (placed and not placed timeslots, dataframes and statistics - see DayWindows.solve_window), kept in files by a fingerprint of the window:
+    the optimizer (its name and its source, see version), all its arguments (the inputs of prepare_inputs of the window, prices, EVs, etc), the arguments of its execute_knapsack function (e.g. the step) and its SolverOptions.
+    If a window is solved again with exactly the same inputs and parameters, its output is read from the file instead of solving it again (see DayWindows.solve).
+
+    Args:
+      path: folder of the files of the outputs (e.g. "(...)/inputs/results")
+    """
+    self.path = path
+
+
+  @staticmethod
+  def run_path(path_steps_after_first):
+    """
+    Gets the folder of the cached outputs of a run (in its inputs folder, see OptimizationInputs.run_path)
+
+    Args:
+      path_steps_after_first: path of the consumption profiles after the 1st step of the optimization
+
+    Returns:
+      path of the folder (e.g. "(...)/output/community-1days/strategy/inputs/results")
+    """
+    return OptimizationInputs.run_path(path_steps_after_first) + '/results'
+
+
+  @staticmethod
+  def fingerprint(values):
+    """
+    Gets a hash of the content of values (arrays, numbers, strings, etc), which only depends on the values (see encode), not on their types or on how they are shared (as the bytes of a pickle do)
+
+    Args:
+      values: values to hash
+
+    Returns:
+      hexadecimal string with the hash
+    """
+    digest = hashlib.sha1()
+    ResultCache.encode(values, digest)
+    return digest.hexdigest()
+
+
+  @staticmethod
+  def encode(value, digest):
+    """
+    Adds a canonical encoding of a value to a hash: numbers (Python or numpy, integer or float) and numeric arrays by their float64 values, sequences by their length and items,
+    dictionaries by their sorted keys, classes and functions by their names and other objects by their class and attributes
+
+    Args:
+      value: value to encode
+      digest: hash (e.g. hashlib.sha1())
+    """
+    if (value is None):
+      digest.update(b'N')
+    elif (isinstance(value, (bool, np.bool_))):
+      digest.update(b'B1' if value else b'B0')
+    elif (isinstance(value, numbers.Real)):
+      digest.update(b'F' + repr(float(value)).encode())
+    elif (isinstance(value, (str, bytes))):
+      encoded = value.encode() if isinstance(value, str) else value
+      digest.update(b'S' + str(len(encoded)).encode() + b':' + encoded)
+    elif (isinstance(value, np.ndarray) and value.dtype.kind in 'biuf'):
+      digest.update(b'A' + repr(value.shape).encode() + b':' + np.ascontiguousarray(value, dtype=np.float64).tobytes())
+    elif (isinstance(value, (list, tuple, np.ndarray))):
+      digest.update(b'L' + str(len(value)).encode() + b':')
+      for item in value:
+        ResultCache.encode(item, digest)
+    elif (isinstance(value, dict)):
+      digest.update(b'D' + str(len(value)).encode() + b':')
+      for key in sorted(value, key=str):
+        ResultCache.encode(str(key), digest)
+        ResultCache.encode(value[key], digest)
+    elif (isinstance(value, type) or callable(value)):
+      ResultCache.encode('C' + value.__module__ + '.' + value.__qualname__, digest)
+    else:
+      ResultCache.encode('O' + type(value).__module__ + '.' + type(value).__qualname__, digest)
+      ResultCache.encode(vars(value), digest)
+
+
+  @staticmethod
+  def version(optimizer):
+    """
+    Gets a hash of the source of an optimizer: the file of its module and the files of the modules it uses (the modules, classes and functions imported by it, e.g. KnapsackBalancing in MinimizeCostsPyomo),
+    so the outputs cached before any of them changed (e.g. an upgrade of procsimulator) are not used
+
+    Args:
+      optimizer: class or function which creates the optimizer of a window (see DayWindows.solve_window)
+
+    Returns:
+      hexadecimal string with the hash
+    """
+    name = optimizer.__module__
+    if (name not in ResultCache.versions):
+      module = sys.modules[name]
+      used = [value if inspect.ismodule(value) else sys.modules.get(value.__module__) for value in vars(module).values() if inspect.ismodule(value) or inspect.isclass(value) or inspect.isfunction(value)]
+      digest = hashlib.sha1()
+      for path in sorted(set(getattr(used_module, '__file__', None) for used_module in [module] + used) - {None}):
+        with open(path, 'rb') as file:
+          digest.update(file.read())
+      ResultCache.versions[name] = digest.hexdigest()
+    return ResultCache.versions[name]
+
+
+  @staticmethod
+  def key(window):
+    """
+    Gets the fingerprint of a window
+
+    Args:
+      window: window to solve (see DayWindows.solve_window)
+
+    Returns:
+      hexadecimal string with the fingerprint
+    """
+    return ResultCache.fingerprint([window[0].__module__, window[0].__qualname__, ResultCache.version(window[0])] + list(window[1:4]))
+
+
+  def load(self, key):
+    """
+    Reads the output of a window
+
+    Args:
+      key: fingerprint of the window
+
+    Returns:
+      output of the window (see DayWindows.solve_window), with cached True in its statistics, or None if it was not cached
+    """
+    path = self.path + '/' + key + '.pkl'
+    if (not os.path.isfile(path)):
+      return None
+    try:
+      with open(path, 'rb') as file:
+        output = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+      logger.warning("The cached output %s can not be read, the window is solved again", path)
+      return None
+    output[3] = dict(output[3], cached=True)
+    return output
+
+
+  def save(self, key, output):
+    """
+    Writes the output of a window (to a temporary file first, so that an interrupted write does not leave a broken file)
+
+    Args:
+      key: fingerprint of the window
+      output: output of the window (see DayWindows.solve_window)
+    """
+    os.makedirs(self.path, exist_ok=True)
+    file, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+    with os.fdopen(file, 'wb') as tmp_file:
+      pickle.dump(output, tmp_file, protocol=4)
+    os.replace(tmp_path, self.path + '/' + key + '.pkl')
+
+
+  def clear(self):
+    """
+    Removes all the cached outputs
+    """
+    shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,132 @@
+import shutil
+import importlib.util
+
+
+class SolverOptions:
+
+  SOLVERS = ['highs', 'cbc', 'glpk']  # Open-source solvers supported (in order of preference)
+  OPTION_NAMES = {'highs': ['time_limit', 'mip_rel_gap', 'threads'],
+                  'cbc': ['seconds', 'ratioGap', 'threads'],
+                  'glpk': ['tmlim', 'mipgap', None]}  # Names of the time limit, relative MIP gap and threads options of each solver (None - not supported)
+
+  def __init__(self, solver=None, time_limit=None, mip_gap=None, threads=None):
+    """
+    Options of the solver of the optimization model (e.g. KnapsackBalancing of the MinimizeCostsPyomo).
+    The options which are None are not given to the solver (the solver uses its defaults).
+
+    Args:
+      solver: name of the solver (one of SOLVERS), if None the first one installed (see installed)
+      time_limit: maximum time of the solve in seconds
+      mip_gap: relative MIP gap at which the solve stops (e.g. 0.01 - 1%)
+      threads: number of threads of the solver
+    """
+    self.solver = solver
+    self.time_limit = time_limit
+    self.mip_gap = mip_gap
+    self.threads = threads
+
+
+  @staticmethod
+  def installed():
+    """
+    Gets the supported solvers installed in this machine (highs with the highspy package, cbc and glpk with their executables in the PATH)
+
+    Returns:
+      array with the names of the installed solvers (in order of preference)
+    """
+    found = {'highs': importlib.util.find_spec('highspy') is not None,
+             'cbc': shutil.which('cbc') is not None,
+             'glpk': shutil.which('glpsol') is not None}
+    return [solver for solver in SolverOptions.SOLVERS if found[solver]]
+
+
+  def get_solver(self):
+    """
+    Gets the solver to use
+
+    Returns:
+      name of the solver (if no solver was chosen, the first one installed, or None if none is installed - the default of the optimizer is used)
+    """
+    if (self.solver is None):
+      installed = self.installed()
+      return installed[0] if len(installed) > 0 else None
+
+    if (self.solver not in self.SOLVERS):
+      raise ValueError("Solver " + str(self.solver) + " is not supported (supported solvers: " + ", ".join(self.SOLVERS) + ")")
+    return self.solver
+
+
+  def get_options(self, solver):
+    """
+    Converts the options to the names of the options of a solver
+
+    Args:
+      solver: name of the solver
+
+    Returns:
+      dictionary with the options of the solver (only the ones which are set and supported by the solver)
+    """
+    options = {}
+    for name, value in zip(self.OPTION_NAMES[solver], [self.time_limit, self.mip_gap, self.threads]):
+      if (name is not None and value is not None):
+        options[name] = value
+    return options
+
+
+  def is_set(self):
+    """
+    Checks if any option was chosen (otherwise the solver and its defaults are the ones of the optimizer)
+
+    Returns:
+      True if the solver, the time limit, the MIP gap or the threads were chosen, otherwise False
+    """
+    return any(value is not None for value in [self.solver, self.time_limit, self.mip_gap, self.threads])
+
+
+  def apply(self, optimizer):
+    """
+    Gives the solver and its options to an optimizer, before it solves the model (attributes solver and solver_options, used by the optimizer when the model is solved).
+    Only the optimizers which have the attribute solver_options (e.g. set to None in their constructor) read these attributes, the others solve the model with their own solver and options
+
+    Args:
+      optimizer: optimizer of a window (e.g. KnapsackBalancing)
+
+    Returns:
+      True if the solver and its options were given to the optimizer, otherwise False
+    """
+    solver = self.get_solver()
+    if (solver is None or not hasattr(optimizer, 'solver_options')):
+      return False
+    optimizer.solver = solver
+    optimizer.solver_options = self.get_options(solver)
+    return True
+
+
+  @staticmethod
+  def statistics(optimizer):
+    """
+    Gets the statistics of the model solved by an optimizer (from its attributes model - Pyomo model - and results - solver results), if it has them
+
+    Args:
+      optimizer: optimizer of a window, after the solve
+
+    Returns:
+      dictionary with the objective, relative gap, number of variables and number of constraints (None if not available)
+    """
+    stats = {"objective": None, "gap": None, "variables": None, "constraints": None}
+
+    model = getattr(optimizer, 'model', None)
+    if (model is not None and hasattr(model, 'nvariables')):
+      stats["variables"] = model.nvariables()
+      stats["constraints"] = model.nconstraints()
+
+    results = getattr(optimizer, 'results', None)
+    problem = getattr(results, 'problem', None)
+    if (problem is not None):
+      upper_bound = getattr(problem, 'upper_bound', None)
+      lower_bound = getattr(problem, 'lower_bound', None)
+      stats["objective"] = None if upper_bound is None else float(upper_bound)  # Incumbent of the minimization
+      if (upper_bound is not None and lower_bound is not None and abs(float(upper_bound)) != float('inf')):
+        stats["gap"] = abs(float(upper_bound) - float(lower_bound)) / max(abs(float(upper_bound)), 1e-10)
+
+    return stats
@@ -0,0 +1,155 @@
+import numpy as np
+
+
+class TimeslotIndex:
+
+  def __init__(self, timeslots):
+    """
+    Index of the timeslots of the community (sorted start and end minutes), to find the timeslots which overlap an interval, are active at a minute or start in a window without going through all the timeslots.
+    There is one index for all the timeslots, one for each house and one for each appliance of each house. Each query is 2 binary searches (plus the timeslots found).
+
+    Args:
+      timeslots: array of all timeslots with all the information (Start, End, Appliance, House, etc), as returned by the ConsumptionGenerator
+    """
+    self.timeslots = timeslots
+    starts = self.to_minutes([timeslot["Start"] for timeslot in timeslots])
+    ends = self.to_minutes([timeslot["End"] for timeslot in timeslots])
+
+    groups = {}
+    for number, timeslot in enumerate(timeslots):
+      house = int(timeslot["House"])
+      for key in [(None, None), (house, None), (house, str(timeslot["Appliance"]))]:
+        groups.setdefault(key, []).append(number)
+
+    # Each group: start minutes (sorted), end minutes, timeslot numbers and the maximum duration (the timeslots which can overlap an interval start at most that many minutes before it)
+    self.groups = {}
+    for key, numbers in groups.items():
+      numbers = np.array(numbers, dtype=np.int64)
+      order = np.lexsort((numbers, starts[numbers]))
+      numbers = numbers[order]
+      self.groups[key] = [starts[numbers], ends[numbers], numbers, int((ends[numbers] - starts[numbers]).max())]
+
+
+  @staticmethod
+  def to_minutes(dates):
+    """
+    Converts dates to minutes (since 1970-01-01)
+
+    Args:
+      dates: array of dates (strings with the format '%Y-%m-%d %H:%M:%S' or '%Y-%m-%d')
+
+    Returns:
+      array with the minute of each date
+    """
+    return np.array([str(date)[0:19] for date in dates], dtype='datetime64[m]').astype(np.int64)
+
+
+  def group(self, house, appliance):
+    """
+    Args:
+      house: house number (if None, all the houses)
+      appliance: appliance name (if None, all the appliances)
+
+    Returns:
+      array with 4 positions: start minutes [0], end minutes [1], timeslot numbers [2] and maximum duration [3] of the timeslots of the house/appliance (None if there are none)
+    """
+    return self.groups.get((None if house is None else int(house), None if appliance is None or house is None else str(appliance)))
+
+
+  def overlapping(self, start, end, house=None, appliance=None):
+    """
+    Gets the timeslots which overlap an interval (have at least one minute in it)
+
+    Args:
+      start: first minute of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      end: last minute of the interval (string with the format '%Y-%m-%d %H:%M:%S')
+      house: house number (if None, all the houses)
+      appliance: appliance name (if None, all the appliances of the house)
+
+    Returns:
+      array with the numbers (positions in timeslots) of the timeslots found, in increasing order
+    """
+    group = self.group(house, appliance)
+    if (group is None):
+      return np.zeros(0, dtype=np.int64)
+
+    starts, ends, numbers, max_duration = group
+    first_minute, last_minute = self.to_minutes([start, end])
+    first = np.searchsorted(starts, first_minute - max_duration, 'left')
+    last = np.searchsorted(starts, last_minute, 'right')
+    return np.sort(numbers[first:last][ends[first:last] >= first_minute])
+
+
+  def active_at(self, minute, house=None, appliance=None):
+    """
+    Gets the timeslots which are active at a minute
+
+    Args:
+      minute: minute (string with the format '%Y-%m-%d %H:%M:%S')
+      house: house number (if None, all the houses)
+      appliance: appliance name (if None, all the appliances of the house)
+
+    Returns:
+      array with the numbers of the timeslots found, in increasing order
+    """
+    return self.overlapping(minute, minute, house, appliance)
+
+
+  def starting_in(self, start, end, house=None, appliance=None):
+    """
+    Gets the timeslots which start in a window (e.g. the timeslots of a day)
+
+    Args:
+      start: first minute of the window (string with the format '%Y-%m-%d %H:%M:%S')
+      end: last minute of the window (string with the format '%Y-%m-%d %H:%M:%S')
+      house: house number (if None, all the houses)
+      appliance: appliance name (if None, all the appliances of the house)
+
+    Returns:
+      array with the numbers of the timeslots found, in increasing order
+    """
+    group = self.group(house, appliance)
+    if (group is None):
+      return np.zeros(0, dtype=np.int64)
+
+    starts, ends, numbers, max_duration = group
+    first_minute, last_minute = self.to_minutes([start, end])
+    return np.sort(numbers[np.searchsorted(starts, first_minute, 'left'):np.searchsorted(starts, last_minute, 'right')])
+
+
+  def day(self, day, house=None, appliance=None):
+    """
+    Gets the timeslots which start in a day
+
+    Args:
+      day: day (string with the format '%Y-%m-%d')
+      house: house number (if None, all the houses)
+      appliance: appliance name (if None, all the appliances of the house)
+
+    Returns:
+      array with the numbers of the timeslots found, in increasing order
+    """
+    return self.starting_in(str(day)[0:10] + ' 00:00:00', str(day)[0:10] + ' 23:59:59', house, appliance)
+
+
+  def appliances(self):
+    """
+    Returns:
+      array with the (house, appliance) pairs which have timeslots, sorted
+    """
+    return sorted(key for key in self.groups if key[1] is not None)
+
+
+  def by_start(self, house=None, appliance=None):
+    """
+    Gets the timeslots of a house/appliance sorted by start
+
+    Args:
+      house: house number (if None, all the houses)
+      appliance: appliance name (if None, all the appliances of the house)
+
+    Returns:
+      array with the timeslots (the same objects of timeslots)
+    """
+    group = self.group(house, appliance)
+    return [] if group is None else [self.timeslots[number] for number in group[2]]
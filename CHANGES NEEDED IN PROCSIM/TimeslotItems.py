@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class TimeslotItems:
+
+  DTYPE = np.dtype([('number', np.int64), ('subitem', np.int64), ('weight', np.float64), ('bin', np.int64), ('n_bins', np.int64),
+                    ('first_bin', np.int64), ('max', np.float64), ('bin_before_opt', np.int64), ('flexibility', np.float64)])
+
+  def __init__(self, records=None):
+    """
+    Items (subitems of the timeslots, one per bin) placed or not placed by the optimization, kept in a structured array (one field per column) instead of strings with the fields separated by "-".
+    The strings of the optimizer (Knapsack) are parsed once (see from_strings) and converted back only when needed (see to_strings).
+
+    Args:
+      records: structured array with the DTYPE fields (empty if None)
+    """
+    self.records = np.zeros(0, dtype=self.DTYPE) if records is None else np.asarray(records, dtype=self.DTYPE)
+
+
+  @staticmethod
+  def from_strings(items):
+    """
+    Parses the items returned by the optimization (strings with the format "TimeslotNumber-SubItem-Weight-Bin-NumberOfBins-FirstBin-Maximum-BinBeforeOptimization-Flexibility")
+    If the items are already a TimeslotItems, they are returned as they are.
+
+    Args:
+      items: array of the items strings
+
+    Returns:
+      TimeslotItems with the items
+    """
+    if (isinstance(items, TimeslotItems)):
+      return items
+
+    records = np.zeros(len(items), dtype=TimeslotItems.DTYPE)
+    if (len(items) > 0):
+      fields = np.array([str(item).split("-") for item in items], dtype=float)
+      for column, name in enumerate(TimeslotItems.DTYPE.names):
+        records[name] = fields[:, column]
+    return TimeslotItems(records)
+
+
+  @staticmethod
+  def concatenate(items):
+    """
+    Joins several TimeslotItems (e.g. of different windows of the optimization) into one
+
+    Args:
+      items: array of TimeslotItems (or arrays of items strings)
+
+    Returns:
+      TimeslotItems with all the items (in the same order)
+    """
+    records = [TimeslotItems.from_strings(item).records for item in items]
+    return TimeslotItems(np.concatenate(records) if len(records) > 0 else None)
+
+
+  def difference(self, other):
+    """
+    Gets the items which are not in other items (e.g. the items of a new optimization which were not placed the same way in the previous one)
+
+    Args:
+      other: TimeslotItems (or array of the items strings)
+
+    Returns:
+      TimeslotItems with the items which are not in other (in the same order)
+    """
+    other_records = set(TimeslotItems.from_strings(other).records.tolist())
+    return TimeslotItems(self.records[[record not in other_records for record in self.records.tolist()]] if len(self.records) > 0 else None)
+
+
+  def to_strings(self):
+    """
+    Converts the items to the strings of the optimization (compatibility with the code that still uses them)
+
+    Returns:
+      array of the items strings (fields separated by "-")
+    """
+    return ["-".join(str(value) for value in record.tolist()) for record in self.records]
+
+
+  def __len__(self):
+    return len(self.records)
+
+
+  def __iter__(self):
+    return iter(self.records)
+
+
+  def __getitem__(self, index):
+    return self.records[index]
+
+
+  def group_by_timeslot(self):
+    """
+    Groups the items by timeslot (the items of each timeslot are consecutive), as the inputs of the optimization.
+    Only the timeslots with all their items (NumberOfBins items) are returned.
+
+    Returns:
+      array with 5 positions: bins [0], weights [1], timeslot numbers [2], maximums [3] and flexibilities [4], each one an array with one array per timeslot
+    """
+    records = self.records
+    if (len(records) == 0):
+      return [[], [], [], [], []]
+
+    starts = np.flatnonzero(np.concatenate(([True], records['number'][1:] != records['number'][:-1])))
+    ends = np.append(starts[1:], len(records))
+    complete = (ends - starts) == records['n_bins'][starts]
+
+    groups = [[], [], [], [], []]
+    for start, end in zip(starts[complete], ends[complete]):
+      timeslot = records[start:end]
+      groups[0].append(timeslot['bin'].tolist())
+      groups[1].append(timeslot['weight'].tolist())
+      groups[2].append(timeslot['number'].tolist())
+      groups[3].append(timeslot['max'].tolist())
+      groups[4].append(timeslot['flexibility'].tolist())
+    return groups
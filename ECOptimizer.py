@@ -155,6 +155,9 @@ class ECOptimizer(qw.QMainWindow):
 			self.warnNotSimulated()
 			return
 		ps, pm, p1o, p2o = Settings.getOutputPaths(jsonName, days, self.optimMethod)
+		binSize = self.centralWidget().getBinSize()
+		solverOptions = self.centralWidget().getSolverOptions()
+		self.centralWidget().saveOptions()
 
 		# set simulation information screen
 		info = InfoScreen("Optimizing", "Preparing classes")
@@ -163,7 +166,8 @@ class ECOptimizer(qw.QMainWindow):
 		# prepare thread for running simulation
 		self.thread = qc.QThread()
 		self.thread.setTerminationEnabled()
-		self.worker = ProcsimRun(optimize = True, days = days, optimMethod = self.optimMethod,\
+		self.worker = ProcsimRun(optimize = True, days = days, optimMethod = self.optimMethod, fact = binSize,\
+			solver_options = solverOptions, cache = Settings.getCacheResults(), \
 			path_steps_seconds = ps, path_steps_minutes = pm, \
 			path_steps_after_first = p1o, path_steps_after_second = p2o, community_file = pj)
 
@@ -27,13 +27,14 @@ class ECSimulator(qw.QMainWindow):
 
 	closeOpenGraphs = qc.Signal()
 
-	def goToResults(self, days = None, pj = None):
+	def goToResults(self, days = None, pj = None, timeslotIndex = None):
 		"""
 		Sets Result Screen as central widget
 
 		Args:
 			days: number of days in the simulation we're checking the results of
 			pj: path to the community's json file
+			timeslotIndex: TimeslotIndex built in the simulation (None to read the timeslots files)
 		"""
 		if pj is None: # gets the json if it's not given as an argument
 			pj = self.jsonPath
@@ -55,7 +56,7 @@ class ECSimulator(qw.QMainWindow):
 			self.warnNotSimulated()
 			return
 
-		graphScreen = DefaultGraphs(paths)
+		graphScreen = DefaultGraphs(paths, timeslotIndex = timeslotIndex)
 		graphScreen.goBack.connect(self.goToSimMenu)
 		self.closeOpenGraphs.connect(graphScreen.closeGraphs)
 		self.setCentralWidget(graphScreen)
@@ -133,6 +134,17 @@ class ECSimulator(qw.QMainWindow):
 			errorPopup.setInformativeText("Error details:\n"+str(exception))
 			errorPopup.exec()
 		
+		def indexed(index):
+			"""
+			Keeps the index of the timeslots built in the simulation (the worker is deleted when it finishes)
+
+			Args:
+				index: TimeslotIndex of the timeslots of the community
+			"""
+			timeslotIndex[0] = index
+
+		timeslotIndex = [None] # None if the timeslots were not generated (the graphs read the timeslots files)
+
 		pj = self.jsonPath
 		if pj is None: # check if a community was selected
 			self.warnNoCommunity()
@@ -170,11 +182,13 @@ class ECSimulator(qw.QMainWindow):
 		#connect to thread finished
 		self.thread.finished.connect(self.thread.deleteLater)
 		logSimulationConnection = self.thread.finished.connect(lambda:self.logSimulation(days, jsonName))
-		endGoToConnection = self.thread.finished.connect(lambda:self.goToResults(days, pj))
+		endGoToConnection = self.thread.finished.connect(lambda:self.goToResults(days, pj, timeslotIndex[0]))
 		#connect to wroker progress
 		self.worker.progress.connect(info.controlProgress)
 		#connect to worker error
 		self.worker.error.connect(error)
+		#keep the index of the timeslots for the timeslots graphs
+		self.worker.timeslotsIndexed.connect(indexed)
 		#run
 		self.thread.start()
 
@@ -8,6 +8,7 @@ from PySide6 import QtCore as qc, QtWidgets as qw, QtGui as qg
 from Settings import Settings
 
 from procsimulator import ConsumptionGenerator as CG
+from procsimulator.CopyOnWriteFolder import CopyOnWriteFolder
 
 import antgen
 import pandas as pd
@@ -217,7 +218,7 @@ class InternalCsvSelector(qw.QWidget):
 			folderName: name of the selected folder
 		"""
 		netloadPath = self.folders[folderName] + "/netload.csv"
-		file = open(netloadPath)
+		file = open(CopyOnWriteFolder.resolve(netloadPath))
 		variables = sorted(file.readline().split(";")[1:], key=str.casefold) # all variables except the date
 		file.close()
 		variableSelector = qw.QComboBox()
@@ -697,7 +698,7 @@ class LineWidget(qw.QPushButton):
 			dataframe from the lines parameters
 		"""
 		params = self.params
-		df = pd.read_csv(params[0][3], sep = ";")
+		df = pd.read_csv(CopyOnWriteFolder.resolve(params[0][3]), sep = ";")
 		for col in df.columns:
 			if col != "Date" and col != params[0][4]:
 				df.drop(col, inplace=True, axis=1)
@@ -707,7 +708,7 @@ class LineWidget(qw.QPushButton):
 			df["Power"] = df["Power"].mul(-1)
 
 		for param in params[1:]:
-			paramDf = pd.read_csv(param[3], sep = ";")
+			paramDf = pd.read_csv(CopyOnWriteFolder.resolve(param[3]), sep = ";")
 			for col in paramDf.columns:
 				if col != "Date" and col != param[4]:
 					paramDf.drop(col, inplace=True, axis=1)
@@ -132,7 +132,8 @@ class LabelOptimOptions(qw.QLabel):
 		Label about the optimisation options
 		"""
 		super().__init__("""Options:
-	Days: Select the number of days simulated in the simulation you want to optimize."""
+	Days: Select the number of days simulated in the simulation you want to optimize;
+	Bins: Select the size of the optimization bins (finer bins allow shifting consumption more precisely)."""
 	)
 		self.setWordWrap(True)
 
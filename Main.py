@@ -1,4 +1,5 @@
 import sys
+import logging
 from PySide6 import QtCore as qc, QtWidgets as qw, QtGui as qg
 
 from ECSimulator import ECSimulator
@@ -8,6 +9,7 @@ from Help import Help
 from Home import Home
 from ResultScreen import Overview
 from Util import Util
+from procsimulator.OptimizationLog import OptimizationLog
 
 class SideButton(qw.QPushButton):
 	def __init__(self, label, checkable = True):
@@ -271,6 +273,10 @@ class MainWindow(qw.QMainWindow):
 			self.currentGraphConn = None
 		
 if __name__ == "__main__":
+	# PROCSIM messages are shown from the INFO level (the arrays of the optimization are only logged at DEBUG level)
+	logging.basicConfig(format = "%(asctime)s %(name)s %(levelname)s: %(message)s")
+	OptimizationLog.configure(level = logging.INFO)
+
 	app = qw.QApplication([])
 
 	widget = MainWindow()
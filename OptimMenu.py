@@ -3,6 +3,7 @@ from os.path import isfile
 from PySide6 import QtCore as qc, QtWidgets as qw, QtGui as qg
 from Settings import Settings
 from Util import Util
+from procsimulator.SolverOptions import SolverOptions
 
 class CustomBtn(qw.QPushButton):
 	def __init__(self, label):
@@ -25,6 +26,7 @@ class SimOptions(qw.QWidget):
 		"""
 		Widget for selection of the simulation options:
 		-number of days of the simulation to optimise
+		-size of the optimisation bins
 		
 		Args:
 			communityFile: path to the community json file
@@ -40,9 +42,17 @@ class SimOptions(qw.QWidget):
 		for day in sorted(loggedDays, key = int):
 			self.daysComboBox.addItem(Util.daysString(day))
 
+		binLabel = CustomLab(" with bins of ")
+
+		self.binSizeComboBox = qw.QComboBox()
+		for binSize in Settings.binSizes():
+			self.binSizeComboBox.addItem(f"{binSize} minutes")
+
 		layout = qw.QHBoxLayout()
 		layout.addWidget(label)
 		layout.addWidget(self.daysComboBox)
+		layout.addWidget(binLabel)
+		layout.addWidget(self.binSizeComboBox)
 		layout.addStretch()
 		self.setLayout(layout)
 
@@ -71,6 +81,95 @@ class SimOptions(qw.QWidget):
 			i = 0
 		self.daysComboBox.setCurrentIndex(i)
 
+	def getBinSize(self):
+		"""
+		Returns:
+			size (in minutes) of the optimisation bins
+		"""
+		return Settings.binSizes()[self.binSizeComboBox.currentIndex()]
+
+	def setBinSize(self, binSize):
+		"""
+		Sets the bin size combo box to the given value if it is available
+		If it is not available defaults to the first option in the combobox
+
+		Args:
+			binSize: size (in minutes) of the optimisation bins
+		"""
+		i = Settings.binSizes().index(binSize) if binSize in Settings.binSizes() else 0
+		self.binSizeComboBox.setCurrentIndex(i)
+
+class SolverOptionsSelector(qw.QWidget):
+	def __init__(self):
+		"""
+		Widget for selection of the solver options of the Pyomo optimisation:
+		-solver (among the ones installed)
+		-time limit of the solve
+		-relative MIP gap
+		-number of threads
+		"""
+		super().__init__()
+
+		label = CustomLab("Solver ")
+
+		self.solverComboBox = qw.QComboBox()
+		self.solverComboBox.addItem("Automatic", "")
+		for solver in SolverOptions.installed():
+			self.solverComboBox.addItem(solver, solver)
+
+		self.timeLimitSpinBox = qw.QSpinBox()
+		self.timeLimitSpinBox.setMaximum(86400)
+		self.timeLimitSpinBox.setSuffix(" s")
+		self.timeLimitSpinBox.setSpecialValueText("No time limit")
+
+		self.mipGapSpinBox = qw.QDoubleSpinBox()
+		self.mipGapSpinBox.setMaximum(100)
+		self.mipGapSpinBox.setSuffix(" % gap")
+		self.mipGapSpinBox.setSpecialValueText("Default gap")
+
+		self.threadsSpinBox = qw.QSpinBox()
+		self.threadsSpinBox.setMaximum(256)
+		self.threadsSpinBox.setSuffix(" thread(s)")
+		self.threadsSpinBox.setSpecialValueText("Default threads")
+
+		layout = qw.QHBoxLayout()
+		layout.addWidget(label)
+		layout.addWidget(self.solverComboBox)
+		layout.addWidget(self.timeLimitSpinBox)
+		layout.addWidget(self.mipGapSpinBox)
+		layout.addWidget(self.threadsSpinBox)
+		layout.addStretch()
+		self.setLayout(layout)
+
+	def getSolverOptions(self):
+		"""
+		Returns:
+			SolverOptions with the selected options (the ones left at 0 use the solver's default)
+		"""
+		return SolverOptions(solver = self.solverComboBox.currentData() or None,
+			time_limit = self.timeLimitSpinBox.value() or None,
+			mip_gap = self.mipGapSpinBox.value() / 100 or None,
+			threads = self.threadsSpinBox.value() or None)
+
+	def setSolverOptions(self, solver, timeLimit, mipGap, threads):
+		"""
+		Sets the selected options
+		If the solver is not installed defaults to the first option in the combobox
+
+		Args:
+			solver: name of the solver (empty for automatic)
+			timeLimit: time limit (in seconds) of the solve (0 for no limit)
+			mipGap: relative MIP gap (in %) (0 for the solver's default)
+			threads: number of threads (0 for the solver's default)
+		"""
+		i = self.solverComboBox.findData(solver)
+		if i == -1:
+			i = 0
+		self.solverComboBox.setCurrentIndex(i)
+		self.timeLimitSpinBox.setValue(timeLimit)
+		self.mipGapSpinBox.setValue(mipGap)
+		self.threadsSpinBox.setValue(threads)
+
 class CustomLab(qw.QLabel):
 	def __init__(self, text):
 		"""
@@ -103,6 +202,7 @@ class OptimMenu(qw.QWidget):
 		self.btnOptim = CustomBtn(f"Start {optimName} Optimization")
 		self.btnOptim.setObjectName("BigButton")
 		self.simOptions = SimOptions(communityFile)
+		self.solverOptions = SolverOptionsSelector() if optimName == "Pyomo" else None # only the Pyomo optimisation uses a solver
 		self.btnRes = CustomBtn("Show Previous Results")
 
 		layout = qw.QGridLayout()
@@ -111,11 +211,17 @@ class OptimMenu(qw.QWidget):
 		
 		layout.addWidget(self.simOptions, 1, 0, 1, -1)
 
-		layout.addWidget(self.btnRes,2,0,1,-1)
+		resRow = 2
+		if self.solverOptions is not None:
+			layout.addWidget(self.solverOptions, 2, 0, 1, -1)
+			layout.setRowStretch(2,1)
+			resRow = 3
+
+		layout.addWidget(self.btnRes,resRow,0,1,-1)
 
 		layout.setRowStretch(0,15)
 		layout.setRowStretch(1,1)
-		layout.setRowStretch(2,5)
+		layout.setRowStretch(resRow,5)
 
 		self.setLayout(layout)
 
@@ -124,10 +230,42 @@ class OptimMenu(qw.QWidget):
 		Load previously used options
 		"""
 		self.simOptions.setDays(Settings.getDays())
+		self.simOptions.setBinSize(Settings.getBinSize())
+		if self.solverOptions is not None:
+			self.solverOptions.setSolverOptions(Settings.getSolver(), Settings.getTimeLimit(), Settings.getMipGap(), Settings.getThreads())
+
+	def saveOptions(self):
+		"""
+		Saves used options
+		"""
+		s = Settings()
+		s.binSize = self.getBinSize()
+		if self.solverOptions is not None:
+			s.solver = self.solverOptions.solverComboBox.currentData()
+			s.timeLimit = self.solverOptions.timeLimitSpinBox.value()
+			s.mipGap = self.solverOptions.mipGapSpinBox.value()
+			s.threads = self.solverOptions.threadsSpinBox.value()
+		s.save()
 
 	def getDays(self):
 		"""
 		Returns:
 			number of days to simulate
 		"""
-		return self.simOptions.getDays()
\ No newline at end of file
+		return self.simOptions.getDays()
+
+	def getBinSize(self):
+		"""
+		Returns:
+			size (in minutes) of the optimisation bins
+		"""
+		return self.simOptions.getBinSize()
+
+	def getSolverOptions(self):
+		"""
+		Returns:
+			SolverOptions of the optimisation (None if the optimisation method does not use a solver)
+		"""
+		if self.solverOptions is None:
+			return None
+		return self.solverOptions.getSolverOptions()
\ No newline at end of file
@@ -16,6 +16,7 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
 from procsimulator.Evaluation import Evaluation
+from procsimulator.CopyOnWriteFolder import CopyOnWriteFolder
 
 from ClickableGraph import ClickableGraph
 from Settings import Settings
@@ -121,7 +122,7 @@ class BaseloadGraph(PreloadedGraph):
         for path in pathName:
             if path is None:
                 continue
-            if isfile(path + baseloadSuf):
+            if isfile(CopyOnWriteFolder.resolve(path + baseloadSuf)):
                 pathsToUse.append(path)
         
         graphs = len(pathsToUse)
@@ -134,9 +135,9 @@ class BaseloadGraph(PreloadedGraph):
 
         num_houses = len(community)
         for i, path in enumerate(pathsToUse):
-            baseload = pd.read_csv(path + baseloadSuf, sep=';')["Power"]
-            not_baseload = pd.read_csv(path + notBaseloadSuf, sep=';')["Power"]
-            baseline = pd.read_csv(path + baselineSuf, sep=';')["Power"]
+            baseload = pd.read_csv(CopyOnWriteFolder.resolve(path + baseloadSuf), sep=';')["Power"]
+            not_baseload = pd.read_csv(CopyOnWriteFolder.resolve(path + notBaseloadSuf), sep=';')["Power"]
+            baseline = pd.read_csv(CopyOnWriteFolder.resolve(path + baselineSuf), sep=';')["Power"]
             
             minutes = len(baseload.index)
             labels = list(range(0, minutes))
@@ -202,7 +203,7 @@ class HouseGraph(PreloadedGraph):
         for path in pathName.keys():
             if path is None:
                 continue
-            filePath = path + suf
+            filePath = CopyOnWriteFolder.resolve(path + suf)
             if isfile(filePath):
                 if first:
                     colNames = ["Date", pathName[path]]
@@ -262,7 +263,7 @@ class SelfSufficiencyGraph(PreloadedGraph):
         for path in pathName.keys():
             if path is None:
                 continue
-            filePath = path + "/netload.csv"
+            filePath = CopyOnWriteFolder.resolve(path + "/netload.csv")
             if isfile(filePath):
                 df = pd.read_csv(filePath, sep=';')
                 df.columns = ['Date', 'Demand', 'PV_Production', 'Wind_Production', 'Production', 'Netload']
@@ -295,15 +296,17 @@ class SelfSufficiencyGraph(PreloadedGraph):
         self.showGraphFromFigure(fig)   
 
 class TimeslotsGraph(PreloadedGraph):
-    def __init__(self, paths, houseNo = '0', community = None):
+    def __init__(self, paths, houseNo = '0', community = None, timeslotIndex = None):
         """
         Graph comparing different optimisations' timeslot placement (only accounts for flexible appliances since every other is fixed)
 
         Args:
             paths: dictionary of relevant paths
+            timeslotIndex: TimeslotIndex of the timeslots of the simulation, used instead of the timeslots files of the minute folder (None to read the files)
         """
         self.paths = paths
         self.houseNo = houseNo
+        self.timeslotIndex = timeslotIndex
         self.left = 0.1975
         self.bottom = 0.15
         self.community = community
@@ -371,6 +374,39 @@ class TimeslotsGraph(PreloadedGraph):
                     r = f.readline()
             return timeslot, maxDay
 
+        def buildTimeslotDictFromIndex(index, maxDay, allAppliances):
+            """
+            Builds the same dictionary as buildTimeslotDict from the index of the timeslots of the simulation, without reading its timeslots file
+
+            Args:
+                index: TimeslotIndex of the timeslots of the simulation
+                maxDay: the number of the highest day a timeslot was placed in until now
+                allAppliances: list of appliances to update
+
+            Returns:
+                [0] dictionary with timeslot infromation {appliance_name: [(start, end), ...], ...}
+                [1] highest day a timeslot was placed in
+            """
+            timeslot = {}
+            allTimeslots = index.by_start()
+            if len(allTimeslots) == 0:
+                return timeslot, maxDay
+            firstDay = datetime.datetime.strptime(allTimeslots[0]["Start"][:10], "%Y-%m-%d").date() #the days are counted from the first timeslot of the community, as in the timeslots files
+            for house, applianceName in index.appliances():
+                if house != int(houseNo):
+                    continue
+                slots = []
+                for tim in index.by_start(house, applianceName):
+                    day = (datetime.datetime.strptime(tim["Start"][:10], "%Y-%m-%d").date() - firstDay).days + 1
+                    maxDay = day if day > maxDay else maxDay #update maxDay
+                    start = 24*(day-1)+int(tim["Start"][-8:-6])+int(tim["Start"][-5:-3])/60 #HH:MM of the start to float
+                    end = 24*(day-1)+int(tim["End"][-8:-6])+int(tim["End"][-5:-3])/60 #HH:MM of the end to float (in the day of the start)
+                    slots.append((start,end))
+                timeslot[applianceName] = slots
+                if applianceName not in allAppliances:
+                    allAppliances.append(applianceName)
+            return timeslot, maxDay
+
         paths = self.paths
         houseNo = self.houseNo
 
@@ -381,7 +417,11 @@ class TimeslotsGraph(PreloadedGraph):
         for path in pathName.keys():
             if path == None:
                 continue
-            fp = f"{path}/house{houseNo}/timeslots"
+            if path == paths.get("minute") and self.timeslotIndex is not None:
+                n += 1
+                filePaths[pathName[path]] = None #the timeslots are taken from the index
+                continue
+            fp = CopyOnWriteFolder.resolve(f"{path}/house{houseNo}/timeslots")
             if isfile(fp):
                 n += 1
                 filePaths[pathName[path]] = fp 
@@ -396,7 +436,10 @@ class TimeslotsGraph(PreloadedGraph):
         maxDay = 1
         allAppliances = []
         for name in filePaths.keys():
-            tims[name], d = buildTimeslotDict(filePaths[name], maxDay, allAppliances)
+            if filePaths[name] is None:
+                tims[name], d = buildTimeslotDictFromIndex(self.timeslotIndex, maxDay, allAppliances)
+            else:
+                tims[name], d = buildTimeslotDict(filePaths[name], maxDay, allAppliances)
             maxDay = max(d, maxDay)
 
         applianceNumbers = {}
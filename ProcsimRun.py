@@ -1,10 +1,11 @@
 import sys
 
-from os.path import isdir
+from os.path import isdir, isfile
 from os.path import realpath
-from os import makedirs
+from os import makedirs, remove
 
 import datetime
+import logging
 
 from procsimulator.CommunitySpecificator import CommunitySpecificator
 from procsimulator.ConsumptionGenerator import ConsumptionGenerator
@@ -15,9 +16,16 @@ from procsimulator.RenewableEnergyGenerator import RenewableEnergyGenerator
 from procsimulator.CommunityGenerator import CommunityGenerator
 from procsimulator.CommunityManagerStrategy import CommunityManagerStrategy
 from procsimulator.MinimizeCostsPyomo import MinimizeCostsPyomo
+from procsimulator.CommunityManagerGreedy import CommunityManagerGreedy
+from procsimulator.PlacedTimeslots import PlacedTimeslots
+from procsimulator.TimeslotIndex import TimeslotIndex
+from procsimulator.CopyOnWriteFolder import CopyOnWriteFolder
+from procsimulator.OptimizationLog import OptimizationLog
 
 from PySide6 import QtCore as qc, QtWidgets as qw, QtGui as qg
 
+logger = OptimizationLog.get_logger("ProcsimRun")
+
 class InfoScreen(qw.QWidget):
 	def __init__(self, title, text):
 		"""
@@ -106,7 +114,8 @@ class ProcsimRun(qc.QObject):
 		path_steps_minutes = "output/test/minute",
 		path_steps_after_first = "output/test/afteroptimization",
 		path_steps_after_second = "output/test/aftersecoptimization",
-		community_file = "data.json", simulate = False, optimize = False):
+		community_file = "data.json", simulate = False, optimize = False, fact = 60,
+		log_levels = None, dump_path = None, solver_options = None, cache = False):
 		"""
 		Class to run PROCSIM
 		
@@ -122,6 +131,11 @@ class ProcsimRun(qc.QObject):
 			community_file: JSON file containing the community configuration
 			simulate: whether to run the simulate function
 			optimize: wheter to run the optimize function
+			fact: minutes of each optimisation bin (e.g. if bins of 30 minutes, fact = 30)
+			log_levels: dictionary with the logging level of each module (e.g. {"CommunityManager": logging.DEBUG}), None to keep the current levels
+			dump_path: folder where the arrays logged at DEBUG level are dumped in binary (None to log them as text)
+			solver_options: SolverOptions of the Pyomo optimisation (solver, time limit, MIP gap and threads), None to use the defaults
+			cache: whether to reuse the results of the optimisation windows solved before with the same inputs (kept in the inputs folder of the run)
 		"""
 		super().__init__()
 
@@ -133,7 +147,13 @@ class ProcsimRun(qc.QObject):
 		self.days = days
 		self.skipCg = skipCg
 		self.optimMethod = optimMethod
+		self.fact = fact
+		self.log_levels = log_levels
+		self.dump_path = dump_path
+		self.solver_options = solver_options
+		self.cache = cache
 		self.localPV = localPV
+		self.timeslot_index = None #TimeslotIndex of the flexible timeslots of the community, built once (see getTimeslotIndex)
 
 		self.communityFile = community_file
 		self.path_steps_seconds = path_steps_seconds
@@ -144,6 +164,7 @@ class ProcsimRun(qc.QObject):
 	finished = qc.Signal() #signal finished the PROCSIM procedure
 	progress = qc.Signal(int) #signal progress in the simulation to show info to the user 
 	error = qc.Signal(Exception) #signal exception occurrence
+	timeslotsIndexed = qc.Signal(object) #signal the TimeslotIndex of the community was built, so the timeslots graphs can use it instead of reading the timeslots files
 	#progress codes
 	CONSUMPTION, \
 	RENEWABLE_ENERGY, \
@@ -155,6 +176,8 @@ class ProcsimRun(qc.QObject):
 		"""
 		Run PROCSIM. If no option is specified does a full run
 		"""
+		OptimizationLog.configure(levels = self.log_levels or {}, dump_path = self.dump_path)
+
 		procedures = []
 		noSelection = not self.runSimulate and not self.runOptimize 
 		if self.runSimulate or noSelection:
@@ -184,8 +207,11 @@ class ProcsimRun(qc.QObject):
 			makedirs(realpath(self.path_steps_seconds)+"/output")
 		if not isdir(self.path_steps_minutes):
 			makedirs(realpath(self.path_steps_minutes))
+		#the optimisation folders hardlink the unchanged files of the minute folder (copy-on-write), which the simulation rewrites in place, so they are removed
+		for path in CopyOnWriteFolder.invalidate(self.path_steps_minutes):
+			logger.info("REMOVED OUTDATED OPTIMISATION FOLDER %s", path)
 			
-		print("SIMULATING")
+		logger.info("SIMULATING")
 		cg = ConsumptionGenerator(self.communityFile, self.path_steps_seconds, self.path_steps_minutes)
 		pv_dat = self.getPV()
 		wind_dat = self.getWind()
@@ -197,7 +223,8 @@ class ProcsimRun(qc.QObject):
 			if self.cancel:
 				return
 			self.cgExecute(cg, str(self.days), "houses")
-			self.createTimeslotsFilesSim(cg.get_timeslots(cg.get_community(), True), len(cg.get_community())) #using True because it's how it's used in the CommunityManager module
+			self.timeslot_index = None #the consumption profiles were generated again, so are their timeslots
+			self.createTimeslotsFilesSim(self.getTimeslotIndex(cg), len(cg.get_community()))
 
 		self.progress.emit(ProcsimRun.RENEWABLE_ENERGY)
 		if self.cancel:
@@ -219,7 +246,7 @@ class ProcsimRun(qc.QObject):
 		if not isdir(self.path_steps_after_second):
 			makedirs(realpath(self.path_steps_after_second))
 
-		print("OPTIMISING")
+		logger.info("OPTIMISING")
 		self.progress.emit(ProcsimRun.OPTIMISATION)
 		cg = ConsumptionGenerator(self.communityFile, self.path_steps_seconds, self.path_steps_minutes)
 		cm = self.getCommunityManager(self.optimMethod, cg, self.path_steps_minutes, self.path_steps_after_first, self.path_steps_after_second)
@@ -277,17 +304,18 @@ class ProcsimRun(qc.QObject):
 		Args:
 			cm: Community Manager object in use
 		"""
-		print(f"USING METHOD {self.optimMethod}")
+		logger.info("USING METHOD %s", self.optimMethod)
 
-		if self.optimMethod == 0:
-			cm.execute(save_to_file = True)
+		if self.optimMethod == 0 or self.optimMethod == 2:
+			cm.execute(save_to_file = True, fact = self.fact, multi_day = True, cache = self.cache, timeslot_index = self.getTimeslotIndex(cg))
 			self.createTimeslotsFilesOpt(cm.placed_timeslots_array, len(cg.get_community()))
-			self.createTimeslotsFilesOpt(cm.second_placed_timeslots_array, len(cg.get_community()), True)
+			if hasattr(cm, "second_placed_timeslots_array"): # there is no 2nd optimisation if no timeslots were left for it
+				self.createTimeslotsFilesOpt(cm.second_placed_timeslots_array, len(cg.get_community()), True)
 		elif self.optimMethod == 1:
-			cm.execute(save_to_file = True)
+			cm.execute(save_to_file = True, fact = self.fact, multi_day = True, solver_options = self.solver_options, cache = self.cache, timeslot_index = self.getTimeslotIndex(cg))
 			self.createTimeslotsFilesOpt(cm.placed_timeslots_array, len(cg.get_community()))
 		else:
-			print(f"Optimisation method {self.optimMethod} not found, defaulting")
+			logger.warning("Optimisation method %s not found, defaulting", self.optimMethod)
 			cm.execute()
 
 	def getCommunityManager(self, optim_method, cg, path_steps_minutes, path_steps_after_first, path_steps_after_second):
@@ -306,9 +334,26 @@ class ProcsimRun(qc.QObject):
 		"""
 		if optim_method == 1:
 			return MinimizeCostsPyomo(cg, path_steps_minutes, path_steps_after_first, path_steps_after_second)
+		elif optim_method == 2:
+			return CommunityManagerGreedy(cg, path_steps_minutes, path_steps_after_first, path_steps_after_second)
 		else:
 			return CommunityManagerStrategy(cg, path_steps_minutes, path_steps_after_first, path_steps_after_second)
 
+	def getTimeslotIndex(self, cg):
+		"""
+		Gets the index of the flexible timeslots of the community, built the first time it is needed in the run (the timeslots files, the optimisation and the timeslots graphs use the same one)
+
+		Args:
+			cg: Consumption Generator object in use
+
+		Returns:
+			TimeslotIndex of the timeslots
+		"""
+		if self.timeslot_index is None:
+			self.timeslot_index = TimeslotIndex(cg.get_timeslots(cg.get_community(), True)) #using True because it's how it's used in the CommunityManager module
+			self.timeslotsIndexed.emit(self.timeslot_index)
+		return self.timeslot_index
+
 	def getPV(self):
 		"""
 		Gets solar data from CSV or Smile based on specified local data path
@@ -317,10 +362,10 @@ class ProcsimRun(qc.QObject):
 			appropriate solar data 
 		"""
 		if self.localPV:
-			print(f"USING LOCAL SOLAR FILE: {self.localPV}")
+			logger.info("USING LOCAL SOLAR FILE: %s", self.localPV)
 			return DataFromCSV(self.localPV)
 		else:
-			print("USING SOLAR FILE FROM SMILE")
+			logger.info("USING SOLAR FILE FROM SMILE")
 			return DataFromSmile("https://ems.prsma.com/solcast/public/Fazendinha_solcast-radiation-historical_30min.csv")
 
 	def getWind(self):
@@ -332,19 +377,19 @@ class ProcsimRun(qc.QObject):
 		"""
 		return DataFromTomorrow("https://api.tomorrow.io/v4/timelines?location=-73.98529171943665,40.75872069597532&fields=pressureSurfaceLevel,pressureSeaLevel,precipitationIntensity,precipitationType,windSpeed,windGust,windDirection,temperature,temperatureApparent,cloudCover,cloudBase,cloudCeiling,weatherCode&teps=1h&units=metric&apikey=Yckmp3vREbJqyprWGGiTOC1pVaAYO0ZT")
 
-	def createTimeslotsFilesSim(self, tims, noHouses):
+	def createTimeslotsFilesSim(self, index, noHouses):
 		"""
 		Creates the timeslots file from the data gathered in the simulation
 
 		Args:
-			tims: timeslots dictionary from the ConsumptionGenerator
+			index: TimeslotIndex of the timeslots from the ConsumptionGenerator (grouped by house and appliance, sorted by start)
 			noHouses: number of houses in the community
 		"""
 		self.progress.emit(ProcsimRun.TIMESLOTS)
 		timsForFile = [{} for i in range(noHouses)]
 		firstDay = None
-		for tim in tims:
-			house = tim["House"]
+		for tim in (tim for key in index.appliances() for tim in index.by_start(*key)):
+			house = int(tim["House"])
 			appliance = tim["Appliance"]
 			start = tim["Start"][-8:-3] #HH:MM from the timestamp (in string format)
 			end = tim["End"][-8:-3] #HH:MM from the timestamp (in string format)
@@ -373,20 +418,21 @@ class ProcsimRun(qc.QObject):
 		Creates the timeslots file from the data gathered in the optimisation
 
 		Args:
-			tims: placed_timeslots_array from the CommunityManager
+			tims: placed_timeslots_array from the CommunityManager (PlacedTimeslots)
 			noHouses: number of houses in the community
 			secondOptim: if these are the timeslots of a second optimisation
 		"""
 		self.progress.emit(ProcsimRun.TIMESLOTS)
 		timsForFile = [{} for i in range(noHouses)]
 		firstDay = None
-		for tim in tims: #tim is string "HouseNo*Appliance*TimeslotNo*Start*End"
-			tim = tim.split("*")
-			house = int(tim[0])
-			appliance = tim[1]
-			start = tim[3][-8:-3] #HH:MM from the timestamp (in string format)
-			end = tim[4][-8:-3] #HH:MM from the timestamp (in string format)
-			day = datetime.datetime.strptime(tim[3][:10], "%Y-%m-%d").date() #yyyy-mm-dd from the timestamp
+		if not isinstance(tims, PlacedTimeslots): #older versions of procsim return strings "HouseNo*Appliance*TimeslotNo*Start*End"
+			tims = PlacedTimeslots.from_strings(tims)
+		for tim in tims: #tim is a record (house, appliance, number, start, end)
+			house = int(tim['house'])
+			appliance = str(tim['appliance'])
+			start = tim['start'][-8:-3] #HH:MM from the timestamp (in string format)
+			end = tim['end'][-8:-3] #HH:MM from the timestamp (in string format)
+			day = datetime.datetime.strptime(tim['start'][:10], "%Y-%m-%d").date() #yyyy-mm-dd from the timestamp
 			
 			if firstDay is None:
 				firstDay = day
@@ -417,6 +463,8 @@ class ProcsimRun(qc.QObject):
 		"""
 		for houseNo, house in enumerate(tims):
 			path = f"{folder}/house{houseNo}/timeslots"
+			if isfile(path): #the file can be a hardlink to the original folder's file (optimisation folders are copy-on-write), so it is replaced instead of overwritten
+				remove(path)
 			with open(path, "w") as f:
 				for appliance in sorted(list(house.keys())):
 					f.write(appliance)
@@ -426,6 +474,8 @@ class ProcsimRun(qc.QObject):
 
 
 if __name__ == '__main__':
+	logging.basicConfig(format = "%(asctime)s %(name)s %(levelname)s: %(message)s")
+	OptimizationLog.configure(level = logging.INFO)
 	file = "/home/fgbg/Documentos/estagio_iti/procsim/Fazendinha_solcast-radiation-historical_30min.csv"
 	runner = ProcsimRun(simulate = True, optimize = False, \
 		skipCg = True, optimMethod = 0, localPV = file, days = 2)
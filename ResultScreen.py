@@ -13,13 +13,14 @@ from Settings import Settings
 from Util import Util
 
 class DefaultGraphs(qw.QWidget):
-	def __init__(self, paths, backButton = True):
+	def __init__(self, paths, backButton = True, timeslotIndex = None):
 		"""
 		Widget to show pre selected graphs
 
 		Args:
 			paths: dictionary with relevant paths
 			backButton: whether to create a button to return to the last screen (useful when arriving at the default graphs from the simulation or optimisation screen)
+			timeslotIndex: TimeslotIndex of the timeslots of the simulation, used by the timeslots graphs instead of the minute folder's timeslots files (None to read the files)
 		"""
 		super().__init__()
 
@@ -59,7 +60,7 @@ class DefaultGraphs(qw.QWidget):
 		#timeslots graphs
 		timsGraphsLayout = qw.QHBoxLayout()
 		for i in range(len(community)):
-			tg = TimeslotsGraph(paths, i, community)
+			tg = TimeslotsGraph(paths, i, community, timeslotIndex)
 			self.closeGraphs.connect(tg.closeFigure)
 			timsGraphsLayout.addWidget(tg)
 		timsGraphs = qw.QWidget()
@@ -132,10 +132,17 @@ class Settings(qw.QDialog):
 	__min_folder_name = "minute" # folder name for the resampled files (at 1/60Hz)
 	__ao_folder_name = "afteroptimization" # folder name for the 1st optimisation files
 	__a2o_folder_name = "aftersecoptimization" # folder name for the 2nd optimisation files
-	__optimization_names = ("Default", "Pyomo") # tuple containing the names of the optimisation method
+	__optimization_names = ("Default", "Pyomo", "Greedy") # tuple containing the names of the optimisation method
 	__default_skip_cg = False # default setting for skipping Consumption Generator
 	__default_local_pv = False # default setting for using the local solar data file
 	__default_days = 1 # default number of days to simulate
+	__bin_sizes = (60, 30, 15) # tuple containing the available sizes (in minutes) of the optimisation bins
+	__default_bin_size = 60 # default size (in minutes) of the optimisation bins
+	__default_solver = "" # default solver of the Pyomo optimisation (empty to use the first one installed)
+	__default_time_limit = 0 # default time limit (in seconds) of the Pyomo optimisation solver (0 for no limit)
+	__default_mip_gap = 0.0 # default relative MIP gap (in %) of the Pyomo optimisation solver (0 for the solver's default)
+	__default_threads = 0 # default number of threads of the Pyomo optimisation solver (0 for the solver's default)
+	__default_cache_results = False # default setting for reusing the results of the optimisation windows solved before with the same inputs
 	
 	def __init__(self):
 		"""
@@ -144,6 +151,7 @@ class Settings(qw.QDialog):
 		- JSON folder path
 		- Output folder path
 		- Solar data CSV file path
+		- Optimisation cache
 		"""
 		super().__init__()
 
@@ -160,10 +168,14 @@ class Settings(qw.QDialog):
 
 		self.pv_file_selector = CSVFileSelector()
 
+		self.cache_checkbox = qw.QCheckBox("Reuse results of optimisation windows solved before with the same inputs")
+		self.cache_checkbox.setChecked(Settings.__default_cache_results)
+
 		form = qw.QFormLayout()
 		form.addRow("Community Directory", self.json_selector)
 		form.addRow("Output Directory", self.output_path_selector)
 		form.addRow("Solar Data File", self.pv_file_selector)
+		form.addRow("Optimisation Cache", self.cache_checkbox)
 
 		btnCancel = qw.QPushButton("Cancel")
 		btnCancel.clicked.connect(self.cancel)
@@ -182,6 +194,11 @@ class Settings(qw.QDialog):
 		self.skipCg = Settings.__default_skip_cg
 		self.localPV = Settings.__default_local_pv
 		self.days = Settings.__default_days
+		self.binSize = Settings.__default_bin_size
+		self.solver = Settings.__default_solver
+		self.timeLimit = Settings.__default_time_limit
+		self.mipGap = Settings.__default_mip_gap
+		self.threads = Settings.__default_threads
 
 		if isfile(self.__filename):
 			self.loadConfig()
@@ -202,11 +219,17 @@ class Settings(qw.QDialog):
 		f.write(f"json_path={self.json_selector.path}\n")
 		f.write(f"output_path={self.output_path_selector.path}\n")
 		f.write(f"pv_data={self.pv_file_selector.path}\n")
+		f.write(f"cache_results={int(self.cache_checkbox.isChecked())}\n")
 		
 		f.write(f"#last runner options used\n")
 		f.write(f"skip_cg={int(self.skipCg)}\n")
 		f.write(f"local_pv={int(self.localPV)}\n")
 		f.write(f"days={self.days}\n")
+		f.write(f"bin_size={self.binSize}\n")
+		f.write(f"solver={self.solver}\n")
+		f.write(f"time_limit={self.timeLimit}\n")
+		f.write(f"mip_gap={self.mipGap}\n")
+		f.write(f"threads={self.threads}\n")
 
 		f.close()
 
@@ -228,14 +251,21 @@ class Settings(qw.QDialog):
 			self.output_path_selector.uncheck()
 			self.output_path_selector.setPath(pathOutput)
 		self.pv_file_selector.setPath(pathPVData)
+		self.cache_checkbox.setChecked(Settings.getCacheResults())
 
 		skip_cg = Settings.getSkipCg()
 		local_pv = Settings.getlocalPV()
 		days = Settings.getDays()
+		bin_size = Settings.getBinSize()
 
 		self.skipCg = skip_cg
 		self.localPV = local_pv
 		self.days = days
+		self.binSize = bin_size
+		self.solver = Settings.getSolver()
+		self.timeLimit = Settings.getTimeLimit()
+		self.mipGap = Settings.getMipGap()
+		self.threads = Settings.getThreads()
 
 	def sizeHint(self):
 		"""
@@ -294,6 +324,17 @@ class Settings(qw.QDialog):
 			return path
 		else:
 			return ""
+
+	@staticmethod
+	def getCacheResults():
+		"""
+		Returns:
+			the setting of the Optimisation Cache option (whether to reuse the results of the optimisation windows solved before with the same inputs)
+		"""
+		c = Settings.findInFile("cache_results=")
+		c = Settings.__default_cache_results if c is None else bool(int(c))
+		return c
+
 	@staticmethod
 	def getOutputPaths(community_name, days, optim_method = 0):
 		"""
@@ -356,4 +397,61 @@ class Settings(qw.QDialog):
 		"""
 		d = Settings.findInFile("days=")
 		d = Settings.__default_days if d is None else int(d)
-		return d
\ No newline at end of file
+		return d
+
+	@staticmethod
+	def binSizes():
+		"""
+		Returns:
+			tuple containing the available sizes (in minutes) of the optimisation bins
+		"""
+		return Settings.__bin_sizes
+
+	@staticmethod
+	def getBinSize():
+		"""
+		Returns:
+			last setting of the size (in minutes) of the optimisation bins
+		"""
+		b = Settings.findInFile("bin_size=")
+		b = Settings.__default_bin_size if b is None or int(b) not in Settings.__bin_sizes else int(b)
+		return b
+
+	@staticmethod
+	def getSolver():
+		"""
+		Returns:
+			last setting of the solver of the Pyomo optimisation (empty to use the first one installed)
+		"""
+		s = Settings.findInFile("solver=")
+		return Settings.__default_solver if s is None else s
+
+	@staticmethod
+	def getTimeLimit():
+		"""
+		Returns:
+			last setting of the time limit (in seconds) of the Pyomo optimisation solver (0 for no limit)
+		"""
+		t = Settings.findInFile("time_limit=")
+		t = Settings.__default_time_limit if t is None else int(t)
+		return t
+
+	@staticmethod
+	def getMipGap():
+		"""
+		Returns:
+			last setting of the relative MIP gap (in %) of the Pyomo optimisation solver (0 for the solver's default)
+		"""
+		g = Settings.findInFile("mip_gap=")
+		g = Settings.__default_mip_gap if g is None else float(g)
+		return g
+
+	@staticmethod
+	def getThreads():
+		"""
+		Returns:
+			last setting of the number of threads of the Pyomo optimisation solver (0 for the solver's default)
+		"""
+		t = Settings.findInFile("threads=")
+		t = Settings.__default_threads if t is None else int(t)
+		return t